@@ -0,0 +1,492 @@
+"""Benchmark suite for sealevelrise.
+
+Run from the root of the repository:
+
+    python -m benchmarks.run --output benchmarks.json
+    python -m benchmarks.run --quick --compare benchmarks.json
+
+Results are written as JSON: one record per benchmark with its parameters and
+timing statistics in seconds per call, along with the versions of the package,
+Python, and the main dependencies. Use --compare to print the ratio of each
+benchmark against an earlier results file.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import sealevelrise  # noqa: E402
+from sealevelrise import batch, export, noaaapi, visualize  # noqa: E402
+from sealevelrise.catalog import BuiltinCatalog  # noqa: E402
+from sealevelrise.historical import HistoricalSLR  # noqa: E402
+from sealevelrise.noaaslr import NOAAScenarios  # noqa: E402
+from sealevelrise.server import ProjectionServer  # noqa: E402
+from sealevelrise.slrprojections import Scenarios  # noqa: E402
+from sealevelrise.sqlcatalog import SQLiteCatalog  # noqa: E402
+from sealevelrise.utils import BUILTIN_CATALOG  # noqa: E402
+
+from tests.noaaserver import FakeNOAAServer  # noqa: E402
+
+HORIZON_YEARS = np.arange(2025, 2151)
+
+
+class Suite:
+    """Collects timing records"""
+
+    def __init__(self, repeat: int = 5, min_time: float = 0.05) -> None:
+        self.repeat = repeat
+        self.min_time = min_time
+        self.records = []
+
+    def measure(self, name: str, func, setup=None, number: int = None, **params):
+        """Times func() and records seconds per call; setup() runs before each
+        repetition and is not timed"""
+        if setup is not None:
+            setup()
+        timer = timeit.Timer(func)
+        if number is None:
+            number, _ = timer.autorange()
+            # autorange targets 0.2 s; scale down to min_time per repetition
+            number = max(1, int(number * self.min_time / 0.2))
+        timings = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            timings.append(timer.timeit(number=number) / number)
+        record = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "repeat": self.repeat,
+            "mean": statistics.fmean(timings),
+            "median": statistics.median(timings),
+            "min": min(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+        self.records.append(record)
+        label = ", ".join(f"{k_}={v_}" for k_, v_ in params.items())
+        print(f"{name:<40} {label:<32} {record['median'] * 1e3:12.4f} ms")
+        return record
+
+    def record(self, name: str, value: float, unit: str, **params):
+        """Records a value that is not a timing, e.g., a memory peak"""
+        self.records.append(
+            {"name": name, "params": params, "value": value, "unit": unit}
+        )
+        label = ", ".join(f"{k_}={v_}" for k_, v_ in params.items())
+        print(f"{name:<40} {label:<32} {value:12.4f} {unit}")
+
+
+def bench_import(suite: Suite) -> None:
+    def _run(code: str) -> float:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        return time.perf_counter() - start
+
+    for label_, code_ in [
+        ("python", "pass"),
+        ("sealevelrise", "import sealevelrise"),
+        ("Scenarios", "from sealevelrise import Scenarios"),
+        (
+            "from_builtin.by_horizon_year",
+            "from sealevelrise import Scenarios; "
+            "Scenarios.from_builtin(0).scenarios[0].by_horizon_year(2050)",
+        ),
+        (
+            "cli.query",
+            "import contextlib, io; from sealevelrise.cli import main\n"
+            "with contextlib.redirect_stdout(io.StringIO()):\n"
+            "    main(['query', 'nj-dep-2021', '--years', '2030:2100'])",
+        ),
+        ("pandas", "import pandas"),
+    ]:
+        suite.measure(f"import.{label_}", lambda code_=code_: _run(code_), number=1)
+
+
+def bench_builtin(suite: Suite) -> None:
+    for key_ in BUILTIN_CATALOG:
+        suite.measure("from_builtin", lambda: Scenarios.from_builtin(key_), key=key_)
+
+    tracemalloc.start()
+    instances = [Scenarios.from_builtin("nj-dep-2021") for _ in range(1_000)]
+    resident, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    suite.record(
+        "from_builtin.resident",
+        resident / len(instances) / 1024,
+        "KiB",
+        instances=1_000,
+    )
+    del instances
+
+    sc = Scenarios.from_builtin("nj-dep-2021")
+    suite.measure(
+        "Scenario.by_horizon_year.scalar", lambda: sc[2].by_horizon_year(2070)
+    )
+    suite.measure(
+        "Scenarios.by_horizon_year.scalar",
+        lambda: sc.by_horizon_year(2070, merge=False),
+    )
+    suite.measure(
+        "Scenarios.by_horizon_year.batch",
+        lambda: sc.by_horizon_year(HORIZON_YEARS, merge=False, coerce_errors=True),
+        years=HORIZON_YEARS.size,
+    )
+    suite.measure(
+        "Scenarios.by_horizon_year.merge",
+        lambda: sc.by_horizon_year(2075, merge=True),
+    )
+    suite.measure("Scenarios.convert", lambda: sc.convert(to_units="mm"))
+    suite.measure("Scenarios.as_units", lambda: sc.as_units(to_units="mm"))
+    suite.measure("Scenarios.dataframe", lambda: sc.dataframe)
+    suite.measure(
+        "Scenarios.dataframe.fresh",
+        lambda: Scenarios.from_builtin("nj-dep-2021").dataframe,
+    )
+
+    surface = sc.probability_surface()
+    suite.measure(
+        "ProbabilitySurface.sample",
+        lambda: sum(
+            len(chunk_.values)
+            for chunk_ in surface.sample(10**6, years=HORIZON_YEARS, seed=0)
+        ),
+        number=1,
+        trajectories=10**6,
+        years=HORIZON_YEARS.size,
+    )
+
+    def _plot():
+        _, ax = plt.subplots(1, 1)
+        sc.plot(ax=ax, horizon_year=2075)
+        ax.figure.canvas.draw()
+        plt.close(ax.figure)
+
+    suite.measure("Scenarios.plot.agg", _plot)
+
+
+def _synthetic_catalog(path: Path, n: int) -> None:
+    rng = np.random.default_rng(n)
+    years = list(range(2020, 2151, 10))
+    with open(path, mode="w", encoding="utf-8") as f:
+        f.write("{\n")
+        for i_ in range(n):
+            scenarios = [
+                {
+                    "description": f"Scenario {j_}",
+                    "short name": f"S{j_}",
+                    "units": "ft",
+                    "probability (CDF)": (j_ + 1) / 6.0,
+                    "baseline year": 2000,
+                    "data": {
+                        "x": years,
+                        "y": np.round(
+                            np.cumsum(rng.uniform(0.0, 0.5, len(years))), 2
+                        ).tolist(),
+                    },
+                }
+                for j_ in range(5)
+            ]
+            record = {
+                "location name": f"Location {i_}",
+                "station ID (CO-OPS)": str(8000000 + i_),
+                "issuer": f"Issuer {i_ % 17}",
+                "scenarios": scenarios,
+            }
+            separator = ",\n" if i_ < n - 1 else "\n"
+            f.write(f"{json.dumps(f'key-{i_}')}: {json.dumps(record)}{separator}")
+        f.write("}\n")
+
+
+def bench_catalog(suite: Suite, sizes) -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        for n_ in sizes:
+            path = Path(folder) / f"catalog-{n_}.json"
+            _synthetic_catalog(path, n_)
+            suite.record(
+                "catalog.file_size", path.stat().st_size / 1024**2, "MiB", entries=n_
+            )
+            repeat = 1 if n_ >= 100_000 else None
+            suite.measure(
+                "catalog.index",
+                lambda: BuiltinCatalog(path=path).headers,
+                number=repeat,
+                entries=n_,
+            )
+
+            tracemalloc.start()
+            catalog = BuiltinCatalog(path=path)
+            catalog.headers
+            resident, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            suite.record("catalog.index.peak", peak / 1024**2, "MiB", entries=n_)
+            suite.record(
+                "catalog.index.resident", resident / 1024**2, "MiB", entries=n_
+            )
+
+            key = f"key-{n_ // 2}"
+            suite.measure("catalog.header", lambda: catalog.header(key), entries=n_)
+            suite.measure("catalog.load", lambda: catalog.load(key), entries=n_)
+            suite.measure(
+                "catalog.from_dict",
+                lambda: Scenarios.from_dict(catalog.load(key)),
+                entries=n_,
+            )
+            suite.measure(
+                "catalog.from_dict.trusted",
+                lambda: Scenarios.from_dict(catalog.load(key), validate=False),
+                entries=n_,
+            )
+            if n_ <= 1_000:
+                suite.measure(
+                    "catalog.validate",
+                    lambda: catalog.validate(),
+                    number=1,
+                    entries=n_,
+                )
+                suite.measure(
+                    "catalog.from_builtin.all",
+                    lambda: [
+                        Scenarios.from_builtin(key_, catalog=catalog)
+                        for key_ in catalog
+                    ],
+                    number=1,
+                    entries=n_,
+                )
+
+            sqlite_path = Path(folder) / f"catalog-{n_}.sqlite"
+            start = time.perf_counter()
+            with SQLiteCatalog(sqlite_path) as store:
+                store.import_json(catalog)
+            suite.record("sqlite.import", time.perf_counter() - start, "s", entries=n_)
+            with SQLiteCatalog(sqlite_path) as store:
+                suite.measure(
+                    "sqlite.index",
+                    lambda: SQLiteCatalog(sqlite_path).headers,
+                    number=1 if n_ >= 100_000 else None,
+                    entries=n_,
+                )
+                suite.measure("sqlite.load", lambda: store.load(key), entries=n_)
+                suite.measure(
+                    "sqlite.query",
+                    lambda: store.query(issuer="Issuer 3", years=(2030, 2100)),
+                    entries=n_,
+                )
+
+
+def bench_noaa(suite: Suite) -> None:
+    with FakeNOAAServer() as server, tempfile.TemporaryDirectory() as folder:
+        noaaapi.NOAA_API_URL = server.url
+        noaaapi.RESPONSE_CACHE = noaaapi.ResponseCache(directory=folder, enabled=False)
+        suite.measure(
+            "HistoricalSLR.init",
+            lambda: HistoricalSLR(station_ID="9414290", units="mm"),
+            setup=HistoricalSLR.invalidate,
+            number=1,
+            cache="none",
+        )
+        suite.measure(
+            "NOAAScenarios.init",
+            lambda: NOAAScenarios(station_id="9414290"),
+            cache="none",
+        )
+        noaaapi.RESPONSE_CACHE.enabled = True
+        NOAAScenarios(station_id="9414290")
+        suite.measure(
+            "HistoricalSLR.init",
+            lambda: HistoricalSLR(station_ID="9414290", units="mm"),
+            setup=HistoricalSLR.invalidate,
+            number=1,
+            cache="disk",
+        )
+        suite.measure(
+            "HistoricalSLR.init",
+            lambda: HistoricalSLR(station_ID="9414290", units="mm"),
+            cache="memo",
+        )
+        suite.measure(
+            "NOAAScenarios.init",
+            lambda: NOAAScenarios(station_id="9414290"),
+            cache="disk",
+        )
+
+
+def bench_export(suite: Suite, n_chunks: int) -> None:
+    chunk = batch.query(list(BUILTIN_CATALOG), HORIZON_YEARS)
+    metadata = export.projection_metadata(BUILTIN_CATALOG)
+    formats = ["csv"] if export.pyarrow is None else ["csv", "parquet", "arrow"]
+    with tempfile.TemporaryDirectory() as folder:
+        for format_ in formats:
+            path = Path(folder) / f"export.{format_}"
+
+            def _export():
+                chunks = (chunk for _ in range(n_chunks))
+                export.export(chunks, path, format=format_, metadata=metadata)
+
+            suite.measure(
+                "export", _export, number=1, format=format_, rows=n_chunks * len(chunk)
+            )
+            tracemalloc.start()
+            _export()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            suite.record(
+                "export.peak",
+                peak / 1024**2,
+                "MiB",
+                format=format_,
+                rows=n_chunks * len(chunk),
+            )
+
+
+def bench_figures(suite: Suite, n_figures: int, max_workers: int) -> None:
+    sets = [Scenarios.from_builtin(key_) for key_ in BUILTIN_CATALOG]
+    panels = [
+        visualize.panel_from_scenarios(sets[i_ % len(sets)]) for i_ in range(n_figures)
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        for workers_ in sorted({1, max_workers}):
+            start = time.perf_counter()
+            rendered = visualize.render_figures(panels, folder, max_workers=workers_)
+            elapsed = time.perf_counter() - start
+            suite.record(
+                "render_figures.figure",
+                rendered["seconds"].median(),
+                "s",
+                figures=n_figures,
+                workers=workers_,
+            )
+            suite.record(
+                "render_figures.throughput",
+                n_figures / elapsed,
+                "figures/s",
+                figures=n_figures,
+                workers=workers_,
+            )
+
+
+def bench_server(suite: Suite, n_requests: int, n_clients: int) -> None:
+    keys = list(BUILTIN_CATALOG)
+    targets = [f"/projections?location={key_}&year=2050,2100&units=ft" for key_ in keys]
+    with ProjectionServer(port=0) as server:
+
+        def _client(offset: int, step: int) -> None:
+            # One keep-alive connection per client
+            connection = http.client.HTTPConnection(server.host, server.port)
+            for i_ in range(offset, n_requests, step):
+                connection.request("GET", targets[i_ % len(targets)])
+                connection.getresponse().read()
+            connection.close()
+
+        for clients_ in sorted({1, n_clients}):
+            server.service.metrics = type(server.service.metrics)()
+            threads = [
+                threading.Thread(target=_client, args=(i_, clients_))
+                for i_ in range(clients_)
+            ]
+            start = time.perf_counter()
+            for thread_ in threads:
+                thread_.start()
+            for thread_ in threads:
+                thread_.join()
+            elapsed = time.perf_counter() - start
+            connection = http.client.HTTPConnection(server.host, server.port)
+            connection.request("GET", "/metrics")
+            route = json.loads(connection.getresponse().read())["routes"][
+                "GET /projections"
+            ]
+            connection.close()
+            suite.record(
+                "server.throughput",
+                route["count"] / elapsed,
+                "requests/s",
+                clients=clients_,
+            )
+            for stat_ in ["p50_ms", "p95_ms", "p99_ms"]:
+                suite.record(
+                    f"server.{stat_[:3]}", route[stat_], "ms", clients=clients_
+                )
+
+
+def compare(records: list, baseline_path: Path) -> None:
+    """Prints the ratio of each timing against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def _key(record: dict):
+        return record["name"], json.dumps(record["params"], sort_keys=True)
+
+    reference = {_key(r_): r_ for r_ in baseline["results"] if "median" in r_}
+    print(f"\nComparison with {baseline_path} ({baseline['meta']['version']}):")
+    for record_ in records:
+        if "median" not in record_ or _key(record_) not in reference:
+            continue
+        ratio = record_["median"] / reference[_key(record_)]["median"]
+        label = ", ".join(f"{k_}={v_}" for k_, v_ in record_["params"].items())
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"{record_['name']:<40} {label:<32} {ratio:8.2f}x{flag}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="Write the results to this file")
+    parser.add_argument("--compare", type=Path, help="Compare with a results file")
+    parser.add_argument(
+        "--quick", action="store_true", help="Skip the 100k-entry catalog"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    suite = Suite(repeat=args.repeat)
+    bench_import(suite)
+    bench_builtin(suite)
+    bench_catalog(suite, sizes=[10, 1_000] if args.quick else [10, 1_000, 100_000])
+    bench_noaa(suite)
+    bench_export(suite, n_chunks=50 if args.quick else 500)
+    bench_figures(
+        suite, n_figures=20 if args.quick else 200, max_workers=os.cpu_count() or 1
+    )
+    bench_server(suite, n_requests=1_000 if args.quick else 10_000, n_clients=8)
+
+    results = {
+        "meta": {
+            "version": sealevelrise.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "matplotlib": matplotlib.__version__,
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": suite.records,
+    }
+    if args.output is not None:
+        with open(args.output, mode="w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare is not None:
+        compare(suite.records, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
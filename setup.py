@@ -43,9 +43,21 @@ setup(
     python_requires=">=3.9",
     install_requires=["numpy", "pandas", "matplotlib", "pathlib"],
     extras_require={
-        "dev": ["pytest", "pytest-cov", "flake8", "jupyter", "black", "wheel"]
+        "dev": [
+            "pytest",
+            "pytest-cov",
+            "flake8",
+            "jupyter",
+            "black",
+            "wheel",
+            "pyarrow",
+            "scipy",
+        ],
+        "spatial": ["scipy"],
+        "export": ["pyarrow"],
     },
     include_package_data=True,
+    entry_points={"console_scripts": ["sealevelrise = sealevelrise.cli:main"]},
     keywords=[
         "sea level rise",
         "climate",
@@ -1,6 +1,27 @@
 __version__ = "0.1.1"
-from sealevelrise.scenario import Scenario
-from sealevelrise.slrprojections import Scenarios
-from sealevelrise.data import Data
-from sealevelrise.historical import HistoricalSLR
-from sealevelrise.noaaslr import NOAAProjections
+import importlib
+
+# Public classes are imported on first access, so that importing the package
+# does not load NumPy, pandas, matplotlib or the network stack
+_LAZY_ATTRIBUTES = {
+    "Scenario": "sealevelrise.scenario",
+    "Scenarios": "sealevelrise.slrprojections",
+    "Data": "sealevelrise.data",
+    "HistoricalSLR": "sealevelrise.historical",
+    "NOAAScenarios": "sealevelrise.noaaslr",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        # Later accesses bypass __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
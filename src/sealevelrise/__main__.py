@@ -0,0 +1,5 @@
+import sys
+
+from sealevelrise.cli import main
+
+sys.exit(main())
@@ -0,0 +1,565 @@
+import typing
+from collections import deque
+
+import numpy as np
+
+from sealevelrise.slrprojections import Scenarios
+from sealevelrise.utils import BUILTIN_CATALOG, _check_units, _validate_key
+
+# pandas, the NOAA client and the process pools are imported where they are
+# used, so that the command-line interface evaluates projections with NumPy only
+if typing.TYPE_CHECKING:
+    from pandas import DataFrame
+
+    from sealevelrise.historical import HistoricalSLR
+    from sealevelrise.noaaapi import NOAASession
+
+BATCH_COLUMNS = [
+    "key",
+    "location",
+    "issuer",
+    "scenario",
+    "probability",
+    "year",
+    "value",
+    "units",
+]
+
+TIMELINE_COLUMNS = [
+    "station",
+    "key",
+    "issuer",
+    "scenario",
+    "probability",
+    "year",
+    "value",
+    "units",
+    "source",
+]
+
+
+def _evaluate(
+    scenarios: Scenarios,
+    key: str,
+    horizon_years: np.ndarray,
+    units: typing.Optional[str] = None,
+    coerce_errors: bool = True,
+) -> typing.Dict[str, np.ndarray]:
+    """Evaluates all Scenario objects of a Scenarios instance at all horizon years
+    and returns the columns of the result in long format, without pandas"""
+    # Unit view of the matrix: converting the Scenarios would build a DataFrame
+    matrix = scenarios.matrix if units is None else scenarios.matrix.as_units(units)
+    n_rows, n_years = matrix.shape[0], horizon_years.size
+    values = matrix.interp(horizon_years, coerce_errors=coerce_errors)
+    return {
+        "key": np.full(n_rows * n_years, key, dtype=object),
+        "location": np.full(n_rows * n_years, scenarios.location_name, dtype=object),
+        "issuer": np.full(n_rows * n_years, scenarios.issuer, dtype=object),
+        "scenario": np.repeat(np.array(matrix.short_names, dtype=object), n_years),
+        "probability": np.repeat(matrix.probabilities, n_years),
+        "year": np.tile(horizon_years, n_rows),
+        "value": values.ravel(),
+        "units": np.repeat(np.array(matrix.units, dtype=object), n_years),
+    }
+
+
+def _evaluate_chunk(
+    keys: typing.List[str],
+    horizon_years: np.ndarray,
+    units: typing.Optional[str],
+    coerce_errors: bool,
+) -> "DataFrame":
+    # Runs in worker processes; must remain a module-level function
+    from pandas import DataFrame
+
+    columns = [
+        _evaluate(
+            scenarios=Scenarios.from_builtin(key_),
+            key=key_,
+            horizon_years=horizon_years,
+            units=units,
+            coerce_errors=coerce_errors,
+        )
+        for key_ in keys
+    ]
+    if not columns:
+        return DataFrame(columns=BATCH_COLUMNS)
+    return DataFrame(
+        data={
+            column_: np.concatenate([columns_[column_] for columns_ in columns])
+            for column_ in BATCH_COLUMNS
+        },
+        columns=BATCH_COLUMNS,
+    )
+
+
+def _ordered_map(
+    function: typing.Callable,
+    tasks: typing.Iterable[tuple],
+    max_workers: int = None,
+    max_pending: int = None,
+    threads: bool = False,
+    return_exceptions: bool = False,
+) -> typing.Iterator:
+    """Applies function to the arguments of each task, in process or in a pool of
+    workers, and yields the results in the order of the tasks
+
+    Parameters
+    ----------
+    function : callable
+        Function called as function(*task); must be a module-level function
+        unless threads is True
+    tasks : iterable of tuple
+        Arguments of each call, consumed lazily
+    max_workers : int, optional
+        If greater than 1, tasks run in a pool with that many workers, by
+        default None (in process)
+    max_pending : int, optional
+        Maximum number of tasks submitted to the workers and not yet yielded,
+        by default twice max_workers
+    threads : bool, optional
+        If True, the pool is a ThreadPoolExecutor rather than a
+        ProcessPoolExecutor, by default False
+    return_exceptions : bool, optional
+        If True, the exception raised by a task is yielded in place of its
+        result instead of being raised, by default False
+
+    Yields
+    ------
+    object
+        The result of each task, or its exception
+    """
+    if max_workers is None or max_workers <= 1:
+        for task_ in tasks:
+            try:
+                yield function(*task_)
+            except Exception as error:
+                if not return_exceptions:
+                    raise
+                yield error
+        return
+
+    if threads:
+        from concurrent.futures import ThreadPoolExecutor as Executor
+    else:
+        from concurrent.futures import ProcessPoolExecutor as Executor
+
+    if max_pending is None:
+        max_pending = 2 * max_workers
+    executor = Executor(max_workers=max_workers)
+
+    def _result(future):
+        try:
+            return future.result()
+        except Exception as error:
+            if not return_exceptions:
+                raise
+            return error
+
+    try:
+        # At most max_pending tasks are held in memory ahead of the consumer
+        pending = deque()
+        for task_ in tasks:
+            pending.append(executor.submit(function, *task_))
+            if len(pending) >= max_pending:
+                yield _result(pending.popleft())
+        while pending:
+            yield _result(pending.popleft())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_query(
+    locations: typing.Sequence[typing.Union[str, int]],
+    horizon_years: typing.Union[float, typing.Sequence[float], np.ndarray],
+    units: str = None,
+    coerce_errors: bool = True,
+    max_workers: int = None,
+    chunksize: int = 16,
+    max_pending: int = None,
+) -> typing.Iterator["DataFrame"]:
+    """Evaluates the builtin projections of many locations at many horizon years,
+    yielding the long-format table one chunk of locations at a time
+
+    Only a bounded number of chunks is held in memory, which allows streaming
+    very large result sets to disk (see sealevelrise.export). Parameters are the
+    same as for query, plus:
+
+    Parameters
+    ----------
+    max_pending : int, optional
+        Maximum number of chunks submitted to the workers and not yet yielded,
+        by default twice max_workers
+
+    Yields
+    ------
+    DataFrame
+        The rows of up to chunksize locations, with the columns listed in
+        BATCH_COLUMNS, in the same order as query
+    """
+    if units is not None:
+        _check_units(units)
+    if chunksize < 1:
+        raise ValueError("chunksize must be a positive integer.")
+
+    # Resolve identifiers once and keep the first occurrence of each key
+    keys = list(dict.fromkeys(_validate_key(key=location_) for location_ in locations))
+    years = np.atleast_1d(np.asarray(horizon_years, dtype=float)).ravel()
+    chunks = [keys[i_ : i_ + chunksize] for i_ in range(0, len(keys), chunksize)]
+
+    # Results are yielded in submission order, keeping the output stable
+    yield from _ordered_map(
+        _evaluate_chunk,
+        [(chunk_, years, units, coerce_errors) for chunk_ in chunks],
+        max_workers=max_workers if len(chunks) > 1 else None,
+        max_pending=max_pending,
+    )
+
+
+def query(
+    locations: typing.Sequence[typing.Union[str, int]],
+    horizon_years: typing.Union[float, typing.Sequence[float], np.ndarray],
+    units: str = None,
+    coerce_errors: bool = True,
+    max_workers: int = None,
+    chunksize: int = 16,
+) -> "DataFrame":
+    """Evaluates the builtin projections of many locations at many horizon years and
+    returns a single long-format table
+
+    Parameters
+    ----------
+    locations : sequence of str or int
+        Identifiers of the builtin scenarios, using the same nomenclature as
+        Scenarios.from_builtin (location names, keys, or indices). Identifiers
+        resolving to the same key are only evaluated once.
+    horizon_years : float or array-like
+        Horizon year(s) at which every Scenario is evaluated
+    units : str, optional
+        If given, all values are converted to these units, by default None
+    coerce_errors : bool, optional
+        If set to True (default), years outside of the range of a Scenario are
+        returned as np.nan; if set to False, a ValueError is raised
+    max_workers : int, optional
+        If greater than 1, the locations are split in chunks evaluated in a
+        ProcessPoolExecutor with that many workers, by default None (in process)
+    chunksize : int, optional
+        Number of locations evaluated by each task, by default 16
+
+    Returns
+    -------
+    DataFrame
+        One row per (key, scenario, year) with the columns listed in
+        BATCH_COLUMNS; rows follow the order of the locations, then of the
+        Scenario objects, then of the horizon years, regardless of max_workers
+
+    Examples
+    --------
+    >>> query(["San Francisco, CA", "nj-dep-2021"], range(2030, 2101, 10))
+    """
+    from pandas import DataFrame, concat
+
+    frames = list(
+        iter_query(
+            locations,
+            horizon_years,
+            units=units,
+            coerce_errors=coerce_errors,
+            max_workers=max_workers,
+            chunksize=chunksize,
+        )
+    )
+    if not frames:
+        return DataFrame(columns=BATCH_COLUMNS)
+    return concat(frames, ignore_index=True)
+
+
+class StationBatch(typing.NamedTuple):
+    """Outcome of fetch_noaa_stations"""
+
+    historical: typing.Dict[str, "HistoricalSLR"]
+    projections: typing.Dict[str, Scenarios]
+    errors: "DataFrame"
+
+
+def fetch_noaa_stations(
+    station_ids: typing.Sequence[str],
+    units: str = "mm",
+    historical: bool = True,
+    projections: bool = True,
+    max_concurrency: int = 8,
+    rate_limit: float = None,
+    session: "NOAASession" = None,
+    **kwargs,
+) -> StationBatch:
+    """Builds HistoricalSLR and NOAA projection sets for many stations, sending
+    the requests concurrently over a shared pool of keep-alive connections
+
+    Parameters
+    ----------
+    station_ids : sequence of str
+        NOAA CO-OPS identifiers of the stations, e.g., ['9414290', '9410660']
+    units : str, optional
+        Units passed to HistoricalSLR, by default 'mm'
+    historical : bool, optional
+        Whether to build HistoricalSLR instances, by default True
+    projections : bool, optional
+        Whether to build Scenarios from the NOAA projections, by default True
+    max_concurrency : int, optional
+        Maximum number of requests in flight, by default 8
+    rate_limit : float, optional
+        Maximum number of requests started per second, by default no limit
+    session : NOAASession, optional
+        Session to reuse; by default a new one is created for the call and closed
+        afterwards, in which case max_concurrency and rate_limit configure it
+    **kwargs
+        'Report Year' and 'Data Units' passed to Scenarios.from_noaa
+
+    Returns
+    -------
+    StationBatch
+        Named tuple holding the HistoricalSLR and Scenarios instances keyed by
+        station, in the order of station_ids, and a DataFrame reporting the
+        station, product and error message of every failed request. A failure
+        never interrupts the other requests.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from pandas import DataFrame
+
+    from sealevelrise.historical import HistoricalSLR
+    from sealevelrise.noaaapi import NOAASession
+
+    _check_units(units)
+    station_ids = list(dict.fromkeys(station_ids))
+    tasks = []
+    if historical:
+        tasks += [("historical", station_) for station_ in station_ids]
+    if projections:
+        tasks += [("projections", station_) for station_ in station_ids]
+
+    owns_session = session is None
+    if owns_session:
+        session = NOAASession(max_connections=max_concurrency, rate_limit=rate_limit)
+
+    def _run(task: typing.Tuple[str, str]):
+        product, station = task
+        try:
+            if product == "historical":
+                return HistoricalSLR(station_ID=station, units=units, session=session)
+            return Scenarios.from_noaa(station_id=station, session=session, **kwargs)
+        except Exception as error:
+            return error
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            outcomes = list(executor.map(_run, tasks))
+    finally:
+        if owns_session:
+            session.close()
+
+    results = {"historical": dict(), "projections": dict()}
+    errors = []
+    for (product_, station_), outcome_ in zip(tasks, outcomes):
+        if isinstance(outcome_, Exception):
+            errors.append(
+                {
+                    "station": station_,
+                    "product": product_,
+                    "error": f"{type(outcome_).__name__}: {outcome_}",
+                }
+            )
+        else:
+            results[product_][station_] = outcome_
+
+    return StationBatch(
+        historical=results["historical"],
+        projections=results["projections"],
+        errors=DataFrame(errors, columns=["station", "product", "error"]),
+    )
+
+
+class Timelines(typing.NamedTuple):
+    """Outcome of stitch_timelines"""
+
+    table: "DataFrame"
+    errors: "DataFrame"
+
+
+def _stitch(
+    station: str,
+    key: str,
+    historical: "HistoricalSLR",
+    scenarios: Scenarios,
+    units: str,
+) -> "DataFrame":
+    """Joins the historical trend of a station to each Scenario of a projection
+    set, on an annual grid, and returns the result in long format"""
+    from pandas import DataFrame
+
+    matrix = scenarios.matrix
+    n_rows = matrix.shape[0]
+    if n_rows == 0 or matrix.years.size == 0:
+        return DataFrame(columns=TIMELINE_COLUMNS)
+    baselines = np.array(
+        [
+            historical._zero_year if year_ is None else year_
+            for year_ in matrix.baseline_years
+        ],
+        dtype=float,
+    )[:, np.newaxis]
+
+    years = np.arange(
+        min(historical.start_date.year, np.nanmin(baselines)),
+        np.nanmax(matrix.upper) + 1.0,
+    )
+    trend = historical.trend_at(years, units=units, bands=False)["trend"].to_numpy()
+    # Projections are relative to their baseline year and the trend to its zero
+    # year: shift the trend of every row by its value at the baseline year
+    offsets = historical.trend_at(baselines.ravel(), units=units, bands=False)
+    past = trend - offsets["trend"].to_numpy()[:, np.newaxis]
+
+    # SLR is zero at the baseline year; until the first value of a row, rise
+    # linearly from zero toward that value, tagged as interpolated
+    future = matrix.interp(years)
+    provided = ~np.isnan(matrix.values)
+    first_col = provided.argmax(axis=1)
+    first_year = matrix.years[first_col][:, np.newaxis]
+    first_value = matrix.values[np.arange(n_rows), first_col][:, np.newaxis]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ramp = first_value * (years - baselines) / (first_year - baselines)
+    gap = (years >= baselines) & (years < first_year) & np.isnan(future)
+    future = np.where(gap, ramp, future)
+
+    is_past = years < baselines
+    values = np.where(is_past, past, future)
+    sources = np.where(
+        is_past, "historical", np.where(gap, "interpolated", "projection")
+    )
+    keep = ~np.isnan(values) & provided.any(axis=1)[:, np.newaxis]
+    rows, cols = np.nonzero(keep)
+    return DataFrame(
+        data={
+            "station": np.full(rows.size, station, dtype=object),
+            "key": np.full(rows.size, key, dtype=object),
+            "issuer": np.full(rows.size, scenarios.issuer, dtype=object),
+            "scenario": np.array(matrix.short_names, dtype=object)[rows],
+            "probability": matrix.probabilities[rows],
+            "year": years[cols],
+            "value": values[rows, cols],
+            "units": np.full(rows.size, units, dtype=object),
+            "source": sources[rows, cols],
+        },
+        columns=TIMELINE_COLUMNS,
+    )
+
+
+def stitch_timelines(
+    stations: typing.Sequence[str],
+    units: str = "mm",
+    source: str = "builtin",
+    max_concurrency: int = 8,
+    rate_limit: float = None,
+    session: "NOAASession" = None,
+    **kwargs,
+) -> Timelines:
+    """Builds continuous historical-plus-projection series for many stations
+
+    For each station, the historical trend is retrieved from NOAA and joined to
+    every Scenario of the projection sets of the station. The trend is shifted
+    so that it is zero at the baseline year of each Scenario, where the
+    projections start from zero; the series are annual, from the start of the
+    historical record to the last year of each Scenario. All requests go through
+    fetch_noaa_stations, i.e., concurrently and through the response cache.
+
+    The 'source' column is 'historical' before the baseline year and
+    'projection' for the values of the Scenario. Scenarios seldom provide the
+    baseline year itself: from the baseline year to their first year, values
+    rise linearly from zero to the first value and are tagged 'interpolated'.
+
+    Parameters
+    ----------
+    stations : sequence of str
+        NOAA CO-OPS identifiers of the stations, e.g., ['9414290', '9410660']
+    units : str, optional
+        Units of the values, by default 'mm'
+    source : str, optional
+        'builtin' (default) joins every builtin projection set of the station;
+        'noaa' joins the NOAA projections of the station
+    max_concurrency, rate_limit, session
+        See fetch_noaa_stations
+    **kwargs
+        'Report Year' and 'Data Units' passed to Scenarios.from_noaa
+
+    Returns
+    -------
+    Timelines
+        Named tuple holding the table, with one row per (station, key, scenario,
+        year) and the columns listed in TIMELINE_COLUMNS, and a DataFrame
+        reporting the station, product and error of every station that could not
+        be processed. Rows follow the order of the stations, projection sets,
+        Scenario objects, and years.
+    """
+    from pandas import DataFrame, concat
+
+    _check_units(units)
+    if source not in ("builtin", "noaa"):
+        raise ValueError("source must be either 'builtin' or 'noaa'.")
+    stations = list(dict.fromkeys(stations))
+    fetched = fetch_noaa_stations(
+        stations,
+        units=units,
+        historical=True,
+        projections=source == "noaa",
+        max_concurrency=max_concurrency,
+        rate_limit=rate_limit,
+        session=session,
+        **kwargs,
+    )
+
+    frames, errors = [], [fetched.errors]
+    for station_ in stations:
+        historical = fetched.historical.get(station_)
+        if historical is None:
+            continue
+        if source == "noaa":
+            # Failed projections are already reported by fetch_noaa_stations
+            sets = []
+            if station_ in fetched.projections:
+                sets.append((f"noaa-{station_}", fetched.projections[station_]))
+        else:
+            sets = [
+                (key_, Scenarios.from_builtin(key_))
+                for key_ in BUILTIN_CATALOG.resolve(station_)
+            ]
+            if not sets:
+                errors.append(
+                    DataFrame(
+                        [
+                            {
+                                "station": station_,
+                                "product": "projections",
+                                "error": "KeyError: no builtin projections",
+                            }
+                        ]
+                    )
+                )
+        for key_, scenarios_ in sets:
+            frames.append(
+                _stitch(
+                    station=station_,
+                    key=key_,
+                    historical=historical,
+                    scenarios=scenarios_.as_units(units),
+                    units=units,
+                )
+            )
+
+    return Timelines(
+        table=(
+            concat(frames, ignore_index=True)
+            if frames
+            else DataFrame(columns=TIMELINE_COLUMNS)
+        ),
+        errors=concat(errors, ignore_index=True),
+    )
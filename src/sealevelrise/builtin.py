@@ -1,7 +1,6 @@
-from sealevelrise.scenario import Scenario
 from sealevelrise.slrprojections import Scenarios
 
-from sealevelrise.utils import ALL_BUILTIN_SCENARIOS, _validate_key
+from sealevelrise.utils import BUILTIN_CATALOG, _validate_key
 
 
 class BuiltinProjections(Scenarios):
@@ -20,48 +19,6 @@ class BuiltinProjections(Scenarios):
         """
 
         target_key = _validate_key(key=key)
-        data = ALL_BUILTIN_SCENARIOS[target_key]
-
-        # Check that you have the right data in there
-        if not isinstance(data, dict):
-            raise TypeError("data needs to be dictionary")
-        if data is not None:
-            for attr in ["location name", "station ID (CO-OPS)", "scenarios"]:
-                if attr not in data:
-                    raise KeyError(f"The {attr} key is missing or mispelled.")
-        else:
-            raise ValueError("data was passed as None")
-
-        # Record properties; optional are popped
-        location_name = data["location name"]
-        station_id = data["station ID (CO-OPS)"]
-        issuer = data["issuer"]
-        # Optional properties
-        url = data.pop("URL", None)
-
-        # Build the scenarios from the dictionary
-        scenarios_data = data["scenarios"]
-
-        # Record all Scenario objects into a list of Scenario objects
-        scenarios_list = list()
-
-        # Iterate over each items in the dictionary
-        for scenario_ in scenarios_data:
-            scenarios_list.append(
-                Scenario(
-                    description=scenario_["description"],
-                    short_name=scenario_["short name"],
-                    units=scenario_["units"],
-                    probability=scenario_["probability (CDF)"],
-                    baseline_year=scenario_["baseline year"],
-                    data=scenario_["data"],
-                )
-            )
-
-        super().__init__(
-            scenarios=scenarios_list,
-            location_name=location_name,
-            station_id=station_id,
-            issuer=issuer,
-            url=url,
-        )
+        # Same path as Scenarios.from_builtin: views over the read-only arrays
+        # shared by all instances of that key
+        self._share(Scenarios._shared(BUILTIN_CATALOG, target_key))
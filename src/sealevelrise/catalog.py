@@ -0,0 +1,464 @@
+import abc
+import json
+import numbers
+import typing
+from collections.abc import Mapping
+from pathlib import Path
+
+from sealevelrise.memo import MemoCache
+
+BUILTIN_CATALOG_PATH = Path(__file__).parent / "data/scenarios.json"
+
+# Number of projection sets kept by the projections cache of each catalog
+PROJECTIONS_CACHE_SIZE = 1024
+
+
+class CatalogEntry(typing.NamedTuple):
+    """Header describing one projection set of a catalog, without its data"""
+
+    key: str
+    location_name: str
+    issuer: str
+    station_id: typing.Optional[str]
+    first_year: float
+    last_year: float
+
+
+def _entry_from_record(key: str, record: dict) -> CatalogEntry:
+    # Scan the years of all scenarios to record the range covered by the set
+    years = [
+        year_
+        for scenario_ in record.get("scenarios", [])
+        for year_ in scenario_.get("data", {}).get("x", [])
+        if year_ is not None
+    ]
+    return CatalogEntry(
+        key=key,
+        location_name=record.get("location name"),
+        issuer=record.get("issuer"),
+        station_id=record.get("station ID (CO-OPS)"),
+        first_year=float(min(years)) if years else float("nan"),
+        last_year=float(max(years)) if years else float("nan"),
+    )
+
+
+# Keys required in every record and in each of its scenarios
+RECORD_KEYS = ["location name", "station ID (CO-OPS)", "issuer", "scenarios"]
+SCENARIO_KEYS = [
+    "description",
+    "short name",
+    "units",
+    "probability (CDF)",
+    "baseline year",
+    "data",
+]
+
+
+def record_errors(record: typing.Any) -> typing.List[Exception]:
+    """Checks a record against the schema of 'data/scenarios.json'
+
+    Parameters
+    ----------
+    record : dict
+        A projection set, e.g., as returned by Catalog.load
+
+    Returns
+    -------
+    list of Exception
+        Every problem found, as the TypeError, KeyError or ValueError that
+        building the record would raise, naming the scenario at fault; empty if
+        the record is valid
+    """
+    # utils imports this module
+    from sealevelrise.utils import UNIT_LENGTHS
+
+    if not isinstance(record, dict):
+        return [TypeError("data needs to be dictionary")]
+    errors = [
+        KeyError(f"The {key_} key is missing or mispelled.")
+        for key_ in RECORD_KEYS
+        if key_ not in record
+    ]
+    scenarios = record.get("scenarios", [])
+    if not isinstance(scenarios, list):
+        return errors + [TypeError("'scenarios' must be a list.")]
+
+    for i_, scenario_ in enumerate(scenarios):
+        where = f"Scenario {i_}"
+        if not isinstance(scenario_, dict):
+            errors.append(TypeError(f"{where} is not a dictionary."))
+            continue
+        errors += [
+            KeyError(f"{where}: the {key_} key is missing or mispelled.")
+            for key_ in SCENARIO_KEYS
+            if key_ not in scenario_
+        ]
+        where = f"Scenario {i_} ('{scenario_.get('short name')}')"
+
+        units = scenario_.get("units")
+        if "units" in scenario_ and units not in UNIT_LENGTHS:
+            errors.append(
+                ValueError(
+                    f"{where}: units {units} are not supported; only use 'ft', "
+                    f"'in', 'm', 'mm', and 'cm'."
+                )
+            )
+
+        probability = scenario_.get("probability (CDF)")
+        if not (probability is None or isinstance(probability, float)):
+            errors.append(
+                ValueError(f"{where}: 'probability (CDF)' must be a float or null.")
+            )
+        elif probability is not None and not 0.0 <= probability <= 1.0:
+            errors.append(
+                ValueError(f"{where}: probability {probability} is not within [0; 1].")
+            )
+
+        if "data" in scenario_:
+            errors += _data_errors(scenario_["data"], where)
+    return errors
+
+
+_JSON_NUMBERS = {int, float, type(None)}
+
+
+def _data_errors(data: typing.Any, where: str) -> typing.List[Exception]:
+    if not (isinstance(data, dict) and "x" in data and "y" in data):
+        return [ValueError(f"{where}: need 'x' and 'y' keys in the 'data' object.")]
+    for axis_ in ["x", "y"]:
+        values = data[axis_]
+        if isinstance(values, (str, bytes)) or not hasattr(values, "__len__"):
+            return [ValueError(f"{where}: '{axis_}' must be a list.")]
+        # Element types are collected at C speed; other numeric types, e.g.,
+        # NumPy scalars, go through the slower numbers.Real check
+        if not all(
+            type_ in _JSON_NUMBERS or issubclass(type_, numbers.Real)
+            for type_ in set(map(type, values))
+        ):
+            return [ValueError(f"{where}: '{axis_}' must only hold numbers or null.")]
+    if len(data["x"]) != len(data["y"]):
+        return [
+            ValueError(
+                f"{where}: 'x' and 'y' have discordant lengths "
+                f"({len(data['x'])} and {len(data['y'])})."
+            )
+        ]
+    return []
+
+
+class Catalog(Mapping, abc.ABC):
+    """Catalog is the interface shared by all catalog backends: a read-only mapping
+    from entry keys to records in the schema of 'data/scenarios.json'.
+
+    Backends provide the header index and load single records; resolution of
+    identifiers (keys, location names, station IDs, aliases and positions) and
+    header queries are implemented here on top of the header index.
+
+    Records are checked against the schema once, either in bulk with validate or
+    on first use with load_validated; the keys of valid records are trusted from
+    then on and their records are used without further checks.
+
+    Attributes
+    ----------
+    projections : MemoCache
+        Read-only projection sets built from the records, by key, shared by all
+        callers of Scenarios.from_builtin
+    """
+
+    def __init__(self) -> None:
+        self._order = None
+        self._lookup = None
+        self._aliases = dict()
+        self._trusted = set()
+        self.projections = MemoCache(maxsize=PROJECTIONS_CACHE_SIZE)
+
+    @property
+    @abc.abstractmethod
+    def headers(self) -> typing.Dict[str, CatalogEntry]:
+        """Header index of the catalog, in catalog order"""
+
+    @abc.abstractmethod
+    def load(self, key: str) -> dict:
+        """Returns the full record of a single entry"""
+
+    def validate(
+        self, keys: typing.Iterable[str] = None
+    ) -> typing.Dict[str, typing.List[str]]:
+        """Checks records against the schema of 'data/scenarios.json', e.g.,
+        offline after editing a catalog; valid records are trusted afterwards
+
+        Parameters
+        ----------
+        keys : iterable of str, optional
+            Keys of the records to check, by default all of them
+
+        Returns
+        -------
+        dict
+            The problems found in each invalid record, by key; empty if all
+            records are valid
+        """
+        report = dict()
+        for key_ in self if keys is None else keys:
+            errors = record_errors(self.load(key_))
+            if errors:
+                self._trusted.discard(key_)
+                report[key_] = [
+                    f"{type(error_).__name__}: {error_.args[0]}" for error_ in errors
+                ]
+            else:
+                self._trusted.add(key_)
+        return report
+
+    def load_validated(self, key: str) -> dict:
+        """Returns the full record of a single entry, checked against the schema
+        unless the key is already trusted
+
+        Raises
+        ------
+        TypeError, KeyError or ValueError
+            The first problem of an invalid record, naming the key
+        """
+        record = self.load(key)
+        if key not in self._trusted:
+            errors = record_errors(record)
+            if errors:
+                raise type(errors[0])(f"Entry '{key}': {errors[0].args[0]}")
+            self._trusted.add(key)
+        return record
+
+    def header(self, key: str) -> CatalogEntry:
+        """Returns the header of a single entry without loading its data"""
+        return self.headers[key]
+
+    def _build_lookup(self) -> None:
+        # Location names and station IDs to the keys of all their entries
+        lookup = dict()
+        for key_, header_ in self.headers.items():
+            for name_ in (header_.location_name, header_.station_id):
+                if name_ is None:
+                    continue
+                keys = lookup.setdefault(str(name_), [])
+                if key_ not in keys:
+                    keys.append(key_)
+        self._order = list(self.headers)
+        self._lookup = lookup
+
+    def add_alias(self, alias: str, key: str) -> None:
+        """Registers alias as an additional identifier of the entry key
+
+        Parameters
+        ----------
+        alias : str
+            Any name, e.g., 'SF' or 'Golden Gate'; an alias can point to several
+            entries
+        key : str
+            Key of the entry in the catalog
+        """
+        if key not in self.headers:
+            raise KeyError(f"'{key}' is not a key of the catalog.")
+        keys = self._aliases.setdefault(alias, [])
+        if key not in keys:
+            keys.append(key)
+
+    def remove_alias(self, alias: str) -> None:
+        self._aliases.pop(alias, None)
+
+    def resolve(self, identifier: typing.Union[str, int]) -> typing.List[str]:
+        """Returns the keys of all entries matching identifier
+
+        Parameters
+        ----------
+        identifier : str or int
+            An entry key, a location name, a CO-OPS station ID, an alias, or the
+            position of the entry in the catalog
+
+        Returns
+        -------
+        list of str
+            Matching keys in catalog order; an exact key or a position matches a
+            single entry, while location names, station IDs and aliases can match
+            several (e.g., a station covered by several issuers). The list is
+            empty if nothing matches.
+        """
+        if self._lookup is None:
+            self._build_lookup()
+        if isinstance(identifier, numbers.Integral):
+            if 0 <= identifier < len(self._order):
+                return [self._order[identifier]]
+            return []
+        if not isinstance(identifier, str):
+            raise TypeError("identifier must be given as a str or an int.")
+        if identifier in self.headers:
+            return [identifier]
+        matches = list(self._lookup.get(identifier, []))
+        for key_ in self._aliases.get(identifier, []):
+            if key_ not in matches:
+                matches.append(key_)
+        return matches
+
+    def resolve_many(
+        self, identifiers: typing.Iterable[typing.Union[str, int]]
+    ) -> typing.List[typing.List[str]]:
+        """Resolves several identifiers at once, see resolve
+
+        Returns
+        -------
+        list of list of str
+            The matching keys of each identifier, in the order of identifiers
+        """
+        return [self.resolve(identifier_) for identifier_ in identifiers]
+
+    def query(
+        self,
+        issuer: str = None,
+        station_id: str = None,
+        location_name: str = None,
+        years: typing.Tuple[float, float] = None,
+    ) -> typing.List[CatalogEntry]:
+        """Returns the headers of the entries matching all given criteria
+
+        Parameters
+        ----------
+        issuer, station_id, location_name : str, optional
+            Exact values to match
+        years : (float, float), optional
+            Only entries whose data cover this whole range of years are returned
+
+        Returns
+        -------
+        list of CatalogEntry
+            Matching headers, in catalog order
+        """
+        return [
+            header_
+            for header_ in self.headers.values()
+            if (issuer is None or header_.issuer == issuer)
+            and (station_id is None or header_.station_id == station_id)
+            and (location_name is None or header_.location_name == location_name)
+            and (
+                years is None
+                or (header_.first_year <= years[0] and header_.last_year >= years[1])
+            )
+        ]
+
+    def __getitem__(self, key: str) -> dict:
+        return self.load(key)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.headers)
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.headers
+
+
+class BuiltinCatalog(Catalog):
+    """BuiltinCatalog gives lazy, read-only access to a JSON file of projection
+    sets such as the builtin 'data/scenarios.json'.
+
+    Nothing is read when the catalog is created. The first lookup scans the file
+    once and keeps a small header index (key, location, issuer, station, year
+    range) along with the byte span of each entry; the scenario data of an entry
+    is only parsed when that entry is requested.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the JSON file backing the catalog
+
+    Examples
+    --------
+    >>> catalog = BuiltinCatalog()
+    >>> catalog.header("nj-dep-2021").location_name
+    'New Jersey'
+    >>> catalog["nj-dep-2021"]["issuer"]
+    'New Jersey Department of Environmental Protection'
+    """
+
+    def __init__(self, path: typing.Union[str, Path] = BUILTIN_CATALOG_PATH) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self._headers = None
+        self._spans = None
+
+    def _build_index(self) -> None:
+        with open(self.path, mode="rb") as f:
+            raw = f.read()
+        text = raw.decode("utf-8")
+
+        decoder = json.JSONDecoder()
+        headers = dict()
+        spans = dict()
+
+        def _skip(pos: int) -> int:
+            while pos < len(text) and text[pos] in " \t\n\r":
+                pos += 1
+            return pos
+
+        pos = _skip(0)
+        if text[pos] != "{":
+            raise ValueError(f"{self.path} does not contain a JSON object.")
+        pos = _skip(pos + 1)
+
+        # Keep track of the byte offsets as the text may not be pure ASCII
+        char_pos, byte_pos = 0, 0
+
+        while text[pos] != "}":
+            key, pos = decoder.raw_decode(text, pos)
+            pos = _skip(pos)
+            if text[pos] != ":":
+                raise ValueError(f"Malformed entry '{key}' in {self.path}.")
+            start = _skip(pos + 1)
+            record, end = decoder.raw_decode(text, start)
+
+            byte_pos += len(text[char_pos:start].encode("utf-8"))
+            byte_start = byte_pos
+            byte_pos += len(text[start:end].encode("utf-8"))
+            char_pos = end
+
+            # Only the header is retained; the record itself is dropped
+            headers[key] = _entry_from_record(key=key, record=record)
+            spans[key] = (byte_start, byte_pos)
+
+            pos = _skip(end)
+            if text[pos] == ",":
+                pos = _skip(pos + 1)
+
+        self._headers = headers
+        self._spans = spans
+
+    @property
+    def headers(self) -> typing.Dict[str, CatalogEntry]:
+        """Header index of the catalog, built on first access"""
+        if self._headers is None:
+            self._build_index()
+        return self._headers
+
+    def load(self, key: str) -> dict:
+        """Parses and returns the full record of a single entry
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry in the catalog, e.g., 'cocat-2018-9414290'
+
+        Returns
+        -------
+        dict
+            A freshly parsed record; modifying it does not affect the catalog
+        """
+        if self._spans is None:
+            self._build_index()
+        start, end = self._spans[key]
+        with open(self.path, mode="rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+        return json.loads(chunk.decode("utf-8"))
+
+    def __repr__(self) -> str:
+        if self._headers is None:
+            return f"BuiltinCatalog('{self.path}', not loaded)"
+        return f"BuiltinCatalog('{self.path}', {len(self._headers)} entries)"
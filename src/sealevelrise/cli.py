@@ -0,0 +1,356 @@
+"""Command-line interface of sealevelrise.
+
+Evaluates the projections of many locations at many horizon years and streams
+the results to stdout, one row per (key, scenario, year), as soon as each
+projection set is evaluated:
+
+    sealevelrise query "San Francisco, CA" nj-dep-2021 --years 2030:2100:10
+    sealevelrise query --input stations.txt --years 2050 --years 2100 --format csv
+    sealevelrise query 9414290 --source noaa --offline --years 2050
+    sealevelrise list
+    sealevelrise validate my-scenarios.json
+    sealevelrise serve --port 8000
+
+Only NumPy is imported to evaluate builtin projections, so that each call starts
+fast; the NOAA client is only imported with --source noaa.
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import typing
+
+import numpy as np
+
+from sealevelrise.batch import BATCH_COLUMNS, _evaluate, _ordered_map
+from sealevelrise.slrprojections import Scenarios
+from sealevelrise.utils import BUILTIN_CATALOG, _validate_key
+
+
+def _parse_years(text: str) -> np.ndarray:
+    # 'YEAR', 'START:END' (annual) or 'START:END:STEP', END included
+    parts = text.split(":")
+    try:
+        if len(parts) == 1:
+            return np.array([float(parts[0])])
+        if len(parts) in (2, 3):
+            start, end = float(parts[0]), float(parts[1])
+            step = float(parts[2]) if len(parts) == 3 else 1.0
+            if step <= 0:
+                raise ValueError
+            return np.arange(start, end + step / 2, step)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(
+        f"invalid years '{text}'; use YEAR, START:END or START:END:STEP"
+    )
+
+
+def _read_identifiers(path: str) -> typing.List[str]:
+    # One identifier per line; blank lines and '#' comments are skipped
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, mode="r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    return [
+        line_.strip()
+        for line_ in lines
+        if line_.strip() and not line_.lstrip().startswith("#")
+    ]
+
+
+def _rows(key: str, scenarios: Scenarios, years: np.ndarray, units: str) -> list:
+    """Evaluates all Scenario objects of a projection set at all years at once,
+    as rows of plain Python values in the order of BATCH_COLUMNS"""
+    columns = _evaluate(scenarios, key, years, units=units)
+    return list(zip(*(columns[column_].tolist() for column_ in BATCH_COLUMNS)))
+
+
+def _builtin_rows(keys: typing.List[str], years: np.ndarray, units: str) -> list:
+    # Runs in worker processes; must remain a module-level function
+    return [
+        row_
+        for key_ in keys
+        for row_ in _rows(key_, Scenarios.from_builtin(key_), years, units)
+    ]
+
+
+def _noaa_rows(station: str, years: np.ndarray, units: str, session) -> list:
+    scenarios = Scenarios.from_noaa(station_id=station, session=session)
+    return _rows(f"noaa-{station}", scenarios, years, units)
+
+
+class _Output:
+    """Writes rows to a text stream as CSV or JSON Lines, flushing after each
+    batch of rows so that consumers receive results as they are produced"""
+
+    def __init__(self, stream: typing.TextIO, format: str) -> None:
+        self.stream = stream
+        self.format = format
+        self.rows = 0
+        if format == "csv":
+            self._writer = csv.writer(stream, lineterminator="\n")
+            self._writer.writerow(BATCH_COLUMNS)
+
+    def write(self, rows: list) -> None:
+        for row_ in rows:
+            row_ = [_plain(value_) for value_ in row_]
+            if self.format == "csv":
+                self._writer.writerow(["" if v_ is None else v_ for v_ in row_])
+            else:
+                self.stream.write(json.dumps(dict(zip(BATCH_COLUMNS, row_))) + "\n")
+        self.rows += len(rows)
+        self.stream.flush()
+
+
+def _plain(value):
+    # Missing values are written as null (JSON) or empty (CSV)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _error(message: str) -> None:
+    sys.stderr.write(f"sealevelrise: error: {message}\n")
+    sys.stderr.flush()
+
+
+def _query(args: argparse.Namespace) -> int:
+    identifiers = list(args.locations)
+    if args.input is not None:
+        identifiers += _read_identifiers(args.input)
+    if not identifiers:
+        _error("no locations given; pass them as arguments or with --input")
+        return 2
+    years = np.unique(np.concatenate(args.years))
+    output = _Output(sys.stdout, args.format)
+    status = 0
+
+    if args.source == "builtin":
+        # Resolve identifiers once and keep the first occurrence of each key
+        keys = []
+        for identifier_ in identifiers:
+            try:
+                keys.append(_validate_key(key=identifier_))
+            except (KeyError, IndexError, TypeError) as error:
+                _error(f"{identifier_!r}: {error}")
+                status = 1
+        keys = list(dict.fromkeys(keys))
+        chunks = [
+            (keys[i_ : i_ + args.chunksize], years, args.units)
+            for i_ in range(0, len(keys), args.chunksize)
+        ]
+        results = _ordered_map(
+            _builtin_rows,
+            chunks,
+            max_workers=args.workers if len(chunks) > 1 else None,
+            return_exceptions=True,
+        )
+        session = None
+    else:
+        from sealevelrise import noaaapi
+
+        if args.offline:
+            noaaapi.configure_cache(offline=True)
+        if args.no_cache:
+            noaaapi.configure_cache(enabled=False)
+        session = noaaapi.NOAASession(max_connections=args.workers)
+        chunks = [
+            (station_, years, args.units, session)
+            for station_ in dict.fromkeys(identifiers)
+        ]
+        # Threads share the session and its pool of connections
+        results = _ordered_map(
+            _noaa_rows,
+            chunks,
+            max_workers=args.workers,
+            threads=True,
+            return_exceptions=True,
+        )
+
+    try:
+        for task_, result_ in zip(chunks, results):
+            if isinstance(result_, Exception):
+                _error(f"{task_[0]!r}: {type(result_).__name__}: {result_}")
+                status = 1
+            else:
+                output.write(result_)
+    except BrokenPipeError:
+        # The consumer stopped reading, e.g., piped into head; silence the
+        # flush of stdout at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return status
+    finally:
+        # Shuts the pool of workers down, if any
+        results.close()
+        if session is not None:
+            session.close()
+    return status
+
+
+def _list(args: argparse.Namespace) -> int:
+    output = csv.writer(sys.stdout, lineterminator="\n")
+    output.writerow(["key", "location", "issuer", "station_id"])
+    for entry_ in BUILTIN_CATALOG.headers.values():
+        output.writerow(
+            [entry_.key, entry_.location_name, entry_.issuer, entry_.station_id or ""]
+        )
+    return 0
+
+
+def _validate(args: argparse.Namespace) -> int:
+    from sealevelrise.catalog import BuiltinCatalog
+
+    catalog = BUILTIN_CATALOG if args.path is None else BuiltinCatalog(args.path)
+    report = catalog.validate()
+    for key_, errors_ in report.items():
+        for error_ in errors_:
+            sys.stdout.write(f"{key_}: {error_}\n")
+    sys.stderr.write(
+        f"sealevelrise: {len(catalog) - len(report)} of {len(catalog)} "
+        f"records are valid\n"
+    )
+    return 1 if report else 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from sealevelrise import noaaapi, server
+
+    if args.offline:
+        noaaapi.configure_cache(offline=True)
+    sys.stderr.write(f"sealevelrise: serving on http://{args.host}:{args.port}\n")
+    server.serve(
+        host=args.host,
+        port=args.port,
+        preload=not args.no_preload,
+        noaa_stations=args.noaa or (),
+    )
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sealevelrise",
+        description="Bulk queries of sea level rise projections.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query = commands.add_parser(
+        "query",
+        help="evaluate projections at horizon years",
+        description=(
+            "Evaluates every scenario of each location at the horizon years and "
+            "streams one row per (key, scenario, year) to stdout."
+        ),
+    )
+    query.add_argument(
+        "locations",
+        nargs="*",
+        help="keys, location names, station IDs or aliases of the projections",
+    )
+    query.add_argument(
+        "-i",
+        "--input",
+        help="file with one location per line ('-' for stdin)",
+    )
+    query.add_argument(
+        "-y",
+        "--years",
+        type=_parse_years,
+        action="append",
+        required=True,
+        help="YEAR, START:END or START:END:STEP (END included); repeatable",
+    )
+    query.add_argument(
+        "-u", "--units", choices=["m", "cm", "mm", "in", "ft"], default=None
+    )
+    query.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl")
+    query.add_argument(
+        "--source",
+        choices=["builtin", "noaa"],
+        default="builtin",
+        help="builtin scenarios (default) or NOAA projections by station ID",
+    )
+    query.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes (builtin) or concurrent requests (noaa)",
+    )
+    query.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="projection sets evaluated by each worker task (builtin)",
+    )
+    query.add_argument(
+        "--offline",
+        action="store_true",
+        help="only use cached NOAA responses",
+    )
+    query.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="neither read nor write the NOAA response cache",
+    )
+    query.set_defaults(run=_query)
+
+    listing = commands.add_parser("list", help="list the builtin projection sets")
+    listing.set_defaults(run=_list)
+
+    validation = commands.add_parser(
+        "validate",
+        help="check a JSON catalog against the schema",
+        description=(
+            "Checks every record of a JSON catalog in the schema of "
+            "'data/scenarios.json' and prints one line per problem."
+        ),
+    )
+    validation.add_argument(
+        "path", nargs="?", help="JSON catalog, by default the builtin one"
+    )
+    validation.set_defaults(run=_validate)
+
+    serving = commands.add_parser(
+        "serve",
+        help="serve projections over HTTP",
+        description="Runs the JSON HTTP service of sealevelrise.server.",
+    )
+    serving.add_argument("--host", default="127.0.0.1")
+    serving.add_argument("-p", "--port", type=int, default=8000)
+    serving.add_argument(
+        "--noaa",
+        action="append",
+        metavar="STATION",
+        help="load the NOAA projections of this station on start-up; repeatable",
+    )
+    serving.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="load builtin projection sets on first request only",
+    )
+    serving.add_argument(
+        "--offline",
+        action="store_true",
+        help="only use cached NOAA responses",
+    )
+    serving.set_defaults(run=_serve)
+    return parser
+
+
+def main(argv: typing.Sequence[str] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "workers", 1) < 1 or getattr(args, "chunksize", 1) < 1:
+        parser.error("--workers and --chunksize must be positive integers")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,15 @@
 import numpy as np
 import typing
+from .matrix import ScenarioMatrix
 from .utils import _check_units
-from .utils import M_TO_FT
+from .utils import _conversion_factor
 
 
 # Data class contains the actual projection
 class Data:
+    # Instances are views over one row of a ScenarioMatrix; no per-object dict
+    __slots__ = ("_matrix", "_row")
+
     def __init__(self, units: str, data: dict) -> None:
         """Data
 
@@ -18,6 +22,10 @@ class Data:
             containing the SLR values for each year
 
         """
+        # Check that the dictionary has the right keys
+        if not (("x" in data.keys()) and ("y" in data.keys())):
+            raise ValueError("Need 'x' and 'y' keys in the 'data' object")
+
         # Check for length of data
         if len(data["x"]) != len(data["y"]):
             raise ValueError(
@@ -27,18 +35,42 @@ class Data:
         # Check the units using the helper function
         _check_units(units=units)
 
-        # Check that the dictionary has the right keys
-        if not (("x" in data.keys()) and ("y" in data.keys())):
-            raise ValueError("Need 'x' and 'y' keys in the 'data' object")
-
         # Actually load the data; any null values are converted to nan by imposing dtype
-        self.x = np.array(data["x"], dtype=np.float)
-        self.y = np.array(data["y"], dtype=np.float)
-        self._units = units
+        self._matrix = ScenarioMatrix.from_rows(
+            x=[data["x"]],
+            y=[data["y"]],
+            units=[units],
+            descriptions=[None],
+            short_names=[None],
+            probabilities=[None],
+            baseline_years=[None],
+        )
+        self._row = 0
+
+    @classmethod
+    def _view(cls, matrix: ScenarioMatrix, row: int) -> "Data":
+        """Creates a Data instance backed by one row of an existing ScenarioMatrix"""
+        view = cls.__new__(cls)
+        view._matrix = matrix
+        view._row = row
+        return view
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._matrix.row_x(self._row)
+
+    @property
+    def y(self) -> np.ndarray:
+        # Read-only; assign a new array to data.y to change the values
+        return self._matrix.row_y(self._row)
+
+    @y.setter
+    def y(self, values: np.ndarray) -> None:
+        self._matrix.set_row_y(self._row, values)
 
     @property
     def units(self):
-        return self._units
+        return self._matrix.units[self._row]
 
     def convert(
         self, to_units: str, inplace: bool = False
@@ -64,58 +96,28 @@ class Data:
         # Check the units
         _check_units(to_units)
 
-        # Change the units of the y value on the spot
-        if self.units == "ft":
-            if to_units == "in":
-                fac = 12.0
-            if to_units == "ft":
-                fac = 1.0
-            if to_units == "m":
-                fac = 1 / M_TO_FT
-            if to_units == "cm":
-                fac = 1 / M_TO_FT * 100
-            if to_units == "mm":
-                fac = 1 / M_TO_FT * 1000
-        if self.units == "in":
-            if to_units == "in":
-                fac = 1.0
-            if to_units == "ft":
-                fac = 1 / 12.0
-            if to_units == "m":
-                fac = 1 / 12.0 * 1 / M_TO_FT
-            if to_units == "cm":
-                fac = 1 / 12.0 * 1 / M_TO_FT * 100
-            if to_units == "mm":
-                fac = 1 / 12.0 * 1 / M_TO_FT * 1000
-        if self.units == "m":
-            if to_units == "in":
-                fac = 12.0 * M_TO_FT
-            if to_units == "ft":
-                fac = M_TO_FT
-            if to_units == "m":
-                fac = 1.0
-            if to_units == "cm":
-                fac = 100.0
-            if to_units == "mm":
-                fac = 1000.0
-        if self.units == "cm":
-            if to_units == "in":
-                fac = 12.0 * M_TO_FT * 1 / 100.0
-            if to_units == "ft":
-                fac = M_TO_FT * 1 / 100
-            if to_units == "m":
-                fac = 1 / 100.0
-            if to_units == "cm":
-                fac = 1.0
-            if to_units == "mm":
-                fac = 10.0
-
         # Apply the transformation
         if inplace:
-            self.y = self.y * fac
-            self._units = to_units
+            self._matrix.convert_row(self._row, to_units=to_units)
         else:
-            return self.y * fac
+            return self.y * _conversion_factor(self.units, to_units)
+
+    def as_units(self, to_units: str) -> "Data":
+        """Returns a Data view with values expressed in to_units, leaving this
+        instance untouched
+
+        Parameters
+        ----------
+        to_units : str
+            Name of the units of the view, must be one of 'm', 'ft', 'in', 'mm',
+            and 'cm'
+
+        Returns
+        -------
+        Data
+            A new Data instance sharing the years and metadata of this one
+        """
+        return Data._view(self._matrix.as_units(to_units), self._row)
 
     def __repr__(self) -> str:
         s = f"Data in {self.units} ranging from {self.x[0]} to {self.x[-1]}"
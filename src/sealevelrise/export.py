@@ -0,0 +1,338 @@
+import abc
+import gzip
+import json
+import typing
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame
+
+from sealevelrise.batch import BATCH_COLUMNS, TIMELINE_COLUMNS, iter_query
+from sealevelrise.catalog import Catalog
+from sealevelrise.utils import BUILTIN_CATALOG, _validate_key
+
+# pyarrow is optional; it is only needed to write Parquet and Arrow IPC files
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# Key of the projection set metadata in Parquet and Arrow schemas
+METADATA_KEY = "sealevelrise"
+
+# Arrow types of the columns of batch tables, by alias, used for tables with
+# exactly the columns of BATCH_COLUMNS or TIMELINE_COLUMNS. Types inferred from
+# the first chunk would be null for columns that happen to be empty in that chunk.
+ARROW_TYPES = {
+    **{column_: "string" for column_ in BATCH_COLUMNS + TIMELINE_COLUMNS},
+    "probability": "float64",
+    "year": "float64",
+    "value": "float64",
+}
+
+
+def projection_metadata(
+    keys: typing.Iterable[str], catalog: Catalog = BUILTIN_CATALOG
+) -> typing.Dict[str, dict]:
+    """Collects the metadata of projection sets from a catalog
+
+    Parameters
+    ----------
+    keys : iterable of str
+        Keys of the projection sets in the catalog
+    catalog : Catalog, optional
+        Catalog holding the projection sets, by default the builtin one
+
+    Returns
+    -------
+    dict
+        For each key, the location, station, issuer and URL of the set, and the
+        short name, units, probability and baseline year of each scenario as
+        published
+    """
+    metadata = dict()
+    for key_ in keys:
+        record = catalog.load(key_)
+        metadata[key_] = {
+            "location name": record.get("location name"),
+            "station ID (CO-OPS)": record.get("station ID (CO-OPS)"),
+            "issuer": record.get("issuer"),
+            "URL": record.get("URL"),
+            "scenarios": [
+                {
+                    "short name": scenario_.get("short name"),
+                    "units": scenario_.get("units"),
+                    "probability (CDF)": scenario_.get("probability (CDF)"),
+                    "baseline year": scenario_.get("baseline year"),
+                }
+                for scenario_ in record.get("scenarios", [])
+            ],
+        }
+    return metadata
+
+
+class ChunkWriter(abc.ABC):
+    """ChunkWriter writes a table incrementally, one DataFrame chunk at a time,
+    so that memory use is bounded by the size of a chunk.
+
+    The columns of the first chunk define the layout of the file; all following
+    chunks must have the same columns. Subclasses implement _open, _write and
+    _close. Nothing is created on disk until the first chunk is written.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the output file
+    metadata : dict
+        Metadata stored along with the table, e.g., from projection_metadata
+    rows : int
+        Number of rows written so far
+    """
+
+    def __init__(self, path: typing.Union[str, Path], metadata: dict = None) -> None:
+        self.path = Path(path)
+        self.metadata = dict() if metadata is None else metadata
+        self.rows = 0
+        self._columns = None
+        self._closed = False
+
+    def write(self, chunk: DataFrame) -> None:
+        """Appends the rows of chunk to the file"""
+        if self._closed:
+            raise ValueError(f"{self.path} is already closed.")
+        if self._columns is None:
+            self._columns = list(chunk.columns)
+            self._open(chunk)
+        elif list(chunk.columns) != self._columns:
+            raise ValueError(
+                f"Chunk columns {list(chunk.columns)} do not match {self._columns}."
+            )
+        if len(chunk):
+            self._write(chunk)
+            self.rows += len(chunk)
+
+    def close(self) -> None:
+        if not self._closed and self._columns is not None:
+            self._close()
+        self._closed = True
+
+    @abc.abstractmethod
+    def _open(self, chunk: DataFrame) -> None:
+        """Creates the file, given the first chunk"""
+
+    @abc.abstractmethod
+    def _write(self, chunk: DataFrame) -> None:
+        """Appends the rows of a chunk to the file"""
+
+    @abc.abstractmethod
+    def _close(self) -> None:
+        """Flushes and closes the file"""
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}('{self.path}', {self.rows} rows)"
+
+
+class CSVWriter(ChunkWriter):
+    """Writes CSV files, gzip-compressed if the path ends with '.gz'. The
+    metadata is stored as JSON in a companion file named after the path with
+    '.json' appended, e.g., 'results.csv.json'."""
+
+    @property
+    def metadata_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".json")
+
+    def _open(self, chunk: DataFrame) -> None:
+        if self.path.suffix == ".gz":
+            self._file = gzip.open(self.path, mode="wt", newline="", encoding="utf-8")
+        else:
+            self._file = open(self.path, mode="w", newline="", encoding="utf-8")
+        chunk.iloc[:0].to_csv(self._file, index=False)
+        with open(self.metadata_path, mode="w", encoding="utf-8") as f:
+            json.dump(self.metadata, f, indent=4)
+
+    def _write(self, chunk: DataFrame) -> None:
+        chunk.to_csv(self._file, header=False, index=False)
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class _ArrowChunkWriter(ChunkWriter):
+    # The schema, with the metadata attached, is enforced on all chunks: batch
+    # tables get their types from ARROW_TYPES, and other tables the types
+    # inferred from the first chunk
+    def __init__(self, path: typing.Union[str, Path], metadata: dict = None) -> None:
+        if pyarrow is None:
+            raise ImportError(
+                "pyarrow is required to write Parquet and Arrow files; install "
+                "sealevelrise[export]."
+            )
+        super().__init__(path=path, metadata=metadata)
+        self._schema = None
+        self._writer = None
+
+    def _open(self, chunk: DataFrame) -> None:
+        schema = pyarrow.Schema.from_pandas(chunk, preserve_index=False)
+        if self._columns in (BATCH_COLUMNS, TIMELINE_COLUMNS):
+            for position_, name_ in enumerate(schema.names):
+                field = pyarrow.field(name_, pyarrow.type_for_alias(ARROW_TYPES[name_]))
+                schema = schema.set(position_, field)
+        self._schema = schema.with_metadata(
+            dict(schema.metadata or {}, **{METADATA_KEY: json.dumps(self.metadata)})
+        )
+
+    def _table(self, chunk: DataFrame) -> "pyarrow.Table":
+        return pyarrow.Table.from_pandas(
+            chunk, schema=self._schema, preserve_index=False
+        )
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class ParquetWriter(_ArrowChunkWriter):
+    """Writes Parquet files, one row group per chunk; requires pyarrow. The
+    metadata is stored as JSON in the schema, under METADATA_KEY."""
+
+    def __init__(
+        self,
+        path: typing.Union[str, Path],
+        metadata: dict = None,
+        compression: str = "zstd",
+    ) -> None:
+        super().__init__(path=path, metadata=metadata)
+        self.compression = compression
+
+    def _open(self, chunk: DataFrame) -> None:
+        super()._open(chunk)
+        self._writer = pyarrow.parquet.ParquetWriter(
+            self.path, self._schema, compression=self.compression
+        )
+
+    def _write(self, chunk: DataFrame) -> None:
+        self._writer.write_table(self._table(chunk))
+
+
+class ArrowWriter(_ArrowChunkWriter):
+    """Writes Arrow IPC (Feather v2) files, one record batch per chunk; requires
+    pyarrow. The metadata is stored as JSON in the schema, under METADATA_KEY."""
+
+    def _open(self, chunk: DataFrame) -> None:
+        super()._open(chunk)
+        self._writer = pyarrow.ipc.new_file(str(self.path), self._schema)
+
+    def _write(self, chunk: DataFrame) -> None:
+        self._writer.write_table(self._table(chunk))
+
+
+_WRITERS = {
+    "csv": CSVWriter,
+    "parquet": ParquetWriter,
+    "arrow": ArrowWriter,
+}
+_SUFFIXES = {
+    ".csv": "csv",
+    ".gz": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".ipc": "arrow",
+    ".feather": "arrow",
+}
+
+
+def export(
+    chunks: typing.Union[DataFrame, typing.Iterable[DataFrame]],
+    path: typing.Union[str, Path],
+    format: str = None,
+    metadata: dict = None,
+    **options,
+) -> int:
+    """Writes a table given as an iterator of DataFrame chunks to a file, without
+    ever holding more than one chunk in memory
+
+    Parameters
+    ----------
+    chunks : DataFrame or iterable of DataFrame
+        Chunks of the table, all with the same columns, e.g., from
+        batch.iter_query; a single DataFrame is written as one chunk
+    path : str or Path
+        Location of the output file
+    format : str, optional
+        One of 'csv', 'parquet' and 'arrow'; by default inferred from the suffix
+        of path ('.csv', '.csv.gz', '.parquet', '.pq', '.arrow', '.ipc',
+        '.feather')
+    metadata : dict, optional
+        Metadata stored along with the table, e.g., from projection_metadata
+    **options
+        Passed to the writer, e.g., compression='snappy' for Parquet
+
+    Returns
+    -------
+    int
+        Number of rows written
+    """
+    if format is None:
+        format = _SUFFIXES.get(Path(path).suffix.lower())
+        if format is None:
+            raise ValueError(f"Cannot infer the format of '{path}'; pass format.")
+    if format not in _WRITERS:
+        raise ValueError(f"format must be one of {list(_WRITERS)}.")
+    if isinstance(chunks, DataFrame):
+        chunks = [chunks]
+    with _WRITERS[format](path=path, metadata=metadata, **options) as writer:
+        for chunk_ in chunks:
+            writer.write(chunk_)
+    return writer.rows
+
+
+def export_query(
+    locations: typing.Sequence[typing.Union[str, int]],
+    horizon_years: typing.Union[float, typing.Sequence[float], np.ndarray],
+    path: typing.Union[str, Path],
+    units: str = None,
+    format: str = None,
+    coerce_errors: bool = True,
+    max_workers: int = None,
+    chunksize: int = 16,
+    **options,
+) -> int:
+    """Evaluates the builtin projections of many locations at many horizon years
+    and streams the long-format table to a file, along with the metadata of each
+    projection set
+
+    Parameters are those of batch.query and export.
+
+    Returns
+    -------
+    int
+        Number of rows written
+
+    Examples
+    --------
+    >>> export_query(BUILTIN_CATALOG, range(2020, 2151), "projections.parquet")
+    """
+    keys = list(dict.fromkeys(_validate_key(key=location_) for location_ in locations))
+    return export(
+        iter_query(
+            keys,
+            horizon_years,
+            units=units,
+            coerce_errors=coerce_errors,
+            max_workers=max_workers,
+            chunksize=chunksize,
+        ),
+        path=path,
+        format=format,
+        metadata=projection_metadata(keys),
+        **options,
+    )
@@ -1,18 +1,36 @@
-import urllib.request
-import json
-import warnings
 import re
 from typing import Union
 
 import numpy as np
 
-from functools import cache
-from sealevelrise.utils import _check_units
+from sealevelrise.memo import MemoCache
+from sealevelrise.noaaapi import NOAASession, fetch_json
+from sealevelrise.utils import _check_units, _conversion_factor
 from sealevelrise.slrprojections import Scenarios
-from pandas import Timestamp, DataFrame, date_range, DateOffset, Series
+from pandas import DatetimeIndex, Timestamp, DataFrame, date_range, DateOffset, Series
 
+# Length of the mean Gregorian year, used to express trends per year
+_YEAR = np.timedelta64(int(365.2425 * 86400 * 10**9), "ns")
 
-class HistoricalSLR:
+# Instances are shared by all callers asking for the same station and units
+HISTORICAL_CACHE = MemoCache(maxsize=256, ttl=None)
+
+
+class _MemoizedHistorical(type):
+    # Returns the memoized instance for (station_ID, units) when available;
+    # unpickling bypasses this and restores instances without any request
+    def __call__(
+        cls, station_ID: str = None, units: str = None, session: NOAASession = None
+    ):
+        return HISTORICAL_CACHE.get_or_create(
+            (cls, station_ID, units),
+            lambda: type.__call__(
+                cls, station_ID=station_ID, units=units, session=session
+            ),
+        )
+
+
+class HistoricalSLR(metaclass=_MemoizedHistorical):
     """HistoricalSLR will attempt to download and retrieve historical Sea Level
     Rise data for a particular location. Station ID and units must be provided.
 
@@ -31,10 +49,18 @@ class HistoricalSLR:
     from_Scenarios(cls, Scenarios):
         Will attempt to retrieve historical SLR information from NOAA servers using
         a Scenarios instance as a seed.
+    invalidate(station_ID, units):
+        Drops memoized instances so that the next call retrieves fresh data.
+    cache_stats():
+        Hit, miss, and eviction counters of the memoized instances.
+
+    Instances are memoized by (station_ID, units) in HISTORICAL_CACHE, a bounded
+    LRU cache: creating the same HistoricalSLR twice returns the same object.
     """
 
-    @cache
-    def __init__(self, station_ID: str = None, units: str = None) -> None:
+    def __init__(
+        self, station_ID: str = None, units: str = None, session: NOAASession = None
+    ) -> None:
 
         """[summary]
 
@@ -45,24 +71,18 @@ class HistoricalSLR:
         """
         _check_units(units)
         self._station_ID = station_ID
-        self._base_URL = (
-            "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi/product"
-            "/sealvltrends.json"
-        )
-
-        # Get the trend object from NOAA API
-        link = rf"{self._base_URL}" rf"/?station={self._station_ID}" rf"&affil=US"
 
-        # Load and append
-        with urllib.request.urlopen(link) as url:
-            try:
-                data = json.loads(url.read())["SeaLvlTrends"][0]
-            except ConnectionError:
-                warnings.warn("Something came up while retrieving data from NOAA")
+        # Get the trend object from NOAA API, or from the response cache
+        data = fetch_json(
+            "sealvltrends.json",
+            {"station": self._station_ID, "affil": "US"},
+            session=session,
+        )["SeaLvlTrends"][0]
 
         self._data = data
 
         # Parse data and write to object
+        self.units = units
         self._zero_year = 2000
         self.trend = data["trend"]
         self.trend_error = data["trendError"]
@@ -73,8 +93,8 @@ class HistoricalSLR:
         except ValueError:
             raise ValueError("Unable to parse start and end dates from response.")
 
-        # Build the historical trend
-        self.timeseries = self._build_timeseries()
+        # The historical trend is only evaluated when requested
+        self._timeseries = None
 
     def noaa_properties(self, format: str = None) -> Union[DataFrame, str]:
         """Properties describing the HistoricalSLR object as provided by NOAA.
@@ -124,33 +144,89 @@ class HistoricalSLR:
             )
             return out_str
 
-    def _build_timeseries(self) -> Series:
-
-        index = date_range(
-            start=Timestamp(self.start_date.year, 6, 15),
-            end=Timestamp(self.end_date.year, 6, 15),
-            freq=DateOffset(years=1),
-        )
-        values = np.full_like(index, fill_value=np.nan, dtype=float)
-        values[0] = self.trend * (self.start_date.year - self._zero_year)
-        values[-1] = self.trend * (self.end_date.year - self._zero_year)
-
-        # Stitch it together
-        ts = (
-            DataFrame(
-                data=values,
+    @property
+    def timeseries(self) -> Series:
+        """Annual historical trend, mid-year, from the start to the end date of
+        the NOAA record, in trend_units; built on first access"""
+        if self._timeseries is None:
+            index = date_range(
+                start=Timestamp(self.start_date.year, 6, 15),
+                end=Timestamp(self.end_date.year, 6, 15),
+                freq=DateOffset(years=1),
+            )
+            self._timeseries = Series(
+                data=self.trend_at(index, bands=False)["trend"].to_numpy(),
                 index=index,
-                columns=[f"Historical SLR [{self.trend_units}]"],
+                name=f"Historical SLR [{self.trend_units}]",
             )
-            .interpolate(method="time")
-            .squeeze()
-        )
-        return ts
+        return self._timeseries
+
+    def trend_at(
+        self,
+        dates: Union[DatetimeIndex, np.ndarray, list, float],
+        units: str = None,
+        bands: bool = True,
+    ) -> DataFrame:
+        """Evaluates the linear historical trend at any dates
+
+        The trend is zero on June 15 of the zero year (2000), as for the annual
+        timeseries, and rises by trend per year of 365.2425 days. The band uses the
+        95% confidence interval of the trend, i.e., trend - trend_error and
+        trend + trend_error per year.
+
+        Parameters
+        ----------
+        dates : DatetimeIndex, datetimes, or floats
+            Date(s) of the evaluation, e.g., date_range("1950", "2020", freq="MS")
+            or "2020-06-01"; floats are read as decimal years, e.g., 1990.5
+        units : str, optional
+            Units of the values, one of 'm', 'mm', 'in', 'cm', and 'ft'; by
+            default trend_units
+        bands : bool, optional
+            If True (default), 'lower' and 'upper' columns are included
+
+        Returns
+        -------
+        DataFrame
+            Columns 'trend', and 'lower' and 'upper' if bands is True, indexed by
+            the dates
+        """
+        epoch = np.datetime64(f"{self._zero_year}-06-15", "ns")
+        values = np.asarray(dates)
+        if values.ndim == 0:
+            # A single date or decimal year gives a single row
+            dates = values = values.reshape(1)
+        if np.issubdtype(values.dtype, np.number):
+            # Decimal years count from January 1st of the zero year
+            start = np.datetime64(f"{self._zero_year}-01-01", "ns")
+            elapsed = values.astype(float) - self._zero_year - (epoch - start) / _YEAR
+            index = values
+        else:
+            index = DatetimeIndex(dates)
+            elapsed = (index.to_numpy(dtype="datetime64[ns]") - epoch) / _YEAR
+
+        factor = 1.0
+        if units is not None and units != self.trend_units:
+            _check_units(units)
+            factor = _conversion_factor(self.trend_units, units)
+
+        columns = {"trend": factor * self.trend * elapsed}
+        if bands:
+            low = factor * (self.trend - self.trend_error) * elapsed
+            high = factor * (self.trend + self.trend_error) * elapsed
+            # Before the zero year, the steeper trend gives the lower values
+            columns["lower"] = np.minimum(low, high)
+            columns["upper"] = np.maximum(low, high)
+        return DataFrame(data=columns, index=index)
 
     @classmethod
     def from_Scenarios(cls, Scenarios: Scenarios = None):
         # Read the station ID from the Scenarios
-        location = Scenarios.station_ID
+        location = Scenarios.station_id
+        if location is None:
+            raise ValueError(
+                "The Scenarios object has no station ID to look up historical data."
+            )
         units = Scenarios.units
         if not isinstance(units, str):
             raise TypeError(
@@ -158,3 +234,24 @@ class HistoricalSLR:
                 "Cannot infer units."
             )
         return cls(station_ID=location, units=units)
+
+    @classmethod
+    def invalidate(cls, station_ID: str = None, units: str = None) -> int:
+        """Drops memoized instances matching the station and/or units given;
+        all instances are dropped if neither is given
+
+        Returns
+        -------
+        int
+            Number of instances dropped
+        """
+        return HISTORICAL_CACHE.invalidate(
+            lambda key_: issubclass(key_[0], cls)
+            and (station_ID is None or key_[1] == station_ID)
+            and (units is None or key_[2] == units)
+        )
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Counters and size of the memoized instances"""
+        return HISTORICAL_CACHE.stats()
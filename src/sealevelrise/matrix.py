@@ -0,0 +1,508 @@
+import copy
+import typing
+
+import numpy as np
+
+from sealevelrise.utils import _check_units, _conversion_factor
+
+
+# ScenarioMatrix stores all trajectories of a set of scenarios column-wise
+class ScenarioMatrix:
+    """ScenarioMatrix is the columnar backend shared by Scenarios, Scenario and Data.
+
+    All trajectories are laid out on one shared, sorted year axis. Values are kept
+    in a scenarios x years matrix padded with NaN where a scenario does not define
+    a year, and a boolean mask records which cells were actually provided. Per
+    scenario metadata is stored column-wise as well, so Scenario and Data objects
+    are only views over one row of the matrix.
+
+    Attributes
+    ----------
+    years : np.ndarray
+        Shared year axis, shape (n_years,)
+    values : np.ndarray
+        SLR values, shape (n_scenarios, n_years); null values are stored as NaN
+    mask : np.ndarray
+        True where a scenario provides a value for a year, shape (n_scenarios,
+        n_years)
+    units : list
+        Units of each row, one of 'ft', 'in', 'm', 'mm', and 'cm'
+    descriptions, short_names, baseline_years : list
+        Metadata of each row
+    probabilities : np.ndarray
+        Probability (CDF) of each row, NaN where not available
+    """
+
+    def __init__(
+        self,
+        years: np.ndarray,
+        values: np.ndarray,
+        mask: np.ndarray,
+        units: typing.List[str],
+        descriptions: typing.List[str],
+        short_names: typing.List[str],
+        probabilities: np.ndarray,
+        baseline_years: typing.List[int],
+    ) -> None:
+        self.years = years
+        self.values = values
+        self.mask = mask
+        self.units = units
+        self.descriptions = descriptions
+        self.short_names = short_names
+        self.probabilities = probabilities
+        self.baseline_years = baseline_years
+        self._version = 0
+        self._derived = None
+        self._frames = dict()
+        self._columns = [_contiguous(row_) for row_ in mask]
+
+    @classmethod
+    def from_rows(
+        cls,
+        x: typing.Sequence[typing.Sequence[float]],
+        y: typing.Sequence[typing.Sequence[float]],
+        units: typing.Sequence[str],
+        descriptions: typing.Sequence[str],
+        short_names: typing.Sequence[str],
+        probabilities: typing.Sequence[typing.Optional[float]],
+        baseline_years: typing.Sequence[int],
+    ) -> "ScenarioMatrix":
+        """Lays out several (x, y) trajectories on a shared year axis
+
+        Parameters
+        ----------
+        x, y : sequence of sequences
+            Years and SLR values of each trajectory; null values are allowed in y
+        units, descriptions, short_names, probabilities, baseline_years : sequence
+            Metadata of each trajectory, one item per trajectory
+
+        Returns
+        -------
+        ScenarioMatrix
+            A new ScenarioMatrix instance
+
+        Raises
+        ------
+        ValueError
+            If a trajectory does not have as many years as values, or repeats a year
+        """
+        x = [np.asarray(x_, dtype=float) for x_ in x]
+        y = [np.asarray(y_, dtype=float) for y_ in y]
+        if len(x) != len(y):
+            raise ValueError(f"Got years for {len(x)} rows but values for {len(y)}.")
+        years = np.unique(np.concatenate(x)) if x else np.empty(0)
+
+        values = np.full((len(x), years.size), np.nan)
+        mask = np.zeros((len(x), years.size), dtype=bool)
+        for row_, (x_, y_) in enumerate(zip(x, y)):
+            name = short_names[row_]
+            label = f"Row {row_}" if name is None else f"Scenario '{name}'"
+            if x_.shape != y_.shape:
+                raise ValueError(f"{label} has {x_.size} years but {y_.size} values.")
+            cols = np.searchsorted(years, x_)
+            values[row_, cols] = y_
+            mask[row_, cols] = True
+            # Repeated years land in the same column
+            if np.count_nonzero(mask[row_]) != x_.size:
+                sorted_x = np.sort(x_)
+                repeated = np.unique(sorted_x[1:][np.diff(sorted_x) == 0])
+                raise ValueError(f"{label} repeats years {repeated.tolist()}.")
+
+        return cls(
+            years=years,
+            values=values,
+            mask=mask,
+            units=list(units),
+            descriptions=list(descriptions),
+            short_names=list(short_names),
+            probabilities=np.array(
+                [np.nan if p_ is None else p_ for p_ in probabilities], dtype=float
+            ),
+            baseline_years=list(baseline_years),
+        )
+
+    @classmethod
+    def stack(
+        cls, rows: typing.Sequence[typing.Tuple["ScenarioMatrix", int]]
+    ) -> "ScenarioMatrix":
+        """Builds a new matrix out of rows taken from other matrices
+
+        Parameters
+        ----------
+        rows : sequence of (ScenarioMatrix, int)
+            The matrix and row index of every trajectory to include, in order
+
+        Returns
+        -------
+        ScenarioMatrix
+            A new ScenarioMatrix instance that does not share data with its sources
+        """
+        return cls.from_rows(
+            x=[matrix_.row_x(row_) for matrix_, row_ in rows],
+            y=[matrix_.row_y(row_) for matrix_, row_ in rows],
+            units=[matrix_.units[row_] for matrix_, row_ in rows],
+            descriptions=[matrix_.descriptions[row_] for matrix_, row_ in rows],
+            short_names=[matrix_.short_names[row_] for matrix_, row_ in rows],
+            probabilities=[matrix_.probabilities[row_] for matrix_, row_ in rows],
+            baseline_years=[matrix_.baseline_years[row_] for matrix_, row_ in rows],
+        )
+
+    def freeze(self) -> "ScenarioMatrix":
+        """Makes every array of this matrix read-only and its metadata immutable,
+        so that it can be shared, e.g., by all callers of Scenarios.from_builtin.
+        Derived arrays are built now, once for all sharers.
+
+        Returns
+        -------
+        ScenarioMatrix
+            This matrix
+        """
+        cache = self._cache
+        for array_ in [self.years, self.values, self.mask, self.probabilities]:
+            array_.flags.writeable = False
+        for value_ in list(cache.values()) + self._columns:
+            if isinstance(value_, np.ndarray):
+                value_.flags.writeable = False
+        self.units = tuple(self.units)
+        self.descriptions = tuple(self.descriptions)
+        self.short_names = tuple(self.short_names)
+        self.baseline_years = tuple(self.baseline_years)
+        return self
+
+    def share(self) -> "ScenarioMatrix":
+        """Returns a new matrix sharing the arrays, metadata, derived arrays and
+        frames of this one, without any copy. Since changes replace arrays rather
+        than writing into them, changing either matrix leaves the other one
+        untouched (copy on write).
+        """
+        return copy.copy(self)
+
+    def copy(self) -> "ScenarioMatrix":
+        """Returns an independent matrix with writeable copies of all arrays"""
+        return ScenarioMatrix(
+            years=self.years.copy(),
+            values=self.values.copy(),
+            mask=self.mask.copy(),
+            units=list(self.units),
+            descriptions=list(self.descriptions),
+            short_names=list(self.short_names),
+            probabilities=self.probabilities.copy(),
+            baseline_years=list(self.baseline_years),
+        )
+
+    @property
+    def shape(self) -> typing.Tuple[int, int]:
+        return self.values.shape
+
+    def row_x(self, row: int) -> np.ndarray:
+        """Years provided by a row; a read-only view whenever the row is
+        contiguous"""
+        return self.readonly(self.years[self._columns[row]])
+
+    def row_y(self, row: int) -> np.ndarray:
+        """Values provided by a row; a read-only view whenever the row is
+        contiguous. Writes must go through set_row_y, so that derived arrays and
+        frames are refreshed."""
+        return self.readonly(self.values[row, self._columns[row]])
+
+    # Changes never write into existing arrays but replace them, so that frames
+    # and arrays handed out earlier remain consistent snapshots
+
+    def set_row_y(self, row: int, y: np.ndarray) -> None:
+        values = self.values.copy()
+        values[row, self._columns[row]] = y
+        self.values = values
+        self._touch()
+
+    def _touch(self) -> None:
+        # Any change to values or units invalidates derived arrays and frames
+        self._version += 1
+        self._derived = None
+        self._frames = dict()
+
+    def convert_row(self, row: int, to_units: str) -> None:
+        """Converts the values of a single row"""
+        _check_units(to_units)
+        factors = np.ones(self.values.shape[0])
+        factors[row] = _conversion_factor(self.units[row], to_units)
+        self.values = self.values * factors[:, np.newaxis]
+        self.units = list(self.units)
+        self.units[row] = to_units
+        self._touch()
+
+    def convert(self, to_units: str) -> None:
+        """Converts the values of all rows with a single multiplication"""
+        _check_units(to_units)
+        factors = np.array(
+            [_conversion_factor(units_, to_units) for units_ in self.units]
+        )
+        self.values = self.values * factors[:, np.newaxis]
+        self.units = [to_units] * len(self.units)
+        self._touch()
+
+    def frame(self, key: typing.Hashable, build: typing.Callable[[], typing.Any]):
+        """Returns the DataFrame cached under key, building it on first use.
+        Cached frames are dropped whenever values or units change.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the frame, e.g., 'all' or ('row', 0)
+        build : callable
+            Function building the frame from the current state of the matrix
+        """
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = self._frames[key] = build()
+        return frame
+
+    def readonly(self, array: np.ndarray) -> np.ndarray:
+        """Returns a read-only view of an array of this matrix, without copy"""
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def as_units(self, to_units: str) -> "ScenarioMatrix":
+        """Returns a unit-converted view of this matrix
+
+        The view shares the year axis, the mask, and all metadata with this
+        matrix; only the values are scaled, with a single multiplication.
+
+        Parameters
+        ----------
+        to_units : str
+            Units of the view, one of 'ft', 'in', 'm', 'mm', and 'cm'
+
+        Returns
+        -------
+        ScenarioMatrix
+            A new ScenarioMatrix instance in the requested units
+        """
+        _check_units(to_units)
+        factors = np.array(
+            [_conversion_factor(units_, to_units) for units_ in self.units]
+        )
+        view = copy.copy(self)
+        view.values = self.values * factors[:, np.newaxis]
+        view.units = [to_units] * len(self.units)
+        view._version = 0
+        view._derived = None
+        view._frames = dict()
+        return view
+
+    def _build_derived(self) -> dict:
+        # Bounds of each row and every row resampled on the shared year axis;
+        # cells outside of a row's bounds are NaN. Null values propagate to the
+        # neighboring intervals, as np.interp would on the original row.
+        n_rows = self.values.shape[0]
+        lower = np.full(n_rows, np.nan)
+        upper = np.full(n_rows, np.nan)
+        filled = np.full(self.values.shape, np.nan)
+        for row_ in range(n_rows):
+            x_ = self.row_x(row_)
+            if x_.size == 0:
+                continue
+            lower[row_], upper[row_] = x_[0], x_[-1]
+            inside = (self.years >= x_[0]) & (self.years <= x_[-1])
+            filled[row_, inside] = np.interp(self.years[inside], x_, self.row_y(row_))
+        return {"lower": lower, "upper": upper, "filled": filled}
+
+    @property
+    def _cache(self) -> dict:
+        if self._derived is None:
+            self._derived = self._build_derived()
+        return self._derived
+
+    @property
+    def lower(self) -> np.ndarray:
+        """First year provided by each row"""
+        return self._cache["lower"]
+
+    @property
+    def upper(self) -> np.ndarray:
+        """Last year provided by each row"""
+        return self._cache["upper"]
+
+    @property
+    def filled(self) -> np.ndarray:
+        """Every row resampled on the shared year axis, NaN outside of its bounds"""
+        return self._cache["filled"]
+
+    def derived(self, key: typing.Hashable, build: typing.Callable[[], typing.Any]):
+        """Returns the object derived from the matrix cached under key, building
+        it on first use. Derived objects are dropped whenever values or units
+        change.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the object, e.g., ('surface', 'ft')
+        build : callable
+            Function building the object from the current state of the matrix
+        """
+        cache = self._cache
+        if key not in cache:
+            cache[key] = build()
+        return cache[key]
+
+    def interp(
+        self,
+        years: typing.Union[float, np.ndarray],
+        rows: typing.Union[int, typing.Sequence[int], slice] = slice(None),
+        coerce_errors: bool = True,
+    ) -> np.ndarray:
+        """Linearly interpolates rows at the requested years in one batched operation
+
+        Parameters
+        ----------
+        years : float or np.ndarray
+            Year(s) at which to interpolate the trajectories
+        rows : int, sequence of int, or slice, optional
+            Rows to interpolate, by default all of them
+        coerce_errors : bool, optional
+            If True (default), years outside of a row's bounds are returned as NaN;
+            if False, a ValueError is raised instead
+
+        Returns
+        -------
+        np.ndarray
+            Interpolated values of shape (n_rows,) + np.shape(years), or
+            np.shape(years) if a single int row was requested
+
+        Raises
+        ------
+        ValueError
+            If coerce_errors is False and a year is outside of a row's bounds
+        """
+        query = np.asarray(years, dtype=float)
+        flat = query.ravel()
+        grid = self.years
+        single_row = isinstance(rows, (int, np.integer))
+        if single_row:
+            rows = [rows]
+        filled = self._cache["filled"][rows]
+        lower = self.lower[rows][:, np.newaxis]
+        upper = self.upper[rows][:, np.newaxis]
+
+        outside = (flat < lower) | (flat > upper)
+        if not coerce_errors and outside.any():
+            # Report the bounds of the first offending row, not of the others
+            position, column = np.argwhere(outside)[0]
+            row = np.arange(self.values.shape[0])[rows][position]
+            raise ValueError(
+                f"Target year {flat[column]} is out of bounds for this location; "
+                f"scenario '{self.short_names[row]}' ranges from "
+                f"{lower[position, 0]} to {upper[position, 0]}."
+            )
+
+        if grid.size == 0:
+            # No row provides any year
+            result = np.full((filled.shape[0], flat.size), np.nan)
+        elif grid.size < 2:
+            result = np.where(flat == grid[0], filled[:, :1], np.nan)
+        else:
+            left_col = np.clip(
+                np.searchsorted(grid, flat, side="right") - 1, 0, grid.size - 2
+            )
+            weight = (flat - grid[left_col]) / (grid[left_col + 1] - grid[left_col])
+            left = filled[:, left_col]
+            right = filled[:, left_col + 1]
+            # Exact grid points must not be polluted by a NaN neighbor
+            result = np.where(
+                weight == 0.0,
+                left,
+                np.where(weight == 1.0, right, left + weight * (right - left)),
+            )
+
+        result[outside] = np.nan
+        if single_row:
+            return result.reshape(query.shape)
+        return result.reshape(filled.shape[:1] + query.shape)
+
+    def _envelope(self, row: int) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Years and values of a row with null values skipped, and the running
+        # maximum of the values, which is sorted and can be searched
+        x = self.row_x(row)
+        y = self.row_y(row)
+        valid = ~np.isnan(y)
+        x, y = x[valid], y[valid]
+        return x, y, np.maximum.accumulate(y) if y.size else y
+
+    def crossing_years(
+        self,
+        thresholds: typing.Union[float, np.ndarray],
+        rows: typing.Union[int, typing.Sequence[int], slice] = slice(None),
+        units: str = None,
+    ) -> np.ndarray:
+        """Year at which each row first reaches each threshold
+
+        Null values are skipped and the trajectory is interpolated linearly over
+        the gap. The first crossing is found by searching the running maximum of
+        each row, which is sorted even where a trajectory decreases.
+
+        Parameters
+        ----------
+        thresholds : float or np.ndarray
+            SLR threshold(s)
+        rows : int, sequence of int, or slice, optional
+            Rows to search, by default all of them
+        units : str, optional
+            Units of the thresholds, by default the units of each row
+
+        Returns
+        -------
+        np.ndarray
+            Crossing years of shape (n_rows,) + np.shape(thresholds), or
+            np.shape(thresholds) if a single int row was requested. Thresholds
+            never reached within the years of a row are np.inf; thresholds already
+            exceeded at the first year of a row are -np.inf; NaN thresholds and
+            rows without values give NaN.
+        """
+        if units is not None:
+            _check_units(units)
+        query = np.asarray(thresholds, dtype=float)
+        flat = query.ravel()
+        single_row = isinstance(rows, (int, np.integer))
+        row_ids = np.arange(self.values.shape[0])[[rows] if single_row else rows]
+
+        result = np.full((row_ids.size, flat.size), np.nan)
+        for out_, row_ in enumerate(row_ids):
+            x, y, envelope = self.derived(
+                ("envelope", int(row_)), lambda: self._envelope(row_)
+            )
+            if y.size == 0:
+                continue
+            levels = flat
+            if units is not None:
+                levels = flat * _conversion_factor(units, self.units[row_])
+
+            # First point at or above each threshold
+            after = np.searchsorted(envelope, levels, side="left")
+            before = np.clip(after - 1, 0, None)
+            inside = np.clip(after, 0, y.size - 1)
+            # The envelope only rises where the trajectory reaches a new maximum,
+            # so the crossing lies on the segment ending at that point
+            with np.errstate(invalid="ignore", divide="ignore"):
+                weight = (levels - y[before]) / (y[inside] - y[before])
+                years = x[before] + weight * (x[inside] - x[before])
+            years = np.where(after == 0, x[0], years)
+            years = np.where((after == 0) & (y[0] > levels), -np.inf, years)
+            years = np.where(after == y.size, np.inf, years)
+            years[np.isnan(levels)] = np.nan
+            result[out_] = years
+
+        if single_row:
+            return result.reshape(query.shape)
+        return result.reshape((row_ids.size,) + query.shape)
+
+
+def _contiguous(mask_row: np.ndarray) -> typing.Union[slice, np.ndarray]:
+    # Rows covering a contiguous run of years are addressed with a slice so that
+    # their x and y arrays are views rather than copies
+    cols = np.flatnonzero(mask_row)
+    if cols.size == 0:
+        return slice(0, 0)
+    if cols[-1] - cols[0] + 1 == cols.size:
+        return slice(int(cols[0]), int(cols[-1]) + 1)
+    return cols
@@ -0,0 +1,159 @@
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+
+class MemoCache:
+    """MemoCache is a thread-safe, bounded memoization layer.
+
+    Values are kept in least recently used (LRU) order; once the cache holds more
+    than maxsize values, the least recently used ones are evicted. Values older
+    than the optional time-to-live are treated as missing.
+
+    Attributes
+    ----------
+    maxsize : int, optional
+        Maximum number of values held; None means the cache is unbounded
+    ttl : float, optional
+        Time-to-live of a value in seconds; None means values never expire
+    hits, misses, evictions, expirations : int
+        Counters describing the use of the cache since creation or reset_stats
+
+    Examples
+    --------
+    >>> memo = MemoCache(maxsize=2)
+    >>> memo.get_or_create("a", lambda: 1)
+    1
+    >>> memo.stats()["misses"]
+    1
+    """
+
+    def __init__(
+        self, maxsize: typing.Optional[int] = 128, ttl: typing.Optional[float] = None
+    ) -> None:
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be a positive integer or None.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key: typing.Hashable) -> typing.Tuple[bool, typing.Any]:
+        # Must be called with the lock held
+        try:
+            created, value = self._values[key]
+        except KeyError:
+            return False, None
+        if self.ttl is not None and time.monotonic() - created > self.ttl:
+            del self._values[key]
+            self.expirations += 1
+            return False, None
+        self._values.move_to_end(key)
+        return True, value
+
+    def _store(self, key: typing.Hashable, value: typing.Any) -> None:
+        # Must be called with the lock held
+        self._values[key] = (time.monotonic(), value)
+        self._values.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+        """Returns the value stored for key, or default if missing or expired"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def put(self, key: typing.Hashable, value: typing.Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_create(
+        self, key: typing.Hashable, factory: typing.Callable[[], typing.Any]
+    ) -> typing.Any:
+        """Returns the value stored for key, creating it with factory() if needed.
+
+        The factory runs outside of the lock so that slow creations (e.g., network
+        requests) for different keys can run concurrently. Nothing is stored if
+        the factory raises.
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = factory()
+        with self._lock:
+            # Another thread may have created the same value in the meantime
+            found, existing = self._lookup(key)
+            if found:
+                return existing
+            self._store(key, value)
+        return value
+
+    def invalidate(
+        self, predicate: typing.Callable[[typing.Hashable], bool] = None
+    ) -> int:
+        """Removes values from the cache
+
+        Parameters
+        ----------
+        predicate : callable, optional
+            Function called with each key; the value is removed if it returns
+            True. By default, all values are removed.
+
+        Returns
+        -------
+        int
+            Number of values removed
+        """
+        with self._lock:
+            if predicate is None:
+                removed = len(self._values)
+                self._values.clear()
+                return removed
+            keys = [key_ for key_ in self._values if predicate(key_)]
+            for key_ in keys:
+                del self._values[key_]
+            return len(keys)
+
+    def stats(self) -> dict:
+        """Counters and size of the cache"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "size": len(self._values),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key)[0]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return (
+            f"MemoCache(maxsize={self.maxsize}, ttl={self.ttl}, "
+            f"size={len(self._values)})"
+        )
@@ -0,0 +1,339 @@
+import hashlib
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import typing
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+# Root of the NOAA CO-OPS derived product API; can be redirected (e.g., to a
+# local stand-in server) with the SEALEVELRISE_NOAA_API_URL environment variable
+NOAA_API_URL = os.environ.get(
+    "SEALEVELRISE_NOAA_API_URL",
+    "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi/product",
+)
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get(
+        "SEALEVELRISE_CACHE_DIR", Path.home() / ".cache" / "sealevelrise" / "noaa"
+    )
+)
+
+
+class ResponseCache:
+    """ResponseCache persists raw NOAA API responses on disk.
+
+    Entries are keyed by endpoint and query parameters. An entry older than the
+    time-to-live is treated as missing, except in offline mode where a stale
+    response beats no response; once the cache grows beyond its size cap, the
+    least recently used entries are evicted first.
+
+    Attributes
+    ----------
+    directory : Path
+        Folder holding one file per cached response
+    ttl : float, optional
+        Time-to-live of an entry in seconds; None means entries never expire
+    max_bytes : int, optional
+        Size cap of the cache in bytes; None means the cache is unbounded
+    offline : bool
+        If True, responses are only served from the cache, expired or not, and
+        missing entries fail fast instead of reaching the network
+    enabled : bool
+        If False, the cache is bypassed altogether
+    """
+
+    def __init__(
+        self,
+        directory: typing.Union[str, Path] = DEFAULT_CACHE_DIR,
+        ttl: typing.Optional[float] = 24 * 3600.0,
+        max_bytes: typing.Optional[int] = 256 * 1024**2,
+        offline: bool = False,
+        enabled: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.enabled = enabled
+
+    @staticmethod
+    def key(endpoint: str, params: typing.Mapping[str, typing.Any]) -> str:
+        """Stable identifier of a request, independent of the order of params"""
+        canonical = json.dumps(
+            [endpoint, sorted((str(k_), str(v_)) for k_, v_ in params.items())]
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(
+        self, endpoint: str, params: typing.Mapping[str, typing.Any]
+    ) -> typing.Optional[bytes]:
+        """Returns the cached response, or None if missing or expired; expired
+        entries are still returned in offline mode"""
+        if not self.enabled:
+            return None
+        path = self._path(self.key(endpoint, params))
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        # The modification time records when the response was fetched
+        expired = self.ttl is not None and now - stat.st_mtime > self.ttl
+        if expired and not self.offline:
+            return None
+        try:
+            payload = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        # The access time records when the response was last used
+        os.utime(path, (now, stat.st_mtime))
+        return payload
+
+    def put(
+        self, endpoint: str, params: typing.Mapping[str, typing.Any], payload: bytes
+    ) -> None:
+        """Stores a response and evicts old entries if the size cap is exceeded"""
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(self.key(endpoint, params))
+        # Write to a temporary file first so readers never see partial entries
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+        if self.max_bytes is not None:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path_ in self.directory.glob("*.json"):
+            try:
+                stat = path_.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path_))
+        total = sum(size_ for _, size_, _ in entries)
+        for _, size_, path_ in sorted(entries, key=lambda entry_: entry_[0]):
+            if total <= self.max_bytes:
+                break
+            path_.unlink(missing_ok=True)
+            total -= size_
+
+    def clear(self) -> None:
+        """Removes all cached responses"""
+        for path_ in self.directory.glob("*.json"):
+            path_.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"ResponseCache('{self.directory}', ttl={self.ttl}, "
+            f"max_bytes={self.max_bytes}, offline={self.offline})"
+        )
+
+
+# Shared cache used by all NOAA requests unless another one is provided
+RESPONSE_CACHE = ResponseCache()
+
+
+def configure_cache(**kwargs) -> ResponseCache:
+    """Updates the settings of the shared ResponseCache, e.g.,
+    configure_cache(offline=True) or configure_cache(ttl=3600, directory='cache')
+
+    Returns
+    -------
+    ResponseCache
+        The shared ResponseCache instance
+    """
+    for name_, value_ in kwargs.items():
+        if not hasattr(RESPONSE_CACHE, name_):
+            raise AttributeError(f"ResponseCache has no setting named '{name_}'.")
+        if name_ == "directory":
+            value_ = Path(value_)
+        setattr(RESPONSE_CACHE, name_, value_)
+    return RESPONSE_CACHE
+
+
+class NOAASession:
+    """NOAASession sends requests over a pool of persistent (keep-alive) HTTP
+    connections, with bounded concurrency and optional client-side rate limiting.
+    A session is thread-safe and meant to be shared by many worker threads.
+
+    Attributes
+    ----------
+    max_connections : int
+        Maximum number of requests in flight, and of connections kept open per host
+    rate_limit : float, optional
+        Maximum number of requests started per second; None means no limit
+    timeout : float
+        Timeout of each request in seconds
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 8,
+        rate_limit: typing.Optional[float] = None,
+        timeout: float = 30.0,
+    ) -> None:
+        if max_connections < 1:
+            raise ValueError("max_connections must be a positive integer.")
+        if rate_limit is not None and rate_limit <= 0:
+            raise ValueError("rate_limit must be a positive number of requests/s.")
+        self.max_connections = max_connections
+        self.rate_limit = rate_limit
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._pools = dict()
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _wait_for_rate_limit(self) -> None:
+        if self.rate_limit is None:
+            return
+        # Reserve the next start time, then sleep outside of the lock
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + 1.0 / self.rate_limit
+        if start > now:
+            time.sleep(start - now)
+
+    def _pool(self, scheme: str, netloc: str) -> queue.LifoQueue:
+        with self._lock:
+            return self._pools.setdefault((scheme, netloc), queue.LifoQueue())
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        return http.client.HTTPConnection(netloc, timeout=self.timeout)
+
+    def get(self, url: str) -> bytes:
+        """Sends a GET request and returns the body of the response
+
+        Raises
+        ------
+        urllib.error.HTTPError
+            If the server answers with an error status
+        """
+        parts = urllib.parse.urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        pool = self._pool(parts.scheme, parts.netloc)
+
+        with self._slots:
+            self._wait_for_rate_limit()
+            # A pooled connection may have been closed by the server; in that
+            # case the request is retried once on a fresh connection
+            for attempt_ in range(2):
+                try:
+                    connection = pool.get_nowait()
+                    reused = True
+                except queue.Empty:
+                    connection = self._connect(parts.scheme, parts.netloc)
+                    reused = False
+                # The connection goes back to the pool only after a complete
+                # response; on any error, including timeouts, it is closed
+                keep = False
+                try:
+                    connection.request("GET", target)
+                    response = connection.getresponse()
+                    body = response.read()
+                    keep = not response.will_close
+                except (http.client.HTTPException, ConnectionError):
+                    if reused and attempt_ == 0:
+                        continue
+                    raise
+                finally:
+                    if keep:
+                        pool.put(connection)
+                    else:
+                        connection.close()
+                if response.status >= 400:
+                    raise urllib.error.HTTPError(
+                        url, response.status, response.reason, response.headers, None
+                    )
+                return body
+
+    def close(self) -> None:
+        """Closes all pooled connections"""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = dict()
+        for pool_ in pools:
+            while not pool_.empty():
+                pool_.get_nowait().close()
+
+    def __enter__(self) -> "NOAASession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def build_url(endpoint: str, params: typing.Mapping[str, typing.Any]) -> str:
+    """Builds the URL of a NOAA API product, e.g., 'sealvltrends.json'"""
+    return f"{NOAA_API_URL}/{endpoint}/?{urllib.parse.urlencode(params)}"
+
+
+def fetch_json(
+    endpoint: str,
+    params: typing.Mapping[str, typing.Any],
+    cache: ResponseCache = None,
+    timeout: float = 30.0,
+    session: NOAASession = None,
+) -> dict:
+    """Retrieves a NOAA API product as JSON, going through the response cache
+
+    Parameters
+    ----------
+    endpoint : str
+        Name of the product, e.g., 'sealvltrends.json' or 'slr_projections.json'
+    params : Mapping
+        Query parameters, e.g., {'station': '9414290', 'affil': 'US'}
+    cache : ResponseCache, optional
+        Cache to use, by default the shared RESPONSE_CACHE
+    timeout : float, optional
+        Timeout of the request in seconds, by default 30; ignored when a session
+        is given
+    session : NOAASession, optional
+        Session used to send the request over pooled keep-alive connections, by
+        default a one-off connection is opened
+
+    Returns
+    -------
+    dict
+        The decoded JSON response
+
+    Raises
+    ------
+    ConnectionError
+        If the cache is offline and does not hold the response
+    """
+    if cache is None:
+        cache = RESPONSE_CACHE
+    payload = cache.get(endpoint, params)
+    if payload is None:
+        if cache.offline:
+            raise ConnectionError(
+                f"No cached response for {endpoint} with {dict(params)} "
+                "and the NOAA response cache is in offline mode."
+            )
+        if session is not None:
+            payload = session.get(build_url(endpoint, params))
+        else:
+            with urllib.request.urlopen(
+                build_url(endpoint, params), timeout=timeout
+            ) as url:
+                payload = url.read()
+        # Only responses that decode properly are cached
+        data = json.loads(payload)
+        cache.put(endpoint, params, payload)
+        return data
+    return json.loads(payload)
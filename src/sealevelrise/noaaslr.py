@@ -1,118 +1,115 @@
-import json
-import urllib.request
-import warnings
+import typing
 
+from sealevelrise.noaaapi import NOAASession, fetch_json
 from sealevelrise.scenario import Scenario
 from pandas import DataFrame
 
+# NOAA has specific scenarios, and these are their properties
+NOAA_SCENARIO_PROPS = {
+    "Low": {
+        "Description": "NOAA Low",
+        "Short Name": "Low",
+        "Probability": None,
+    },
+    "Intermediate-Low": {
+        "Description": "NOAA Intermediate-Low",
+        "Short Name": "Intermediate-Low",
+        "Probability": None,
+    },
+    "Intermediate": {
+        "Description": "NOAA Intermediate",
+        "Short Name": "Intermediate",
+        "Probability": None,
+    },
+    "Intermediate-High": {
+        "Description": "NOAA Intermediate-High",
+        "Short Name": "Intermediate-High",
+        "Probability": None,
+    },
+    "High": {
+        "Description": "NOAA High",
+        "Short Name": "High",
+        "Probability": None,
+    },
+}
 
-class NOAAScenarios:
-    def __init__(self, station_id: str = None, **kwargs) -> None:
-
-        # NOAA returns cm if metric is selected; in if english is selected
-        _report_year = kwargs.pop("Report Year", 2022)
-        _units = kwargs.pop("Data Units", "metric")
-        if _units == "metric":
-            units = "cm"
-        else:
-            units = "in"
+NOAA_ISSUER = (
+    "National Oceanographic and Atmospheric Administration, "
+    "Sea Level Rise Projections, 2022"
+)
+NOAA_URL = (
+    "https://oceanservice.noaa.gov/hazards/"
+    "sealevelrise/sealevelrise-tech-report.html"
+)
 
-        _station_ID = station_id
-        _base_URL = (
-            "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi/product"
-            "/slr_projections.json"
-        )
 
-        # Get the trend object from NOAA API
-        link = (
-            rf"{_base_URL}"
-            rf"/?station={_station_ID}"
-            rf"&units={_units}"
-            rf"&report_year={_report_year}"
-        )
+def _fetch_noaa_scenarios(
+    station_id: str,
+    report_year: int = 2022,
+    data_units: str = "metric",
+    session: NOAASession = None,
+) -> typing.Tuple[typing.List[Scenario], str, DataFrame]:
+    """Retrieves the NOAA projections at a station and builds Scenario objects
 
-        # Load and append
-        with urllib.request.urlopen(link) as url:
-            try:
-                data = json.loads(url.read())["Scenarios"]
-            except ConnectionError:
-                warnings.warn("Something came up while retrieving data from NOAA")
+    Returns
+    -------
+    tuple
+        The list of Scenario objects, the name of the location, and the raw
+        projections as a DataFrame
+    """
+    # NOAA returns cm if metric is selected; in if english is selected
+    if data_units == "metric":
+        units = "cm"
+    else:
+        units = "in"
 
-        _data = DataFrame.from_dict(data)
+    # Get the projections from NOAA API, or from the response cache
+    data = fetch_json(
+        "slr_projections.json",
+        {"station": station_id, "units": data_units, "report_year": report_year},
+        session=session,
+    )["Scenarios"]
 
-        # NOAA has specific scenarios, and these are their properties
-        noaa_scenario_props = {
-            "Low": {
-                "Description": "NOAA Low",
-                "Short Name": "Low",
-                "Probability": None,
-            },
-            "Intermediate-Low": {
-                "Description": "NOAA Intermediate-Low",
-                "Short Name": "Intermediate-Low",
-                "Probability": None,
-            },
-            "Intermediate": {
-                "Description": "NOAA Intermediate",
-                "Short Name": "Intermediate",
-                "Probability": None,
-            },
-            "Intermediate-High": {
-                "Description": "NOAA Intermediate-High",
-                "Short Name": "Intermediate-High",
-                "Probability": None,
-            },
-            "High": {
-                "Description": "NOAA High",
-                "Short Name": "High",
-                "Probability": None,
-            },
-        }
+    _data = DataFrame.from_dict(data)
 
-        # Launch the sequence and create the list of scenarios
-        scenarios = list()
-        for key_ in noaa_scenario_props.keys():
-            scenario_ = _data[_data.loc[:, "scenario"] == key_]
-            scenarios.append(
-                Scenario(
-                    description=noaa_scenario_props[key_]["Description"],
-                    short_name=noaa_scenario_props[key_]["Short Name"],
-                    units=units,
-                    probability=noaa_scenario_props[key_]["Probability"],
-                    baseline_year=2005,
-                    data={
-                        "x": scenario_.loc[:, "projectionYear"].values,
-                        "y": scenario_.loc[:, "projectionRsl"].values,
-                    },
-                )
+    # Launch the sequence and create the list of scenarios
+    scenarios = list()
+    for key_ in NOAA_SCENARIO_PROPS.keys():
+        scenario_ = _data[_data.loc[:, "scenario"] == key_]
+        scenarios.append(
+            Scenario(
+                description=NOAA_SCENARIO_PROPS[key_]["Description"],
+                short_name=NOAA_SCENARIO_PROPS[key_]["Short Name"],
+                units=units,
+                probability=NOAA_SCENARIO_PROPS[key_]["Probability"],
+                baseline_year=2005,
+                data={
+                    "x": scenario_.loc[:, "projectionYear"].values,
+                    "y": scenario_.loc[:, "projectionRsl"].values,
+                },
             )
+        )
 
-        # The name of the location is retrieved from the last scenario_ chunk
-        location_name = scenario_.loc[:, "stationName"].values[0]
+    # The name of the location is retrieved from the last scenario_ chunk
+    location_name = scenario_.loc[:, "stationName"].values[0]
+    return scenarios, location_name.replace("_", " ").title(), _data
 
-        # super().__init__(
-        #     scenarios=scenarios,
-        #     location_name=location_name.replace("_", " ").title(),
-        #     station_id=station_id,
-        #     issuer=(
-        #         "National Oceanographic and Atmospheric Administration, "
-        #         "Sea Level Rise Projections, 2022"
-        #     ),
-        #     url=(
-        #         "https://oceanservice.noaa.gov/hazards/"
-        #         "sealevelrise/sealevelrise-tech-report.html"
-        #     ),
-        # )
+
+class NOAAScenarios:
+    def __init__(
+        self, station_id: str = None, session: NOAASession = None, **kwargs
+    ) -> None:
+
+        scenarios, location_name, _data = _fetch_noaa_scenarios(
+            station_id=station_id,
+            report_year=kwargs.pop("Report Year", 2022),
+            data_units=kwargs.pop("Data Units", "metric"),
+            session=session,
+        )
 
         self.scenarios = scenarios
-        self.location_name = location_name.replace("_", " ").title()
+        self.location_name = location_name
         self.station_id = station_id
-        self.issuer = (
-                "National Oceanographic and Atmospheric Administration, "
-                "Sea Level Rise Projections, 2022"
-        )
-        self.url = (
-                "https://oceanservice.noaa.gov/hazards/"
-                "sealevelrise/sealevelrise-tech-report.html"
-        )
+        self.issuer = NOAA_ISSUER
+        self.url = NOAA_URL
         self.noaa_properties = _data
@@ -0,0 +1,382 @@
+import typing
+
+import numpy as np
+
+from sealevelrise.matrix import ScenarioMatrix
+from sealevelrise.utils import _check_units
+
+
+class TrajectoryChunk(typing.NamedTuple):
+    """Trajectories sampled from a ProbabilitySurface
+
+    Attributes
+    ----------
+    probabilities : np.ndarray
+        Probability (CDF) level of each trajectory, shape (n,)
+    years : np.ndarray
+        Years of the trajectories, shape (n_years,)
+    values : np.ndarray
+        SLR values of each trajectory, shape (n, n_years)
+    """
+
+    probabilities: np.ndarray
+    years: np.ndarray
+    values: np.ndarray
+
+
+# ProbabilitySurface interpolates SLR between scenarios of known probability
+class ProbabilitySurface:
+    """ProbabilitySurface is a 2-D (probability x year) grid of SLR values built from
+    the scenarios that carry a probability (CDF).
+
+    Values are bilinear in probability and year between the grid nodes. The
+    surface is built once and then queried with arrays of (probability, year)
+    pairs in a single vectorized operation; the inverse query returns the
+    probability (CDF) or the exceedance probability of a given SLR value.
+    Queries outside of the probabilities or years covered by the scenarios are
+    not extrapolated and return NaN, as do cells where a scenario has null values.
+
+    Attributes
+    ----------
+    probabilities : np.ndarray
+        Probability (CDF) of each level, sorted, shape (n_levels,)
+    years : np.ndarray
+        Year axis, shape (n_years,)
+    values : np.ndarray
+        SLR values of each level, shape (n_levels, n_years)
+    units : str
+        Units of the values, one of 'ft', 'in', 'm', 'mm', and 'cm'
+    """
+
+    def __init__(
+        self,
+        probabilities: np.ndarray,
+        years: np.ndarray,
+        values: np.ndarray,
+        units: str,
+    ) -> None:
+        if values.shape != (probabilities.size, years.size):
+            raise ValueError(
+                f"values have shape {values.shape}, expected "
+                f"({probabilities.size}, {years.size})."
+            )
+        if probabilities.size < 2:
+            raise ValueError(
+                "At least two scenarios with a probability (CDF) are needed to "
+                "build a probability surface."
+            )
+        if np.any(np.diff(probabilities) <= 0.0):
+            raise ValueError("Probabilities must be unique and sorted.")
+        self.probabilities = probabilities
+        self.years = years
+        self.values = values
+        self.units = units
+
+    @classmethod
+    def from_matrix(
+        cls, matrix: ScenarioMatrix, units: str = None
+    ) -> "ProbabilitySurface":
+        """Builds the surface out of the rows of a matrix with a probability
+
+        Parameters
+        ----------
+        matrix : ScenarioMatrix
+            Matrix holding the scenarios; rows without probability are ignored
+        units : str, optional
+            Units of the surface, by default the units of the matrix
+
+        Returns
+        -------
+        ProbabilitySurface
+            A new ProbabilitySurface instance
+
+        Raises
+        ------
+        ValueError
+            If fewer than two rows have a probability, if two rows share the same
+            probability, or if units are mixed and none were given
+        """
+        if units is None:
+            if len(set(matrix.units)) > 1:
+                raise ValueError(
+                    "Scenarios have mixed units; the units of the surface must be "
+                    "given."
+                )
+            units = matrix.units[0] if matrix.units else "ft"
+        _check_units(units)
+        if any(units_ != units for units_ in matrix.units):
+            matrix = matrix.as_units(units)
+
+        rows = np.flatnonzero(np.isfinite(matrix.probabilities))
+        rows = rows[np.argsort(matrix.probabilities[rows], kind="stable")]
+        return cls(
+            probabilities=matrix.probabilities[rows],
+            years=matrix.years,
+            values=matrix.filled[rows],
+            units=units,
+        )
+
+    @property
+    def shape(self) -> typing.Tuple[int, int]:
+        return self.values.shape
+
+    def value(
+        self,
+        probability: typing.Union[float, np.ndarray],
+        year: typing.Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """SLR at each (probability, year) pair
+
+        Parameters
+        ----------
+        probability : float or np.ndarray
+            Probability (CDF) level(s), between 0 and 1
+        year : float or np.ndarray
+            Year(s); broadcast against probability
+
+        Returns
+        -------
+        np.ndarray
+            SLR values in the units of the surface, with the broadcast shape of
+            probability and year
+        """
+        probability, year = np.broadcast_arrays(
+            np.asarray(probability, dtype=float), np.asarray(year, dtype=float)
+        )
+        p = probability.ravel()
+        t = year.ravel()
+        row, row_weight = _bracket(self.probabilities, p)
+        col, col_weight = _bracket(self.years, t)
+        next_row = np.minimum(row + 1, self.probabilities.size - 1)
+        next_col = np.minimum(col + 1, self.years.size - 1)
+
+        below = _lerp(self.values[row, col], self.values[row, next_col], col_weight)
+        above = _lerp(
+            self.values[next_row, col], self.values[next_row, next_col], col_weight
+        )
+        result = _lerp(below, above, row_weight)
+        result[
+            (p < self.probabilities[0])
+            | (p > self.probabilities[-1])
+            | (t < self.years[0])
+            | (t > self.years[-1])
+        ] = np.nan
+        return result.reshape(probability.shape)
+
+    def cdf(
+        self,
+        value: typing.Union[float, np.ndarray],
+        year: typing.Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """Probability (CDF) that SLR does not exceed value at each year
+
+        Levels are interpolated at each year first, then the value is located
+        between the two levels that bracket it. Values below the lowest level or
+        above the highest level are outside of the surface and return NaN.
+
+        Parameters
+        ----------
+        value : float or np.ndarray
+            SLR value(s) in the units of the surface
+        year : float or np.ndarray
+            Year(s); broadcast against value
+
+        Returns
+        -------
+        np.ndarray
+            Probabilities, with the broadcast shape of value and year
+        """
+        value, year = np.broadcast_arrays(
+            np.asarray(value, dtype=float), np.asarray(year, dtype=float)
+        )
+        v = value.ravel()
+        t = year.ravel()
+        col, col_weight = _bracket(self.years, t)
+        next_col = np.minimum(col + 1, self.years.size - 1)
+        # Each level at each queried year, shape (n_levels, n_queries); the
+        # running maximum keeps the levels sorted should scenarios cross
+        levels = _lerp(self.values[:, col], self.values[:, next_col], col_weight)
+        levels = np.maximum.accumulate(levels, axis=0)
+
+        n_levels = self.probabilities.size
+        upper = np.clip((levels <= v).sum(axis=0), 1, n_levels - 1)
+        lower = upper - 1
+        low_value = np.take_along_axis(levels, lower[np.newaxis], axis=0)[0]
+        high_value = np.take_along_axis(levels, upper[np.newaxis], axis=0)[0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = (v - low_value) / (high_value - low_value)
+        weight = np.where(high_value == low_value, 1.0, weight)
+        low_p = self.probabilities[lower]
+        result = low_p + weight * (self.probabilities[upper] - low_p)
+
+        result[
+            np.isnan(levels).any(axis=0)
+            | (v < levels[0])
+            | (v > levels[-1])
+            | np.isnan(v)
+            | (t < self.years[0])
+            | (t > self.years[-1])
+        ] = np.nan
+        return result.reshape(value.shape)
+
+    def exceedance(
+        self,
+        value: typing.Union[float, np.ndarray],
+        year: typing.Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """Probability that SLR exceeds value at each year, i.e., 1 - cdf
+
+        Parameters
+        ----------
+        value : float or np.ndarray
+            SLR value(s) in the units of the surface
+        year : float or np.ndarray
+            Year(s); broadcast against value
+
+        Returns
+        -------
+        np.ndarray
+            Exceedance probabilities, with the broadcast shape of value and year
+        """
+        return 1.0 - self.cdf(value, year)
+
+    def sample(
+        self,
+        n: int,
+        years: typing.Union[typing.Sequence[float], np.ndarray] = None,
+        chunk_size: int = 100_000,
+        seed: typing.Union[int, np.random.SeedSequence] = None,
+        max_workers: int = None,
+        max_pending: int = None,
+        tails: str = "clamp",
+    ) -> typing.Iterator[TrajectoryChunk]:
+        """Draws trajectories from the CDF implied by the scenarios, chunk by chunk
+
+        Each trajectory follows one probability level drawn uniformly in [0, 1].
+        Between the outermost scenarios, values are interpolated as in value.
+        The scenarios say nothing about levels below the lowest or above the
+        highest probability, e.g., below 0.83 for a set tagged 0.83 and 0.995,
+        so those tails follow the rule given by tails. Chunks are generated
+        lazily so that only a bounded number of them is ever held in memory.
+
+        Parameters
+        ----------
+        n : int
+            Total number of trajectories
+        years : array-like, optional
+            Years of the trajectories, by default the years of the surface
+        chunk_size : int, optional
+            Number of trajectories per chunk, by default 100,000; the last chunk
+            may be smaller
+        seed : int or np.random.SeedSequence, optional
+            Seed of the random generator. Each chunk draws from its own stream
+            spawned from the seed, so results do not depend on max_workers.
+        max_workers : int, optional
+            If greater than 1, chunks are generated in a ProcessPoolExecutor with
+            that many workers, by default None (in process)
+        max_pending : int, optional
+            Maximum number of chunks submitted to the workers ahead of the one
+            being consumed, by default twice max_workers
+        tails : str, optional
+            Values of the levels outside of the probabilities of the surface:
+
+            * 'clamp' (default): the trajectory of the outermost scenario, which
+              understates the spread of the tails
+            * 'extrapolate': linear extrapolation in probability from the two
+              outermost scenarios, unreliable far from them
+
+        Yields
+        ------
+        TrajectoryChunk
+            Probability levels, years and values of the next chunk, in order
+
+        Examples
+        --------
+        >>> surface = Scenarios.from_builtin("nj-dep-2021").probability_surface()
+        >>> for chunk in surface.sample(10**7, years=range(2030, 2101), seed=42):
+        ...     damages += damage_model(chunk.values)
+        """
+        if n < 0:
+            raise ValueError("n must be a positive integer.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        if tails not in ("clamp", "extrapolate"):
+            raise ValueError("tails must be either 'clamp' or 'extrapolate'.")
+        years = self.years if years is None else np.asarray(years, dtype=float)
+        # Levels resampled on the requested years, shape (n_levels, n_years);
+        # each trajectory then only blends two of these rows
+        col, col_weight = _bracket(self.years, years)
+        next_col = np.minimum(col + 1, self.years.size - 1)
+        levels = _lerp(self.values[:, col], self.values[:, next_col], col_weight)
+        levels[:, (years < self.years[0]) | (years > self.years[-1])] = np.nan
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        sizes = [chunk_size] * (n // chunk_size)
+        if n % chunk_size:
+            sizes.append(n % chunk_size)
+        tasks = (
+            (self.probabilities, years, levels, seed_, size_, tails)
+            for seed_, size_ in zip(seed.spawn(len(sizes)), sizes)
+        )
+
+        # Imported here: batch imports this module through slrprojections
+        from sealevelrise.batch import _ordered_map
+
+        yield from _ordered_map(
+            _sample_chunk, tasks, max_workers=max_workers, max_pending=max_pending
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ProbabilitySurface in {self.units} with probabilities from "
+            f"{self.probabilities[0]} to {self.probabilities[-1]} and years from "
+            f"{self.years[0]} to {self.years[-1]}"
+        )
+
+
+def _sample_chunk(
+    probabilities: np.ndarray,
+    years: np.ndarray,
+    levels: np.ndarray,
+    seed: np.random.SeedSequence,
+    size: int,
+    tails: str,
+) -> TrajectoryChunk:
+    # Runs in worker processes; must remain a module-level function
+    rng = np.random.default_rng(seed)
+    drawn = rng.uniform(0.0, 1.0, size)
+    if tails == "clamp":
+        position = np.clip(drawn, probabilities[0], probabilities[-1])
+    else:
+        # Weights outside of [0, 1] extrapolate from the outermost levels
+        position = drawn
+    row, row_weight = _bracket(probabilities, position)
+    next_row = np.minimum(row + 1, probabilities.size - 1)
+    # Blend in place to keep the number of temporary arrays of the chunk's size low
+    values = levels[row]
+    step = levels[next_row]
+    step -= values
+    step *= row_weight[:, np.newaxis]
+    values += step
+    # Exact levels must not be polluted by a NaN neighbor
+    exact = row_weight == 0.0
+    if exact.any():
+        values[exact] = levels[row[exact]]
+    exact = row_weight == 1.0
+    if exact.any():
+        values[exact] = levels[next_row[exact]]
+    return TrajectoryChunk(probabilities=drawn, years=years, values=values)
+
+
+def _bracket(grid: np.ndarray, x: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    # Index of the grid node at or left of each x, and the weight of the next node
+    if grid.size < 2:
+        return np.zeros(x.shape, dtype=int), np.zeros(x.shape)
+    left = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, grid.size - 2)
+    return left, (x - grid[left]) / (grid[left + 1] - grid[left])
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    # Exact grid nodes must not be polluted by a NaN neighbor
+    return np.where(weight == 0.0, a, np.where(weight == 1.0, b, a + weight * (b - a)))
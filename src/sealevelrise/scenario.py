@@ -1,14 +1,20 @@
 import typing
 
 import numpy as np
-from pandas import DataFrame, Series
 
 from .data import Data
+from .matrix import ScenarioMatrix
 from .utils import _check_units
 
+if typing.TYPE_CHECKING:
+    from pandas import DataFrame
+
 
 # Scenario contains the entire information related to a single trajectory
 class Scenario:
+    # Instances are views over one row of a ScenarioMatrix; no per-object dict
+    __slots__ = ("_matrix", "_row")
+
     def __init__(
         self,
         description: str,
@@ -54,21 +60,45 @@ class Scenario:
             )
 
         if isinstance(probability, float):
-            if probability >= 0.0 and probability <= 1.0:
-                self.probability = probability
-            else:
-                raise ValueError(
-                    f"Probability {self.probability} is not within [0; 1]."
-                )
-
-        if probability is None:
-            self.probability = np.nan
-
-        # If all checks out, record values
-        self.description = description
-        self.short_name = short_name
-        self.baseline_year = baseline_year
-        self.data = Data(units=units, data=data)
+            if not (probability >= 0.0 and probability <= 1.0):
+                raise ValueError(f"Probability {probability} is not within [0; 1].")
+
+        # Check the data through the Data constructor, then record the metadata
+        # alongside the values in its one-row ScenarioMatrix
+        self._matrix = Data(units=units, data=data)._matrix
+        self._matrix.descriptions[0] = description
+        self._matrix.short_names[0] = short_name
+        self._matrix.probabilities[0] = np.nan if probability is None else probability
+        self._matrix.baseline_years[0] = baseline_year
+        self._row = 0
+
+    @classmethod
+    def _view(cls, matrix: ScenarioMatrix, row: int) -> "Scenario":
+        """Creates a Scenario backed by one row of an existing ScenarioMatrix"""
+        view = cls.__new__(cls)
+        view._matrix = matrix
+        view._row = row
+        return view
+
+    @property
+    def description(self) -> str:
+        return self._matrix.descriptions[self._row]
+
+    @property
+    def short_name(self) -> str:
+        return self._matrix.short_names[self._row]
+
+    @property
+    def probability(self) -> float:
+        return self._matrix.probabilities[self._row]
+
+    @property
+    def baseline_year(self) -> int:
+        return self._matrix.baseline_years[self._row]
+
+    @property
+    def data(self) -> Data:
+        return Data._view(self._matrix, self._row)
 
     def __repr__(self) -> str:
         s = (
@@ -79,10 +109,26 @@ class Scenario:
 
     @property
     def units(self):
-        return self.data.units
+        return self._matrix.units[self._row]
+
+    def as_units(self, to_units: str) -> "Scenario":
+        """Returns a Scenario view with values expressed in to_units, leaving this
+        instance untouched
+
+        Parameters
+        ----------
+        to_units : str
+            One of 'm', 'cm', 'mm', 'in', and 'ft'
+
+        Returns
+        -------
+        Scenario
+            A new Scenario instance sharing the years and metadata of this one
+        """
+        return Scenario._view(self._matrix.as_units(to_units), self._row)
 
     @property
-    def dataframe(self) -> Series:
+    def dataframe(self) -> "DataFrame":
         """Returns a DataFrame built from x and y in the Scenario
 
         Returns
@@ -90,38 +136,101 @@ class Scenario:
         DataFrame
             DataFrame containing x values as index and y values as values.
         """
+        return self.frame(copy=True)
+
+    def frame(self, copy: bool = True) -> "DataFrame":
+        """Returns the DataFrame of the Scenario, materialized once and cached
+        until the values or units change.
+
+        Parameters
+        ----------
+        copy : bool, optional
+            If True (default), returns an independent copy of the cached frame.
+            If False, returns the cached frame itself: it is read-only and backed
+            by the arrays of the Scenario, without any copy.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame containing x values as index and y values as values.
+        """
+        df = self._matrix.frame(("row", self._row), self._build_frame)
+        return df.copy() if copy else df
+
+    def _build_frame(self) -> "DataFrame":
+        from pandas import DataFrame
+
+        matrix = self._matrix
         df = DataFrame(
-            data={
-                f"{self.short_name}, {100. * self.probability:.2f}%"
-                f" [{self.units}]": self.data.y
-            },
-            index=self.data.x,
+            data=matrix.readonly(self.data.y)[:, np.newaxis],
+            index=matrix.readonly(self.data.x),
+            columns=[
+                f"{self.short_name}, {100. * self.probability:.2f}% [{self.units}]"
+            ],
+            copy=False,
         )
         df.index.name = f"Year (baseline: {self.baseline_year})"
         return df
 
-    def by_horizon_year(self, horizon_year: typing.Union[int, float]) -> float:
+    def by_horizon_year(
+        self,
+        horizon_year: typing.Union[int, float, typing.Sequence[float], np.ndarray],
+        coerce_errors: bool = False,
+    ) -> typing.Union[float, np.ndarray]:
         """Calculates the value of SLR projections by a given horizon_year
 
         Parameters
         ----------
-        horizon_year : int or float
-            The value of the year to interpolate the projections
+        horizon_year : int, float, or array-like
+            The value of the year(s) to interpolate the projections
+        coerce_errors : bool, optional
+            If set to True, years outside of the range of the data are returned as
+            np.nan; if set to False (default), a ValueError is raised
 
         Returns
         -------
-        float
-            The interpolated SLR projection at that year, e.g., 2.5.
+        float or np.ndarray
+            The interpolated SLR projection at that year, e.g., 2.5, or an array
+            with one value per year if an array of years was given.
             Units are implicit and available using Scenario.units
 
+        Raises
+        ------
+        ValueError
+            If coerce_errors is False and a year is out of the range of the data.
         """
-        # Check for horizon year
-        if (horizon_year > self.data.x.max()) or (horizon_year < self.data.x.min()):
-            raise ValueError(
-                "Target year is out of bounds for this location, "
-                f"years range from {self.data.x.min()} to "
-                f"{self.data.x.max()}."
-            )
-        # Linearly interpolate value at the horizon_year
-        proj = np.interp(horizon_year, self.data.x, self.data.y)
+        # Linearly interpolate value(s) at the horizon_year
+        proj = self._matrix.interp(
+            horizon_year, rows=self._row, coerce_errors=coerce_errors
+        )
+        if proj.ndim == 0:
+            return float(proj)
         return proj
+
+    def crossing_year(
+        self,
+        threshold: typing.Union[float, typing.Sequence[float], np.ndarray],
+        units: str = None,
+    ) -> typing.Union[float, np.ndarray]:
+        """Calculates the year at which the projections first reach a given SLR
+
+        Parameters
+        ----------
+        threshold : float or array-like
+            The value(s) of SLR to reach
+        units : str, optional
+            Units of threshold, one of 'm', 'cm', 'mm', 'in', and 'ft'; by default
+            the units of the Scenario
+
+        Returns
+        -------
+        float or np.ndarray
+            The crossing year, interpolated linearly between the years of the data,
+            or an array with one year per threshold if an array was given.
+            Thresholds never reached within the range of the data return np.inf,
+            and thresholds already exceeded at the first year return -np.inf.
+        """
+        years = self._matrix.crossing_years(threshold, rows=self._row, units=units)
+        if years.ndim == 0:
+            return float(years)
+        return years
@@ -0,0 +1,570 @@
+"""Lightweight asyncio HTTP service answering projection queries as JSON.
+
+The builtin catalog is parsed once at start-up and every projection set is kept
+in memory, along with its unit-converted variants and the NOAA projections
+already requested, so that queries only interpolate. Only the standard library
+and NumPy are used; run it with 'sealevelrise serve' or serve().
+
+Endpoints
+---------
+GET /health
+GET /scenarios
+    Builtin projection sets, as Scenarios.show_all_builtin_scenarios
+GET /scenarios/{location}?units=ft&source=builtin
+    Full projection set, optionally converted
+GET /projections?location=...&year=2050&year=2100&units=ft&source=builtin
+    Values of every scenario at the horizon years, as by_horizon_year
+POST /projections
+    Batch of queries, {"queries": [{"location": ..., "years": [...], ...}]}
+GET /metrics
+    Request counts, latency statistics and cache statistics
+"""
+
+import asyncio
+import json
+import threading
+import time
+import typing
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from sealevelrise.memo import MemoCache
+from sealevelrise.slrprojections import Scenarios
+from sealevelrise.utils import BUILTIN_CATALOG, _check_units, _validate_key
+
+# Number of recent latencies per route used for the percentiles
+LATENCY_WINDOW = 4096
+
+
+class HTTPError(Exception):
+    """Error returned to the client with an HTTP status and a JSON message"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _values(array: np.ndarray) -> list:
+    # NaN is not valid JSON; missing values are returned as null
+    return [None if np.isnan(v_) else float(v_) for v_ in np.asarray(array).ravel()]
+
+
+def _years(value: typing.Any) -> np.ndarray:
+    try:
+        years = np.atleast_1d(np.asarray(value, dtype=float)).ravel()
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid years: {value!r}.")
+    if years.size == 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "At least one year is required.")
+    return years
+
+
+class _Metrics:
+    """Request counts and latencies by route; updated from the event loop only"""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self._routes = dict()
+
+    def record(self, route: str, status: int, seconds: float) -> None:
+        stats = self._routes.setdefault(
+            route,
+            {
+                "count": 0,
+                "errors": 0,
+                "seconds": 0.0,
+                "recent": deque(maxlen=LATENCY_WINDOW),
+            },
+        )
+        stats["count"] += 1
+        stats["errors"] += status >= 400
+        stats["seconds"] += seconds
+        stats["recent"].append(seconds)
+
+    def summary(self) -> dict:
+        routes = dict()
+        for route_, stats_ in self._routes.items():
+            recent = np.array(stats_["recent"])
+            p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+            routes[route_] = {
+                "count": stats_["count"],
+                "errors": stats_["errors"],
+                "mean_ms": 1e3 * stats_["seconds"] / stats_["count"],
+                "p50_ms": 1e3 * p50,
+                "p95_ms": 1e3 * p95,
+                "p99_ms": 1e3 * p99,
+                "max_ms": 1e3 * recent.max(),
+            }
+        return {
+            "uptime_s": time.time() - self.started,
+            "requests": sum(stats_["count"] for stats_ in self._routes.values()),
+            "routes": routes,
+        }
+
+
+class ProjectionService:
+    """ProjectionService answers the requests of the HTTP server from projection
+    sets kept in memory.
+
+    Builtin projection sets are parsed once, on start-up if preload is True, and
+    each unit-converted variant is computed once. NOAA projections are fetched on
+    first request (through the NOAA response cache) and kept for noaa_ttl
+    seconds. Blocking work runs in a thread pool, never in the event loop.
+
+    Attributes
+    ----------
+    builtin : MemoCache
+        Builtin Scenarios by (key, units)
+    noaa : MemoCache
+        NOAA Scenarios by (station ID, units)
+    metrics : _Metrics
+        Request counts and latencies, see the /metrics endpoint
+    """
+
+    def __init__(
+        self,
+        preload: bool = True,
+        noaa_stations: typing.Sequence[str] = (),
+        noaa_ttl: float = 86400.0,
+        max_workers: int = 8,
+    ) -> None:
+        self.builtin = MemoCache(maxsize=None)
+        self.noaa = MemoCache(maxsize=1024, ttl=noaa_ttl)
+        self.metrics = _Metrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._session = None
+        self._session_lock = threading.Lock()
+        if preload:
+            for key_ in BUILTIN_CATALOG:
+                self.scenarios(key_, source="builtin")
+        for station_ in noaa_stations:
+            self.scenarios(station_, source="noaa")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
+
+    def scenarios(
+        self,
+        location: str,
+        source: str = "builtin",
+        units: str = None,
+        load: bool = True,
+    ) -> typing.Optional[typing.Tuple[str, Scenarios]]:
+        """Returns the key and the cached Scenarios of a location, in units
+
+        Loading may parse the catalog or fetch from NOAA; with load set to False,
+        None is returned instead if the projection set is not in memory yet.
+        """
+        if units is not None:
+            try:
+                _check_units(units)
+            except ValueError as error:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+
+        if source == "builtin":
+            try:
+                key = _validate_key(key=location)
+            except (KeyError, IndexError, TypeError) as error:
+                raise HTTPError(HTTPStatus.NOT_FOUND, str(error).strip("'\""))
+            cache, cache_key = self.builtin, key
+
+            def _load():
+                return Scenarios.from_builtin(key)
+
+        elif source == "noaa":
+            key = f"noaa-{location}"
+            cache, cache_key = self.noaa, location
+
+            def _load():
+                return Scenarios.from_noaa(station_id=location, session=self.session)
+
+        else:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "source must be either 'builtin' or 'noaa'."
+            )
+
+        if not load:
+            scenarios = cache.get((cache_key, units))
+            return None if scenarios is None else (key, scenarios)
+        base = cache.get_or_create((cache_key, None), _load)
+        if units is None:
+            return key, base
+        return key, cache.get_or_create(
+            (cache_key, units), lambda: base.as_units(units)
+        )
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                from sealevelrise.noaaapi import NOAASession
+
+                self._session = NOAASession()
+            return self._session
+
+    async def _scenarios(
+        self, location: typing.Any, source: str, units: str
+    ) -> typing.Tuple[str, Scenarios]:
+        if not isinstance(location, str) or not location:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "A location is required.")
+        # Projection sets in memory are served from the event loop; others are
+        # loaded in the thread pool
+        found = self.scenarios(location, source=source, units=units, load=False)
+        if found is not None:
+            return found
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.scenarios, location, source, units
+        )
+
+    async def projections(self, query: dict) -> dict:
+        """Values of every scenario of a location at the horizon years"""
+        if not isinstance(query, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Each query must be an object.")
+        years = _years(query.get("years", query.get("year")))
+        source = query.get("source", "builtin")
+        key, scenarios = await self._scenarios(
+            query.get("location"), source, query.get("units")
+        )
+        matrix = scenarios.matrix
+        values = matrix.interp(years, coerce_errors=True).reshape(matrix.shape[0], -1)
+        return {
+            "key": key,
+            "location": scenarios.location_name,
+            "issuer": scenarios.issuer,
+            "years": years.tolist(),
+            "scenarios": [
+                {
+                    "name": matrix.short_names[row_],
+                    "probability": _values(matrix.probabilities[row_])[0],
+                    "units": matrix.units[row_],
+                    "values": _values(values[row_]),
+                }
+                for row_ in range(matrix.shape[0])
+            ],
+        }
+
+    async def projection_set(self, location: str, source: str, units: str) -> dict:
+        """Full projection set on its shared year axis"""
+        key, scenarios = await self._scenarios(location, source, units)
+        matrix = scenarios.matrix
+        return {
+            "key": key,
+            "location": scenarios.location_name,
+            "station_id": scenarios.station_id,
+            "issuer": scenarios.issuer,
+            "url": scenarios.url,
+            "years": matrix.years.tolist(),
+            "scenarios": [
+                {
+                    "name": matrix.short_names[row_],
+                    "description": matrix.descriptions[row_],
+                    "probability": _values(matrix.probabilities[row_])[0],
+                    "baseline_year": matrix.baseline_years[row_],
+                    "units": matrix.units[row_],
+                    "values": _values(matrix.values[row_]),
+                }
+                for row_ in range(matrix.shape[0])
+            ],
+        }
+
+    async def batch(self, body: typing.Any) -> dict:
+        """Answers several projection queries; errors are reported per query"""
+        queries = body.get("queries") if isinstance(body, dict) else body
+        if not isinstance(queries, list):
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, "The body must hold a list of 'queries'."
+            )
+
+        async def _answer(query: dict) -> dict:
+            try:
+                return await self.projections(query)
+            except HTTPError as error:
+                return {"error": str(error), "status": int(error.status)}
+            except Exception as error:
+                return {
+                    "error": f"{type(error).__name__}: {error}",
+                    "status": int(HTTPStatus.BAD_GATEWAY),
+                }
+
+        results = await asyncio.gather(*(_answer(query_) for query_ in queries))
+        return {"results": list(results)}
+
+    async def handle(
+        self, method: str, target: str, body: bytes
+    ) -> typing.Tuple[int, dict]:
+        """Routes a request and returns its status and JSON payload"""
+        url = urllib.parse.urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        params = urllib.parse.parse_qs(url.query)
+
+        def _param(name: str, default: str = None) -> str:
+            return params.get(name, [default])[-1]
+
+        start = time.perf_counter()
+        route = "other"
+        try:
+            if path == "/health":
+                route = "/health"
+                _allow(method, "GET")
+                status, payload = HTTPStatus.OK, {"status": "ok"}
+            elif path == "/metrics":
+                route = "/metrics"
+                _allow(method, "GET")
+                status, payload = HTTPStatus.OK, self.metrics.summary()
+                payload["cache"] = {
+                    "builtin": self.builtin.stats(),
+                    "noaa": self.noaa.stats(),
+                }
+            elif path == "/scenarios":
+                route = "/scenarios"
+                _allow(method, "GET")
+                status, payload = HTTPStatus.OK, {
+                    "scenarios": [
+                        {
+                            "key": entry_.key,
+                            "location": entry_.location_name,
+                            "issuer": entry_.issuer,
+                            "station_id": entry_.station_id,
+                        }
+                        for entry_ in BUILTIN_CATALOG.headers.values()
+                    ]
+                }
+            elif path.startswith("/scenarios/"):
+                route = "/scenarios/{location}"
+                _allow(method, "GET")
+                status, payload = HTTPStatus.OK, await self.projection_set(
+                    urllib.parse.unquote(path[len("/scenarios/") :]),
+                    source=_param("source", "builtin"),
+                    units=_param("units"),
+                )
+            elif path == "/projections":
+                route = "/projections"
+                _allow(method, "GET", "POST")
+                if method == "GET":
+                    status, payload = HTTPStatus.OK, await self.projections(
+                        {
+                            "location": _param("location"),
+                            "years": [
+                                y_
+                                for value_ in params.get("year", [])
+                                for y_ in value_.split(",")
+                            ],
+                            "units": _param("units"),
+                            "source": _param("source", "builtin"),
+                        }
+                    )
+                else:
+                    try:
+                        data = json.loads(body or b"null")
+                    except ValueError:
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid JSON body.")
+                    status, payload = HTTPStatus.OK, await self.batch(data)
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown path '{path}'.")
+        except HTTPError as error:
+            status, payload = error.status, {"error": str(error)}
+        except Exception as error:
+            # e.g., NOAA could not be reached
+            status = HTTPStatus.BAD_GATEWAY
+            payload = {"error": f"{type(error).__name__}: {error}"}
+        self.metrics.record(f"{method} {route}", status, time.perf_counter() - start)
+        return int(status), payload
+
+
+def _allow(method: str, *methods: str) -> None:
+    if method not in methods:
+        raise HTTPError(
+            HTTPStatus.METHOD_NOT_ALLOWED, f"Use {' or '.join(methods)} on this path."
+        )
+
+
+class ProjectionServer:
+    """ProjectionServer serves a ProjectionService over HTTP/1.1 with keep-alive
+    connections, using asyncio streams.
+
+    Run it in the current thread with serve_forever, e.g., through serve(), or
+    in a background thread with start and stop (also as a context manager),
+    which is convenient for tests and load tests on a single machine.
+
+    Attributes
+    ----------
+    host : str
+        Interface to listen on, by default '127.0.0.1'
+    port : int
+        Port to listen on; 0 picks a free port, available once started
+    service : ProjectionService
+        Service answering the requests
+
+    Examples
+    --------
+    >>> with ProjectionServer(port=0) as server:
+    ...     urllib.request.urlopen(f"{server.url}/projections?location=0&year=2050")
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        service: ProjectionService = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.service = ProjectionService() if service is None else service
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _listen(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        await self._listen()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await _respond(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "Bad request."}
+                    )
+                    break
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.service.handle(method, target, body)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await _respond(writer, status, payload, keep_alive=keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # The server is stopping; the connection task simply ends
+            pass
+        finally:
+            writer.close()
+
+    async def _shutdown(self) -> None:
+        self._server.close()
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        for task_ in tasks:
+            task_.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def start(self) -> "ProjectionServer":
+        """Serves in a background thread; returns once the server listens"""
+        ready = threading.Event()
+        failure = []
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._listen())
+            except Exception as error:
+                failure.append(error)
+                ready.set()
+                return
+            ready.set()
+            self._loop.run_forever()
+            # Close idle keep-alive connections before the loop itself
+            self._loop.run_until_complete(self._shutdown())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+        self.service.close()
+
+    def __enter__(self) -> "ProjectionServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+async def _respond(
+    writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool = False
+) -> None:
+    body = json.dumps(payload, allow_nan=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    preload: bool = True,
+    noaa_stations: typing.Sequence[str] = (),
+) -> None:
+    """Runs the HTTP service until interrupted
+
+    Parameters
+    ----------
+    host : str, optional
+        Interface to listen on, by default '127.0.0.1'
+    port : int, optional
+        Port to listen on, by default 8000
+    preload : bool, optional
+        Whether to load all builtin projection sets before serving, by default
+        True
+    noaa_stations : sequence of str, optional
+        NOAA stations whose projections are loaded before serving
+    """
+    server = ProjectionServer(
+        host=host,
+        port=port,
+        service=ProjectionService(preload=preload, noaa_stations=noaa_stations),
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.service.close()
@@ -1,21 +1,27 @@
 import typing
-from copy import deepcopy
+from copy import copy
 
-import json
-import urllib.request
-import warnings
-
-from matplotlib.pyplot import Axes, subplots
-from pandas import DataFrame, Series, concat
+import numpy as np
 
+from sealevelrise.catalog import Catalog, record_errors
+from sealevelrise.matrix import ScenarioMatrix
+from sealevelrise.probability import ProbabilitySurface
 from sealevelrise.scenario import Scenario
 from sealevelrise.utils import (
-    ALL_BUILTIN_SCENARIOS,
+    BUILTIN_CATALOG,
     _check_units,
     _show_builtin_scenarios,
     _validate_key,
 )
 
+# pandas, matplotlib and the NOAA client are imported where they are used, so
+# that NumPy-only workflows never load them
+if typing.TYPE_CHECKING:
+    from matplotlib.pyplot import Axes
+    from pandas import DataFrame, Series
+
+    from sealevelrise.noaaapi import NOAASession
+
 
 # Scenarios contains multiple Scenario objects for a given location,
 # as well as additional metadata
@@ -41,74 +47,99 @@ class Scenarios:
 
         """
 
+        if scenarios is None:
+            scenarios = []
+        elif isinstance(scenarios, Scenario):
+            scenarios = [scenarios]
+
+        # All trajectories are gathered in one matrix; the Scenario objects held
+        # by this instance are views into its rows
+        self._set_matrix(
+            matrix=ScenarioMatrix.stack(
+                [(scenario_._matrix, scenario_._row) for scenario_ in scenarios]
+            ),
+            location_name=location_name,
+            station_id=station_id,
+            issuer=issuer,
+            url=url,
+        )
+
+    def _set_matrix(
+        self,
+        matrix: ScenarioMatrix,
+        location_name: str,
+        station_id: str,
+        issuer: str,
+        url: str,
+    ) -> None:
         self.location_name = location_name
         self.station_id = station_id
         self.issuer = issuer
         self.url = url
-        self.scenarios = scenarios
+        self.matrix = matrix
+        self.scenarios = [
+            Scenario._view(self.matrix, row_) for row_ in range(matrix.shape[0])
+        ]
         self.shape = (len(self.scenarios),)
 
+    def _set_record(self, data: dict) -> None:
+        """Builds the matrix of a record that was already validated, in one pass
+        and without going through the Scenario and Data constructors"""
+        scenarios_data = data["scenarios"]
+        self._set_matrix(
+            matrix=ScenarioMatrix.from_rows(
+                x=[scenario_["data"]["x"] for scenario_ in scenarios_data],
+                y=[scenario_["data"]["y"] for scenario_ in scenarios_data],
+                units=[scenario_["units"] for scenario_ in scenarios_data],
+                descriptions=[scenario_["description"] for scenario_ in scenarios_data],
+                short_names=[scenario_["short name"] for scenario_ in scenarios_data],
+                probabilities=[
+                    scenario_["probability (CDF)"] for scenario_ in scenarios_data
+                ],
+                baseline_years=[
+                    scenario_["baseline year"] for scenario_ in scenarios_data
+                ],
+            ),
+            location_name=data["location name"],
+            station_id=data["station ID (CO-OPS)"],
+            issuer=data["issuer"],
+            # Optional properties; data is left untouched
+            url=data.get("URL"),
+        )
+
     @classmethod
-    def from_dict(cls, data: dict):
+    def from_dict(cls, data: dict, validate: bool = True):
         """Constructs a Scenarios instance from a dictionary
 
         Parameters
         ----------
         data : dict
             Dictionary that has the basic info required to build Scenarios
+        validate : bool, optional
+            If True (default), data is checked against the schema of
+            'data/scenarios.json' first; pass False only for records already
+            validated, e.g., by Catalog.validate
 
         Returns
         -------
         Scenarios
             A new Scenarios instance
-        """
 
-        # Check that you have the right data in there
-        if not isinstance(data, dict):
-            raise TypeError("data needs to be dictionary")
-        if data is not None:
-            for attr in ["location name", "station ID (CO-OPS)", "scenarios"]:
-                if attr not in data:
-                    raise KeyError(f"The {attr} key is missing or mispelled.")
-        else:
-            raise ValueError("data was passed as None")
-
-        # Record properties; optional are popped
-        location_name = data["location name"]
-        station_id = data["station ID (CO-OPS)"]
-        issuer = data["issuer"]
-        # Optional properties
-        url = data.pop("URL", None)
-
-        # Build the scenarios from the dictionary
-        scenarios_data = data["scenarios"]
-
-        # Record all Scenario objects into a list of Scenario objects
-        scenarios_list = list()
-
-        # Iterate over each items in the dictionary
-        for scenario_ in scenarios_data:
-            scenarios_list.append(
-                Scenario(
-                    description=scenario_["description"],
-                    short_name=scenario_["short name"],
-                    units=scenario_["units"],
-                    probability=scenario_["probability (CDF)"],
-                    baseline_year=scenario_["baseline year"],
-                    data=scenario_["data"],
-                )
-            )
-
-        return cls(
-            scenarios=scenarios_list,
-            location_name=location_name,
-            station_id=station_id,
-            issuer=issuer,
-            url=url,
-        )
+        Raises
+        ------
+        TypeError, KeyError or ValueError
+            If validate is True and data does not follow the schema
+        """
+        if validate:
+            errors = record_errors(data)
+            if errors:
+                raise errors[0]
+        scenarios = cls.__new__(cls)
+        scenarios._set_record(data)
+        return scenarios
 
     @classmethod
-    def from_builtin(cls, key: typing.Union[str, int]):
+    def from_builtin(cls, key: typing.Union[str, int], catalog: Catalog = None):
         """Generates a Scenarios isinstance from one of the builtin scenarios.
 
         Parameters
@@ -122,104 +153,107 @@ class Scenarios:
         * a key from the scenarios.json file, e.g., 'cocat-2018-9414290'
 
         In case multiple matches are possible, the first match will be returned.
+        catalog : Catalog, optional
+            The catalog holding the scenarios, e.g., a SQLiteCatalog; by default
+            the builtin catalog
 
         Returns
         -------
         Scenarios
-            Scenarios instance corresponding to the key provided
+            Scenarios instance corresponding to the key provided. Its arrays are
+            read-only and shared by all instances returned for that key, as the
+            record is parsed once per catalog; changes such as
+            convert(inplace=True) replace the arrays of this instance only. Use
+            copy() for writeable arrays.
         """
-        target_key = _validate_key(key=key)
-        return cls.from_dict(data=ALL_BUILTIN_SCENARIOS[target_key])
-
-    @classmethod
-    def from_noaa(cls, station_id: str = None, **kwargs):
-        # NOAA returns cm if metric is selected; in if english is selected
-        _report_year = kwargs.pop("Report Year", 2022)
-        _units = kwargs.pop("Data Units", "metric")
-        if _units == "metric":
-            units = "cm"
-        else:
-            units = "in"
+        if catalog is None:
+            catalog = BUILTIN_CATALOG
+        target_key = _validate_key(key=key, catalog=catalog)
+        scenarios = cls.__new__(cls)
+        scenarios._share(Scenarios._shared(catalog, target_key))
+        return scenarios
 
-        _station_ID = station_id
-        _base_URL = (
-            "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi/product"
-            "/slr_projections.json"
+    @staticmethod
+    def _shared(catalog: Catalog, key: str) -> "Scenarios":
+        # Frozen instance of a catalog record, built once and kept in the
+        # projections cache of the catalog; records are validated on first use
+        def _build() -> Scenarios:
+            scenarios = Scenarios.__new__(Scenarios)
+            scenarios._set_record(catalog.load_validated(key))
+            scenarios.matrix.freeze()
+            return scenarios
+
+        return catalog.projections.get_or_create(key, _build)
+
+    def _share(self, source: "Scenarios") -> None:
+        # Views over the arrays of source, without any copy
+        self._set_matrix(
+            matrix=source.matrix.share(),
+            location_name=source.location_name,
+            station_id=source.station_id,
+            issuer=source.issuer,
+            url=source.url,
         )
 
-        # Get the trend object from NOAA API
-        _link = (
-            rf"{_base_URL}"
-            rf"/?station={_station_ID}"
-            rf"&units={_units}"
-            rf"&report_year={_report_year}"
-        )
+    def copy(self) -> "Scenarios":
+        """Returns an independent copy of this instance, with writeable arrays
 
-        # Load and append
-        with urllib.request.urlopen(_link) as url:
-            try:
-                data = json.loads(url.read())["Scenarios"]
-            except ConnectionError:
-                warnings.warn("Something came up while retrieving data from NOAA")
-
-        _data = DataFrame.from_dict(data)
-
-        # NOAA has specific scenarios, and these are their properties
-        noaa_scenario_props = {
-            "Low": {
-                "Description": "NOAA Low",
-                "Short Name": "Low",
-                "Probability": None,
-            },
-            "Intermediate-Low": {
-                "Description": "NOAA Intermediate-Low",
-                "Short Name": "Intermediate-Low",
-                "Probability": None,
-            },
-            "Intermediate": {
-                "Description": "NOAA Intermediate",
-                "Short Name": "Intermediate",
-                "Probability": None,
-            },
-            "Intermediate-High": {
-                "Description": "NOAA Intermediate-High",
-                "Short Name": "Intermediate-High",
-                "Probability": None,
-            },
-            "High": {
-                "Description": "NOAA High",
-                "Short Name": "High",
-                "Probability": None,
-            },
-        }
-
-        # Launch the sequence and create the list of scenarios
-        scenarios = list()
-        for key_ in noaa_scenario_props.keys():
-            scenario_ = _data[_data.loc[:, "scenario"] == key_]
-            scenarios.append(
-                Scenario(
-                    description=noaa_scenario_props[key_]["Description"],
-                    short_name=noaa_scenario_props[key_]["Short Name"],
-                    units=units,
-                    probability=noaa_scenario_props[key_]["Probability"],
-                    baseline_year=2005,
-                    data={
-                        "x": scenario_.loc[:, "projectionYear"].values,
-                        "y": scenario_.loc[:, "projectionRsl"].values,
-                    },
-                )
-            )
-        
-        # The name of the location is retrieved from the last scenario_ chunk
-        location_name = scenario_.loc[:, "stationName"].values[0]
+        Returns
+        -------
+        Scenarios
+            A new Scenarios instance that does not share data with this one
+        """
+        duplicate = copy(self)
+        duplicate.matrix = self.matrix.copy()
+        duplicate.scenarios = [
+            Scenario._view(duplicate.matrix, row_)
+            for row_ in range(len(self.scenarios))
+        ]
+        return duplicate
 
+    @classmethod
+    def from_noaa(cls, station_id: str = None, session: "NOAASession" = None, **kwargs):
+        """Generates a Scenarios instance from the NOAA projections at a station.
+        Responses are served from the NOAA response cache when available.
 
+        Parameters
+        ----------
+        station_id : str
+            NOAA CO-OPS identifier of the station, e.g., '9414290'
+        session : NOAASession, optional
+            Session used to send the request over pooled connections
+        **kwargs
+            'Report Year' (default 2022) and 'Data Units' (default 'metric')
+
+        Returns
+        -------
+        Scenarios
+            Scenarios instance with the NOAA scenarios at that station
+        """
+        from sealevelrise.noaaslr import (
+            NOAA_ISSUER,
+            NOAA_URL,
+            _fetch_noaa_scenarios,
+        )
+
+        scenarios, location_name, _ = _fetch_noaa_scenarios(
+            station_id=station_id,
+            report_year=kwargs.pop("Report Year", 2022),
+            data_units=kwargs.pop("Data Units", "metric"),
+            session=session,
+        )
+        return cls(
+            scenarios=scenarios,
+            location_name=location_name,
+            station_id=station_id,
+            issuer=NOAA_ISSUER,
+            url=NOAA_URL,
+        )
 
     @staticmethod
     def show_all_builtin_scenarios(
         format: str = "list",
-    ) -> typing.Union[str, DataFrame]:
+    ) -> typing.Union[str, "DataFrame"]:
         """Simple function that lists all builtin scenarios available
 
         Parameters
@@ -254,7 +288,7 @@ class Scenarios:
         return self.scenarios[key]
 
     @property
-    def dataframe(self) -> DataFrame:
+    def dataframe(self) -> "DataFrame":
         """Builds a pd.DataFrame from all Scenario objects in this instance
 
         Returns
@@ -263,7 +297,57 @@ class Scenarios:
             A single pd.DataFrame containing all Scenario.data.x and
             Scenario.data.y instances
         """
-        df = concat([scenario_.dataframe for scenario_ in self.scenarios], axis=1)
+        return self.frame(copy=True)
+
+    def frame(self, copy: bool = True) -> "DataFrame":
+        """Returns the DataFrame of all Scenario objects, materialized once and
+        cached until the values or units change (e.g., with convert(inplace=True)).
+
+        Parameters
+        ----------
+        copy : bool, optional
+            If True (default), returns an independent copy of the cached frame.
+            If False, returns the cached frame itself: it is read-only and backed
+            by the underlying ScenarioMatrix arrays, without any copy.
+
+        Returns
+        -------
+        DataFrame
+            A single pd.DataFrame containing all Scenario.data.x and
+            Scenario.data.y instances
+        """
+        matrix = self.matrix
+        df = matrix.frame(
+            "all",
+            lambda: self._frame(
+                values=matrix.readonly(matrix.values.T),
+                years=matrix.readonly(matrix.years),
+                copy=False,
+            ),
+        )
+        return df.copy() if copy else df
+
+    def _frame(
+        self, values: np.ndarray, years: np.ndarray, copy: bool = True
+    ) -> "DataFrame":
+        # Builds a years x scenarios DataFrame labelled like Scenario.dataframe
+        from pandas import DataFrame
+
+        matrix = self.matrix
+        df = DataFrame(
+            data=values,
+            index=years,
+            columns=[
+                f"{short_name_}, {100. * probability_:.2f}% [{units_}]"
+                for short_name_, probability_, units_ in zip(
+                    matrix.short_names, matrix.probabilities, matrix.units
+                )
+            ],
+            copy=copy,
+        )
+        baseline_years = set(matrix.baseline_years)
+        if len(baseline_years) == 1:
+            df.index.name = f"Year (baseline: {baseline_years.pop()})"
         return df
 
     @property
@@ -279,41 +363,45 @@ class Scenarios:
             either a list or a single value out of 'm', 'ft', 'in', or 'cm'.
         """
         # Returns the units of each Scenario
-        units = []
-        for scenario in self.scenarios:
-            units.append(scenario.units)
+        units = self.matrix.units
 
         if all(x == units[0] for x in units):
             return units[0]
         else:
-            return units
+            return list(units)
 
     def by_horizon_year(
-        self, horizon_year: float, merge: bool = True, coerce_errors: bool = False
-    ) -> typing.Union[Series, DataFrame]:
+        self,
+        horizon_year: typing.Union[float, typing.Sequence[float], np.ndarray],
+        merge: bool = True,
+        coerce_errors: bool = False,
+    ) -> typing.Union["Series", "DataFrame"]:
         """Generate a Series with projected values for SLR
-        for a given horizon year for each Scenario. It is a wrapper of the method
-        from the Scenario class
+        for a given horizon year for each Scenario. All Scenario objects are
+        interpolated at once, and several horizon years can be requested in a
+        single call.
 
         Parameters
         ----------
-        horizon_year : float or int
-            Value for the horizon year (e.g. 2055)
+        horizon_year : float, int, or array-like
+            Value(s) for the horizon year (e.g. 2055, or range(2025, 2151))
         merge: bool, optional
             If set to True (default), will returns a the projected value merged with
             the built-in projections as a pandas.DataFrame instance.
             If set to False, will return a pandas.Series instance with the projected
-            values for each Scenario
+            values for each Scenario, or a pandas.DataFrame with one row per
+            Scenario and one column per horizon year if several years were given
             The difference is primarily cosmetic
         coerce_errors: bool, optional
-            If set to True (default), will coerce linear interpolation errors by
-            replacing with np.nan; if set to False, will raise errors
+            If set to True, will coerce linear interpolation errors by
+            replacing with np.nan; if set to False (default), will raise errors
 
         Returns
         -------
         Series
             List of projected values by the horizon year OR
         DataFrame
+            Scenarios x horizon years projected values (merge=False) OR
             Merged DataFrame with built-in projections and the newly calculated
             projections
 
@@ -323,28 +411,124 @@ class Scenarios:
             If the horizon year exceeds the range provided in the original data.
         """
 
-        proj = dict()
-        for scenario in self.scenarios:
-            proj[scenario.short_name] = scenario.by_horizon_year(
-                horizon_year=horizon_year
-            )
-        ds = Series(
-            data=proj,
-            name=f"SLR at {self.location_name} by {horizon_year} [{self.units}]",
-        )
+        # Interpolate all Scenario objects at once
+        matrix = self.matrix
+        proj = matrix.interp(horizon_year, coerce_errors=coerce_errors)
+        horizon_years = np.atleast_1d(np.asarray(horizon_year, dtype=float))
 
         if not merge:
+            from pandas import DataFrame, Index, Series
+
             # Simply return calculated values
-            return ds
+            if np.ndim(horizon_year) == 0:
+                return Series(
+                    data=proj,
+                    index=matrix.short_names,
+                    name=(
+                        f"SLR at {self.location_name} by {horizon_year} "
+                        f"[{self.units}]"
+                    ),
+                )
+            return DataFrame(
+                data=proj.reshape(len(matrix.short_names), -1),
+                index=matrix.short_names,
+                columns=Index(horizon_years, name="Horizon year"),
+            )
         else:
-            # Deep copy of existing (built-in) projections
-            df = self.dataframe.copy(deep=True)
-            # Include new values
-            df.loc[horizon_year, :] = ds.values
-            df.sort_index(inplace=True)
-            return df
-
-    def convert(self, to_units: str, inplace: bool = False) -> DataFrame:
+            # Lay out the built-in projections and the new values on a single
+            # year axis; new values take precedence on years already present
+            years = np.union1d(matrix.years, horizon_years)
+            values = np.full((years.size, matrix.shape[0]), np.nan)
+            values[np.searchsorted(years, matrix.years)] = matrix.values.T
+            values[np.searchsorted(years, horizon_years)] = proj.reshape(
+                matrix.shape[0], -1
+            ).T
+            return self._frame(values=values, years=years)
+
+    def crossing_years(
+        self,
+        thresholds: typing.Union[float, typing.Sequence[float], np.ndarray],
+        units: str = None,
+    ) -> typing.Union["Series", "DataFrame"]:
+        """Calculates the year at which each Scenario first reaches each SLR
+        threshold. All Scenario objects and thresholds are searched at once.
+
+        Parameters
+        ----------
+        thresholds : float or array-like
+            Value(s) of SLR to reach, e.g., the elevation of each asset of a
+            portfolio
+        units : str, optional
+            Units of the thresholds, one of 'm', 'cm', 'mm', 'in', and 'ft'; by
+            default the units of each Scenario
+
+        Returns
+        -------
+        Series
+            Crossing year of each Scenario if a single threshold was given OR
+        DataFrame
+            Scenarios x thresholds crossing years
+
+        Notes
+        -----
+        Null values are skipped and interpolated over. Thresholds never reached
+        within the range of the data are reported as np.inf, and thresholds
+        already exceeded at the first year of the data as -np.inf.
+        """
+        matrix = self.matrix
+        years = matrix.crossing_years(thresholds, units=units)
+        if units is None:
+            units = self.units if isinstance(self.units, str) else "scenario units"
+
+        from pandas import DataFrame, Index, Series
+
+        if np.ndim(thresholds) == 0:
+            return Series(
+                data=years,
+                index=matrix.short_names,
+                name=f"Year SLR reaches {thresholds} [{units}] at {self.location_name}",
+            )
+        return DataFrame(
+            data=years.reshape(len(matrix.short_names), -1),
+            index=matrix.short_names,
+            columns=Index(
+                np.atleast_1d(np.asarray(thresholds, dtype=float)).ravel(),
+                name=f"Threshold [{units}]",
+            ),
+        )
+
+    def probability_surface(self, units: str = None) -> ProbabilitySurface:
+        """Returns the probability x year surface of SLR values spanned by the
+        Scenario objects that carry a probability (CDF).
+
+        The surface is built on first use and cached until the values or units
+        change; query it with arrays of (probability, year) pairs, or invert it
+        to get the exceedance probability of SLR values.
+
+        Parameters
+        ----------
+        units : str, optional
+            Units of the surface, one of 'm', 'cm', 'mm', 'in', and 'ft'; by
+            default the units of the Scenarios
+
+        Returns
+        -------
+        ProbabilitySurface
+            The surface, see ProbabilitySurface.value, cdf and exceedance
+
+        Raises
+        ------
+        ValueError
+            If fewer than two Scenario objects have distinct probabilities, or if
+            units are mixed and none were given
+        """
+        matrix = self.matrix
+        return matrix.derived(
+            ("surface", units),
+            lambda: ProbabilitySurface.from_matrix(matrix, units=units),
+        )
+
+    def convert(self, to_units: str, inplace: bool = False) -> "DataFrame":
         """Provides on the fly or inplace units conversion for all Scenarios
         within a Scenarios instance.
 
@@ -370,33 +554,55 @@ class Scenarios:
         # Check the units
         _check_units(to_units)
 
-        # Scan over Scenario objects and change the units
+        # Convert all Scenario objects at once
         if inplace:
-            for scenario_ in self.scenarios:
-                scenario_.data.convert(to_units=to_units, inplace=True)
+            self.matrix.convert(to_units=to_units)
             return self.dataframe
         else:
-            # create a deep copy and output it
-            temp = deepcopy(self)
-            for scenario_ in temp.scenarios:
-                scenario_.data.convert(to_units=to_units, inplace=True)
-            return temp.dataframe
+            # Only the values are scaled; metadata and years are shared
+            return self.as_units(to_units=to_units).dataframe
+
+    def as_units(self, to_units: str) -> "Scenarios":
+        """Returns a unit-converted view of this Scenarios instance.
+
+        The view shares the metadata, years, and Scenario descriptions with this
+        instance; the values are scaled with a single multiplication and this
+        instance is left untouched.
+
+        Parameters
+        ----------
+        to_units : str
+            The value of the destination units, one of 'm', 'cm', 'mm', 'in', and
+            'ft'
+
+        Returns
+        -------
+        Scenarios
+            A new Scenarios instance with values expressed in to_units
+        """
+        view = copy(self)
+        view.matrix = self.matrix.as_units(to_units)
+        view.scenarios = [
+            Scenario._view(view.matrix, row_) for row_ in range(len(self.scenarios))
+        ]
+        return view
 
-    def plot(self, ax: Axes = None, horizon_year: float = None) -> Axes:
+    def plot(self, ax: "Axes" = None, horizon_year: float = None) -> "Axes":
+        from matplotlib.pyplot import subplots
 
         # Handle ax
         if ax is None:
             _, ax = subplots(1, 1, figsize=(5.35, 3.5))
 
         # Graphics
-        for index, series in self.dataframe.iteritems():
+        for index, series in self.frame(copy=False).items():
             ax.plot(series, label=series.name)
 
         # Handle horizon year
         if horizon_year is not None:
             ds = self.by_horizon_year(horizon_year=horizon_year, merge=False)
             ax.axvline(x=horizon_year, **{"ls": "--", "lw": 1, "c": "lightgray"})
-            for name, val in ds.iteritems():
+            for name, val in ds.items():
                 ax.scatter(x=horizon_year, y=val)
 
         # Plot all values
@@ -0,0 +1,352 @@
+import json
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+
+from sealevelrise.catalog import (
+    BuiltinCatalog,
+    Catalog,
+    CatalogEntry,
+    _entry_from_record,
+)
+
+# Record keys stored in their own columns; any other key of a record is kept in
+# the 'extra' column as JSON so that records survive a round trip
+_SET_COLUMNS = {
+    "location name": "location_name",
+    "station ID (CO-OPS)": "station_id",
+    "issuer": "issuer",
+    "URL": "url",
+}
+_SCENARIO_COLUMNS = {
+    "description": "description",
+    "short name": "short_name",
+    "units": "units",
+    "probability (CDF)": "probability",
+    "baseline year": "baseline_year",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projection_sets (
+    position INTEGER NOT NULL,
+    key TEXT PRIMARY KEY,
+    location_name TEXT,
+    station_id TEXT,
+    issuer TEXT,
+    url TEXT,
+    first_year REAL,
+    last_year REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS projection_sets_position ON projection_sets (position);
+CREATE INDEX IF NOT EXISTS projection_sets_issuer ON projection_sets (issuer);
+CREATE INDEX IF NOT EXISTS projection_sets_station ON projection_sets (station_id);
+CREATE INDEX IF NOT EXISTS projection_sets_location
+    ON projection_sets (location_name);
+CREATE INDEX IF NOT EXISTS projection_sets_years
+    ON projection_sets (first_year, last_year);
+CREATE TABLE IF NOT EXISTS scenarios (
+    set_key TEXT NOT NULL REFERENCES projection_sets (key) ON DELETE CASCADE,
+    scenario INTEGER NOT NULL,
+    description TEXT,
+    short_name TEXT,
+    units TEXT,
+    probability REAL,
+    baseline_year NUMERIC,
+    extra TEXT,
+    PRIMARY KEY (set_key, scenario)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scenario_values (
+    set_key TEXT NOT NULL REFERENCES projection_sets (key) ON DELETE CASCADE,
+    scenario INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    year NUMERIC,
+    value REAL,
+    PRIMARY KEY (set_key, scenario, position)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteCatalog(Catalog):
+    """SQLiteCatalog stores projection sets in a SQLite database, with indexed
+    tables for projection sets, scenarios and values.
+
+    It offers the same interface as BuiltinCatalog, so it can be passed wherever
+    a catalog is expected (e.g., Scenarios.from_builtin). Loading a record only
+    reads the rows of that record, through the primary keys, and queries by
+    issuer, station, location or years run against indexed columns. Records are
+    added from dictionaries in the schema of 'data/scenarios.json', or imported
+    in bulk from a JSON catalog.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the database file; ':memory:' keeps it in memory
+
+    Examples
+    --------
+    >>> catalog = SQLiteCatalog("projections.sqlite")
+    >>> catalog.import_json(BUILTIN_CATALOG)
+    7
+    >>> [entry.key for entry in catalog.query(issuer="California OPC 2018")]
+    ['cocat-2018-9414290', ...]
+    >>> Scenarios.from_builtin("9414290", catalog=catalog)
+    """
+
+    def __init__(self, path: typing.Union[str, Path] = ":memory:") -> None:
+        super().__init__()
+        self.path = path if path == ":memory:" else Path(path)
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+        # One connection is shared by all threads; statements are serialized
+        self._lock = threading.Lock()
+        self._headers = None
+
+    def _execute(self, sql: str, parameters: typing.Sequence = ()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _invalidate(self) -> None:
+        self._headers = None
+        self._order = None
+        self._lookup = None
+        # Records may have been replaced; they are checked and built again on
+        # next use
+        self._trusted = set()
+        self.projections.invalidate()
+
+    @property
+    def headers(self) -> typing.Dict[str, CatalogEntry]:
+        """Header index of the catalog, read from the projection_sets table only"""
+        if self._headers is None:
+            rows = self._execute(
+                "SELECT key, location_name, issuer, station_id, first_year, last_year"
+                " FROM projection_sets ORDER BY position"
+            )
+            self._headers = {row_[0]: _entry_from_row(row_) for row_ in rows}
+        return self._headers
+
+    def add(self, records: typing.Mapping[str, dict], replace: bool = True) -> int:
+        """Adds records to the catalog in a single transaction
+
+        Parameters
+        ----------
+        records : mapping of str to dict
+            Records in the schema of 'data/scenarios.json', by key; a Catalog
+            instance can be given directly
+        replace : bool, optional
+            If True (default), records replace existing entries with the same
+            key; if False, an existing key raises sqlite3.IntegrityError
+
+        Returns
+        -------
+        int
+            Number of records added
+        """
+        added = 0
+        with self._lock, self._connection:
+            (position,) = self._connection.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM projection_sets"
+            ).fetchone()
+            for key_ in records:
+                existing = self._connection.execute(
+                    "SELECT position FROM projection_sets WHERE key = ?", (key_,)
+                ).fetchone()
+                if existing is not None and replace:
+                    # Replaced entries keep their place in the catalog
+                    self._connection.execute(
+                        "DELETE FROM projection_sets WHERE key = ?", (key_,)
+                    )
+                    _insert_record(self._connection, key_, records[key_], existing[0])
+                else:
+                    _insert_record(self._connection, key_, records[key_], position)
+                    position += 1
+                added += 1
+        self._invalidate()
+        return added
+
+    def import_json(
+        self, source: typing.Union[str, Path, Catalog], replace: bool = True
+    ) -> int:
+        """Imports all records of a JSON catalog, such as the builtin one
+
+        Parameters
+        ----------
+        source : str, Path, or Catalog
+            Path to a JSON file in the schema of 'data/scenarios.json', or an
+            already opened catalog
+        replace : bool, optional
+            See SQLiteCatalog.add
+
+        Returns
+        -------
+        int
+            Number of records imported
+        """
+        if not isinstance(source, Catalog):
+            source = BuiltinCatalog(path=source)
+        return self.add(source, replace=replace)
+
+    def remove(self, key: str) -> None:
+        """Removes an entry along with its scenarios and values"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM projection_sets WHERE key = ?", (key,)
+            )
+        self._invalidate()
+
+    def load(self, key: str) -> dict:
+        """Reads the full record of a single entry
+
+        Parameters
+        ----------
+        key : str
+            Key of the entry in the catalog, e.g., 'cocat-2018-9414290'
+
+        Returns
+        -------
+        dict
+            A new record in the schema of 'data/scenarios.json'
+        """
+        with self._lock:
+            header = self._connection.execute(
+                "SELECT location_name, station_id, issuer, url, extra"
+                " FROM projection_sets WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if header is None:
+                raise KeyError(key)
+            scenarios = self._connection.execute(
+                "SELECT description, short_name, units, probability, baseline_year,"
+                " extra FROM scenarios WHERE set_key = ? ORDER BY scenario",
+                (key,),
+            ).fetchall()
+            values = self._connection.execute(
+                "SELECT scenario, year, value FROM scenario_values"
+                " WHERE set_key = ? ORDER BY scenario, position",
+                (key,),
+            ).fetchall()
+
+        location_name, station_id, issuer, url, extra = header
+        record = json.loads(extra) if extra else dict()
+        record.update(
+            {"location name": location_name, "station ID (CO-OPS)": station_id}
+        )
+        record["issuer"] = issuer
+        if url is not None:
+            record["URL"] = url
+        record["scenarios"] = []
+        for row_ in scenarios:
+            scenario = json.loads(row_[5]) if row_[5] else dict()
+            scenario.update(zip(_SCENARIO_COLUMNS, row_[:5]))
+            scenario["data"] = {"x": [], "y": []}
+            record["scenarios"].append(scenario)
+        for scenario_, year_, value_ in values:
+            data = record["scenarios"][scenario_]["data"]
+            data["x"].append(year_)
+            data["y"].append(value_)
+        return record
+
+    def query(
+        self,
+        issuer: str = None,
+        station_id: str = None,
+        location_name: str = None,
+        years: typing.Tuple[float, float] = None,
+    ) -> typing.List[CatalogEntry]:
+        """Returns the headers of the entries matching all given criteria, using
+        the indexes of the projection_sets table; see Catalog.query"""
+        clauses, parameters = [], []
+        for column_, value_ in [
+            ("issuer", issuer),
+            ("station_id", station_id),
+            ("location_name", location_name),
+        ]:
+            if value_ is not None:
+                clauses.append(f"{column_} = ?")
+                parameters.append(value_)
+        if years is not None:
+            clauses.append("first_year <= ? AND last_year >= ?")
+            parameters.extend(years)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._execute(
+            "SELECT key, location_name, issuer, station_id, first_year, last_year"
+            f" FROM projection_sets{where} ORDER BY position",
+            parameters,
+        )
+        return [_entry_from_row(row_) for row_ in rows]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "SQLiteCatalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"SQLiteCatalog('{self.path}', {len(self)} entries)"
+
+
+def _entry_from_row(row: tuple) -> CatalogEntry:
+    key, location_name, issuer, station_id, first_year, last_year = row
+    return CatalogEntry(
+        key=key,
+        location_name=location_name,
+        issuer=issuer,
+        station_id=station_id,
+        first_year=float("nan") if first_year is None else first_year,
+        last_year=float("nan") if last_year is None else last_year,
+    )
+
+
+def _insert_record(
+    connection: sqlite3.Connection, key: str, record: dict, position: int
+) -> None:
+    header = _entry_from_record(key=key, record=record)
+    extra = {
+        k_: v_
+        for k_, v_ in record.items()
+        if k_ not in _SET_COLUMNS and k_ != "scenarios"
+    }
+    connection.execute(
+        "INSERT INTO projection_sets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            position,
+            key,
+            record.get("location name"),
+            record.get("station ID (CO-OPS)"),
+            record.get("issuer"),
+            record.get("URL"),
+            # NaN is stored as NULL by SQLite
+            header.first_year,
+            header.last_year,
+            json.dumps(extra) if extra else None,
+        ),
+    )
+    scenario_rows, value_rows = [], []
+    for scenario_, item_ in enumerate(record.get("scenarios", [])):
+        extra = {
+            k_: v_
+            for k_, v_ in item_.items()
+            if k_ not in _SCENARIO_COLUMNS and k_ != "data"
+        }
+        scenario_rows.append(
+            (key, scenario_)
+            + tuple(item_.get(k_) for k_ in _SCENARIO_COLUMNS)
+            + (json.dumps(extra) if extra else None,)
+        )
+        data = item_.get("data", {})
+        value_rows.extend(
+            (key, scenario_, position_, x_, y_)
+            for position_, (x_, y_) in enumerate(zip(data["x"], data["y"]))
+        )
+    connection.executemany(
+        "INSERT INTO scenarios VALUES (?, ?, ?, ?, ?, ?, ?, ?)", scenario_rows
+    )
+    connection.executemany(
+        "INSERT INTO scenario_values VALUES (?, ?, ?, ?, ?)", value_rows
+    )
@@ -0,0 +1,288 @@
+import typing
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame, read_csv
+
+from sealevelrise.utils import BUILTIN_CATALOG
+
+# scipy is optional; without it, queries fall back to a chunked brute force
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # pragma: no cover
+    cKDTree = None
+
+BUILTIN_STATIONS_PATH = Path(__file__).parent / "data/stations.csv"
+EARTH_RADIUS_KM = 6371.0088
+
+# Number of point x station distances computed at once by the brute force
+_BLOCK_SIZE = 2**22
+
+
+def _unit_vectors(
+    latitude: typing.Union[float, np.ndarray],
+    longitude: typing.Union[float, np.ndarray],
+) -> np.ndarray:
+    # Points on the unit sphere, shape (n, 3)
+    latitude = np.radians(np.asarray(latitude, dtype=float)).ravel()
+    longitude = np.radians(np.asarray(longitude, dtype=float)).ravel()
+    if latitude.shape != longitude.shape:
+        raise ValueError("latitude and longitude must have the same shape.")
+    if np.any(np.abs(latitude) > np.pi / 2):
+        raise ValueError("Latitudes must be within [-90; 90] degrees.")
+    cos_lat = np.cos(latitude)
+    return np.column_stack(
+        [cos_lat * np.cos(longitude), cos_lat * np.sin(longitude), np.sin(latitude)]
+    )
+
+
+def _chord_to_km(chord: np.ndarray) -> np.ndarray:
+    # Straight-line distance between unit vectors to great-circle distance
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+def _km_to_chord(distance: float) -> float:
+    return 2.0 * np.sin(min(distance / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+class StationIndex:
+    """StationIndex answers nearest-station and radius queries for large arrays of
+    coordinates.
+
+    Stations are placed on the unit sphere and indexed with a KD-tree when scipy
+    is available; otherwise, queries are answered by a NumPy brute force over
+    blocks of points, which keeps memory bounded. Distances are great-circle
+    distances in kilometers. The station table is read on first use.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the CSV table with 'station_id', 'name', 'state', 'latitude'
+        and 'longitude' columns
+
+    Examples
+    --------
+    >>> stations = StationIndex()
+    >>> distance, position = stations.nearest(37.8, -122.4)
+    >>> stations.station_ids[position]
+    array([['9414290']], dtype=object)
+    """
+
+    def __init__(
+        self,
+        path: typing.Union[str, Path] = BUILTIN_STATIONS_PATH,
+        table: DataFrame = None,
+    ) -> None:
+        self.path = Path(path) if table is None else None
+        self._table = table
+        self._vectors = None
+        self._tree = None
+        self._keys = None
+        self._builtin = None
+
+    @property
+    def table(self) -> DataFrame:
+        if self._table is None:
+            self._table = read_csv(self.path, dtype={"station_id": str})
+        return self._table
+
+    @property
+    def station_ids(self) -> np.ndarray:
+        return self.table["station_id"].to_numpy(dtype=object)
+
+    @property
+    def keys(self) -> np.ndarray:
+        """Keys of the builtin scenarios of each station in catalog order, as a
+        tuple that is empty where there are none"""
+        if self._keys is None:
+            by_station = {}
+            for key_, header_ in BUILTIN_CATALOG.headers.items():
+                if header_.station_id is not None:
+                    by_station.setdefault(header_.station_id, []).append(key_)
+            self._keys = np.empty(len(self), dtype=object)
+            self._keys[:] = [tuple(by_station.get(id_, ())) for id_ in self.station_ids]
+        return self._keys
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            self._vectors = _unit_vectors(
+                self.table["latitude"].to_numpy(), self.table["longitude"].to_numpy()
+            )
+            if cKDTree is not None:
+                self._tree = cKDTree(self._vectors)
+        return self._vectors
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __repr__(self) -> str:
+        return f"StationIndex({len(self)} stations)"
+
+    def subset(self, positions: np.ndarray) -> "StationIndex":
+        """Returns a new StationIndex restricted to the stations at positions"""
+        return StationIndex(table=self.table.iloc[positions].reset_index(drop=True))
+
+    def nearest(
+        self,
+        latitude: typing.Union[float, np.ndarray],
+        longitude: typing.Union[float, np.ndarray],
+        k: int = 1,
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Finds the k nearest stations of each point
+
+        Parameters
+        ----------
+        latitude, longitude : float or np.ndarray
+            Coordinates of the points in decimal degrees
+        k : int, optional
+            Number of stations per point, by default 1
+
+        Returns
+        -------
+        distance, position : np.ndarray
+            Great-circle distances in kilometers and positions of the stations in
+            the table, nearest first, both of shape (n_points, k)
+        """
+        stations = self.vectors
+        points = _unit_vectors(latitude, longitude)
+        k = min(k, len(stations))
+        if k < 1:
+            raise ValueError("k must be a positive integer and stations not empty.")
+
+        if self._tree is not None:
+            chord, position = self._tree.query(points, k=k)
+            chord = chord.reshape(len(points), k)
+            position = position.reshape(len(points), k)
+            return _chord_to_km(chord), position
+
+        distance = np.empty((len(points), k))
+        position = np.empty((len(points), k), dtype=int)
+        block = max(1, _BLOCK_SIZE // len(stations))
+        for start_ in range(0, len(points), block):
+            chunk = slice(start_, start_ + block)
+            # Largest cosines are the nearest stations
+            cosine = points[chunk] @ stations.T
+            nearest = np.argpartition(-cosine, k - 1, axis=1)[:, :k]
+            order = np.argsort(
+                -np.take_along_axis(cosine, nearest, axis=1), axis=1, kind="stable"
+            )
+            position[chunk] = np.take_along_axis(nearest, order, axis=1)
+            # Chords are more accurate than arccos for nearby stations
+            distance[chunk] = _chord_to_km(
+                np.linalg.norm(
+                    points[chunk, np.newaxis] - stations[position[chunk]], axis=2
+                )
+            )
+        return distance, position
+
+    def within(
+        self,
+        latitude: typing.Union[float, np.ndarray],
+        longitude: typing.Union[float, np.ndarray],
+        radius: float,
+    ) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Finds all stations within radius kilometers of each point
+
+        Parameters
+        ----------
+        latitude, longitude : float or np.ndarray
+            Coordinates of the points in decimal degrees
+        radius : float
+            Search radius in kilometers
+
+        Returns
+        -------
+        point, position, distance : np.ndarray
+            One item per (point, station) pair found, sorted by point then by
+            distance: the index of the point, the position of the station in the
+            table, and the great-circle distance in kilometers
+        """
+        stations = self.vectors
+        points = _unit_vectors(latitude, longitude)
+        chord = _km_to_chord(radius)
+
+        if self._tree is not None:
+            found = self._tree.query_ball_point(points, r=chord)
+            point = np.repeat(np.arange(len(points)), [len(f_) for f_ in found])
+            position = np.fromiter(
+                (p_ for f_ in found for p_ in f_), dtype=int, count=point.size
+            )
+        else:
+            points_, positions_ = [], []
+            block = max(1, _BLOCK_SIZE // max(1, len(stations)))
+            for start_ in range(0, len(points), block):
+                # Unit vectors within a chord are those with a large enough cosine
+                cosine = points[start_ : start_ + block] @ stations.T
+                rows, cols = np.nonzero(cosine >= 1.0 - chord**2 / 2.0)
+                points_.append(rows + start_)
+                positions_.append(cols)
+            point = np.concatenate(points_) if points_ else np.empty(0, dtype=int)
+            position = (
+                np.concatenate(positions_) if positions_ else np.empty(0, dtype=int)
+            )
+
+        distance = _chord_to_km(
+            np.linalg.norm(points[point] - stations[position], axis=1)
+        )
+        order = np.lexsort((distance, point))
+        return point[order], position[order], distance[order]
+
+    def resolve(
+        self,
+        latitude: typing.Union[float, np.ndarray],
+        longitude: typing.Union[float, np.ndarray],
+        builtin: bool = False,
+        max_distance: float = None,
+    ) -> DataFrame:
+        """Maps each point to its nearest station, and optionally to the nearest
+        station with builtin scenarios
+
+        Parameters
+        ----------
+        latitude, longitude : float or np.ndarray
+            Coordinates of the points in decimal degrees
+        builtin : bool, optional
+            If True, only stations with builtin scenarios are considered and their
+            keys are returned as well, by default False
+        max_distance : float, optional
+            Points farther than this many kilometers from any station are left
+            unresolved (missing values), by default None (no limit)
+
+        Returns
+        -------
+        DataFrame
+            One row per point with 'station_id', 'name', 'distance_km' and, if
+            builtin is True, the 'key' to use with Scenarios.from_builtin (the
+            first one in catalog order) and all the 'keys' of the station
+        """
+        index = self
+        if builtin:
+            if self._builtin is None:
+                self._builtin = self.subset(
+                    np.flatnonzero([len(keys_) > 0 for keys_ in self.keys])
+                )
+            index = self._builtin
+        distance, position = index.nearest(latitude, longitude, k=1)
+        distance, position = distance[:, 0], position[:, 0]
+
+        table = index.table
+        result = DataFrame(
+            {
+                "station_id": table["station_id"].to_numpy(dtype=object)[position],
+                "name": table["name"].to_numpy(dtype=object)[position],
+                "distance_km": distance,
+            }
+        )
+        if builtin:
+            keys = index.keys[position]
+            result["key"] = [keys_[0] for keys_ in keys]
+            result["keys"] = keys
+        if max_distance is not None:
+            far = distance > max_distance
+            result.loc[far, result.columns != "distance_km"] = None
+        return result
+
+
+# The builtin station table is read on first use, not at import time
+BUILTIN_STATIONS = StationIndex()
@@ -1,42 +1,70 @@
+from fractions import Fraction
 from pathlib import Path
-import json
 import typing
-from pandas import DataFrame
+import warnings
 
-M_TO_FT = 3.281
-
-with open(Path(__file__).parent / "data/scenarios.json") as f:
-    ALL_BUILTIN_SCENARIOS = json.load(f)
+from sealevelrise.catalog import BuiltinCatalog, Catalog
 
-ALL_KEYS = [key_ for key_ in ALL_BUILTIN_SCENARIOS.keys()]
-ALL_ISSUERS = [value_["issuer"] for _, value_ in ALL_BUILTIN_SCENARIOS.items()]
+if typing.TYPE_CHECKING:
+    from pandas import DataFrame
 
+M_TO_FT = 3.281
 
-def _show_builtin_scenarios(format: str = "list") -> typing.Union[list, DataFrame]:
+# Length of each supported unit in meters, as exact fractions so that every
+# conversion factor derived from them is correctly rounded (e.g., 'ft' to 'in')
+UNIT_LENGTHS = {
+    "ft": 1 / Fraction(str(M_TO_FT)),
+    "in": 1 / (12 * Fraction(str(M_TO_FT))),
+    "m": Fraction(1),
+    "mm": Fraction(1, 1000),
+    "cm": Fraction(1, 100),
+}
+
+# Factors for all pairs of units, computed once: CONVERSION_FACTORS[('ft', 'm')]
+CONVERSION_FACTORS = {
+    (from_, to_): float(UNIT_LENGTHS[from_] / UNIT_LENGTHS[to_])
+    for from_ in UNIT_LENGTHS
+    for to_ in UNIT_LENGTHS
+}
+
+# The builtin catalog is indexed on first use, not at import time
+BUILTIN_CATALOG = BuiltinCatalog(path=Path(__file__).parent / "data/scenarios.json")
+
+
+def __getattr__(name: str):
+    # Legacy module-level constants are derived lazily from the catalog index
+    if name == "ALL_BUILTIN_SCENARIOS":
+        return BUILTIN_CATALOG
+    if name == "ALL_KEYS":
+        return list(BUILTIN_CATALOG.headers)
+    if name == "ALL_ISSUERS":
+        return [entry_.issuer for entry_ in BUILTIN_CATALOG.headers.values()]
+    if name == "ALL_LOCATIONS":
+        return [entry_.location_name for entry_ in BUILTIN_CATALOG.headers.values()]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _show_builtin_scenarios(format: str = "list") -> typing.Union[list, "DataFrame"]:
     if format not in ["list", "dataframe"]:
         raise ValueError("The format arg must be either 'list' or 'dataframe'.")
-    all_locations = [
-        elem_["location name"] for _, elem_ in ALL_BUILTIN_SCENARIOS.items()
-    ]
+    headers = BUILTIN_CATALOG.headers.values()
     if format == "list":
-        return ALL_KEYS
+        return [entry_.key for entry_ in headers]
     elif format == "dataframe":
+        from pandas import DataFrame
+
         return (
             # Build a clean dataframe showing what's available as custom scenarios
             DataFrame.from_dict(
                 data={
-                    "Key": ALL_KEYS,
-                    "Location(s) covered": all_locations,
-                    "Issuer": ALL_ISSUERS
+                    "Key": [entry_.key for entry_ in headers],
+                    "Location(s) covered": [entry_.location_name for entry_ in headers],
+                    "Issuer": [entry_.issuer for entry_ in headers],
                 }
             )
         )
 
 
-# Provide list of all locations available in ALL_BUILTIN_SCENARIOS
-ALL_LOCATIONS = _show_builtin_scenarios(format="list")
-
-
 # Check that units are valid
 def _check_units(units: str) -> None:
     """Validates units and verifies that unit string descriptor is in the standard set
@@ -47,7 +75,7 @@ def _check_units(units: str) -> None:
         String representing units, can only be one of 'ft', 'in', 'm', and 'cm'
 
     """
-    if not (units in ["ft", "in", "m", "mm", "cm"]):
+    if not (units in UNIT_LENGTHS):
         raise ValueError(
             f"Units {units} are not supported; only use 'ft', 'in', 'm',"
             f" 'mm', and 'cm'."
@@ -55,7 +83,9 @@ def _check_units(units: str) -> None:
 
 
 # Check that location is valid
-def _validate_key(key: typing.Union[str, int]) -> str:
+def _validate_key(
+    key: typing.Union[str, int], catalog: Catalog = BUILTIN_CATALOG
+) -> str:
     """Validates location, station, or key given to locate a SLRProjections item
 
     Parameters
@@ -67,8 +97,13 @@ def _validate_key(key: typing.Union[str, int]) -> str:
         * a location (e.g., 'New Jersey')
         * an int (e.g., '0')
         * a key from the scenarios.json file, e.g., 'cocat-2018-9414290'
+        * a CO-OPS station ID given as a str (e.g., '9414290')
+        * an alias registered with BUILTIN_CATALOG.add_alias
 
-        In case multiple matches are possible, the first match will be returned.
+        In case multiple matches are possible, the first match will be returned and
+        a warning lists the others; use BUILTIN_CATALOG.resolve to get all of them.
+    catalog : Catalog, optional
+        The catalog to search, by default the builtin catalog
 
     Returns
     -------
@@ -86,24 +121,45 @@ def _validate_key(key: typing.Union[str, int]) -> str:
     Use an index:
     >>> utils._validate_key(location=0)
     'nj-dep-2021'
+    Use a station ID:
+    >>> utils._validate_key(key='9414290')
+    'cocat-2018-9414290'
     """
-    if isinstance(key, int):
-        if not (key in list(range(0, len(ALL_LOCATIONS)))):
+    if not isinstance(key, (str, int)):
+        raise TypeError("key must be given as a str or an int.")
+    matches = catalog.resolve(key)
+    if not matches:
+        if isinstance(key, int):
             raise IndexError(
                 "Index notation exceeds length of builtin items available."
             )
-        else:
-            target_key = ALL_KEYS[key]
-    elif isinstance(key, str):
-        # Try these:
-        if key in ALL_LOCATIONS:
-            target_key = ALL_KEYS[ALL_LOCATIONS.index(key)]
-        elif key in ALL_KEYS:
-            target_key = key
-        else:
-            raise KeyError(
-                "Make sure location is specified either as an "
-                "station ID, a key, or a location name."
-            )
+        raise KeyError(
+            "Make sure location is specified either as an "
+            "station ID, a key, or a location name."
+        )
+    if len(matches) > 1:
+        warnings.warn(
+            f"'{key}' matches several builtin items ({', '.join(matches)}); "
+            f"using '{matches[0]}'.",
+            stacklevel=3,
+        )
+    return matches[0]
 
-    return target_key
+
+def _conversion_factor(from_units: str, to_units: str) -> float:
+    """Returns the factor to apply to values given in from_units to obtain
+    values in to_units
+
+    Parameters
+    ----------
+    from_units : str
+        Units of the original values
+    to_units : str
+        Units of the converted values
+
+    Returns
+    -------
+    float
+        Multiplicative conversion factor, read from CONVERSION_FACTORS
+    """
+    return CONVERSION_FACTORS[(from_units, to_units)]
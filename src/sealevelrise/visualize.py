@@ -1,12 +1,26 @@
-from sealevelrise.historical import HistoricalSLR
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from sealevelrise.batch import stitch_timelines
 from sealevelrise.slrprojections import Scenarios
+from sealevelrise.utils import BUILTIN_CATALOG, _validate_key
 import matplotlib.pyplot as plt
-from typing import Union
+import numpy as np
+from matplotlib import rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from pandas import DataFrame
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
 
 
 def HistoricalVsProjections(
         location: Union[str, int],
-        ax: plt.Axes = None
+        ax: plt.Axes = None,
+        table: DataFrame = None
 ) -> plt.Axes:
     """Will match two objects, HistoricalSLR and Scenarios
     given a location and make a combined plot. Useful when looking
@@ -23,6 +37,9 @@ def HistoricalVsProjections(
         * a key from one of the custom scenarios, e.g., nj-dep-2021
     ax : plt.Axes, optional
         _description_, by default None
+    table : DataFrame, optional
+        Table returned by batch.stitch_timelines that includes the station of
+        location; nothing is fetched from NOAA if given, by default None
 
     Returns
     -------
@@ -30,32 +47,57 @@ def HistoricalVsProjections(
         _description_
     """
 
-    # Create the Scenarios instance:
-    ps = Scenarios.from_location(location=location)
-    # Convert to 'mm'
-    ps.convert(to_units='mm', inplace=True)
+    # Find the station of the builtin scenarios
+    key = _validate_key(key=location)
+    station_id = BUILTIN_CATALOG.header(key).station_id
+    if station_id is None:
+        raise ValueError(
+            f"'{key}' is not tied to a NOAA station; no historical trend."
+        )
 
-    # Create the Historical instance:
-    hs = HistoricalSLR.from_Scenarios(Scenarios=ps)
+    # Historical trend and projections stitched at the baseline year, in 'mm'
+    if table is None:
+        timelines = stitch_timelines([station_id], units='mm')
+        table = timelines.table[timelines.table['key'] == key]
+        if table.empty:
+            raise ValueError(
+                f"Could not retrieve the historical trend of station "
+                f"{station_id}: {'; '.join(timelines.errors['error'])}"
+            )
+    else:
+        table = table[table['key'] == key]
+        if table.empty:
+            raise ValueError(f"table has no rows for '{key}'.")
 
     # Create an ax figure if none provided
     if ax is None:
         _, ax = plt.subplots(1, 1)
 
+    scenarios = list(table['scenario'].unique())
+    past = table[
+        (table['scenario'] == scenarios[0]) & (table['source'] == 'historical')
+    ]
     ax.plot(
-        hs.timeseries.index.year,
-        hs.timeseries.values,
+        past['year'],
+        past['value'],
         label='Historical trend',
         ls='--', c='k', lw=2
     )
-    for scenario_ in ps.scenarios:
+    for scenario_ in scenarios:
+        future = table[
+            (table['scenario'] == scenario_) & (table['source'] == 'projection')
+        ]
         ax.plot(
-            scenario_.data.x,
-            scenario_.data.y,
-            label=scenario_.short_name
+            future['year'],
+            future['value'],
+            label=scenario_
         )
+    # Values interpolated from the baseline year are not projections
+    baseline = table.loc[table['source'] != 'historical', 'year'].min()
     ax.set_xlabel('Year')
-    ax.set_ylabel(f'SLR from 2000 in [{ps.units}]')
+    ax.set_ylabel(
+        f'SLR from {baseline:.0f} in [{table["units"].iloc[0]}]'
+    )
     ax.set_xlim(
         ax.get_xlim()[0],
         2100
@@ -63,3 +105,269 @@ def HistoricalVsProjections(
     plt.legend(loc='best')
 
     return ax
+
+
+class Panel(NamedTuple):
+    """Data of one figure for render_figures: plain arrays only, so that
+    panels are cheap to send to worker processes"""
+    name: str
+    title: str
+    ylabel: str
+    labels: List[str]
+    segments: List[np.ndarray]
+    reference: Optional[Tuple[str, np.ndarray, np.ndarray]] = None
+
+
+def panel_from_scenarios(scenarios: Scenarios, name: str = None) -> Panel:
+    """Extracts the data of a Scenarios instance needed to draw its figure
+
+    Parameters
+    ----------
+    scenarios : Scenarios
+        An already loaded Scenarios instance
+    name : str, optional
+        Name of the figure file, by default the location name
+
+    Returns
+    -------
+    Panel
+        One line per Scenario, labeled as in Scenarios.plot
+    """
+    matrix = scenarios.matrix
+    labels, segments = [], []
+    for row_ in range(matrix.shape[0]):
+        x, y = matrix.row_x(row_), matrix.row_y(row_)
+        finite = ~np.isnan(y)
+        segments.append(np.column_stack([x[finite], y[finite]]))
+        labels.append(
+            f'{matrix.short_names[row_]}, '
+            f'{100. * matrix.probabilities[row_]:.2f}% [{matrix.units[row_]}]'
+        )
+    return Panel(
+        name=scenarios.location_name if name is None else name,
+        title=f'SLR for {scenarios.location_name}',
+        ylabel=f'SLR [{scenarios.units}]',
+        labels=labels,
+        segments=segments,
+    )
+
+
+def panels_from_timelines(table: DataFrame) -> List[Panel]:
+    """Splits a table returned by batch.stitch_timelines into one Panel per
+    station and projection set, with the historical trend as reference line
+
+    Parameters
+    ----------
+    table : DataFrame
+        Table of the Timelines returned by batch.stitch_timelines
+
+    Returns
+    -------
+    list of Panel
+        Panels named '<station>_<key>', in the order of the table
+    """
+    panels = []
+    for (station_, key_), group_ in table.groupby(
+            ['station', 'key'], sort=False
+    ):
+        scenarios = list(group_['scenario'].unique())
+        past = group_[
+            (group_['scenario'] == scenarios[0])
+            & (group_['source'] == 'historical')
+        ]
+        # Values interpolated from the baseline year are left out of the lines
+        future = group_[group_['source'] == 'projection']
+        baseline = group_.loc[group_['source'] != 'historical', 'year'].min()
+        segments = [
+            future.loc[future['scenario'] == scenario_, ['year', 'value']]
+            .to_numpy(dtype=float)
+            for scenario_ in scenarios
+        ]
+        panels.append(
+            Panel(
+                name=f'{station_}_{key_}',
+                title=f'SLR at station {station_} ({group_["issuer"].iloc[0]})',
+                ylabel=(
+                    f'SLR from {baseline:.0f} '
+                    f'in [{group_["units"].iloc[0]}]'
+                ),
+                labels=scenarios,
+                segments=segments,
+                reference=(
+                    'Historical trend',
+                    past['year'].to_numpy(dtype=float),
+                    past['value'].to_numpy(dtype=float),
+                ),
+            )
+        )
+    return panels
+
+
+# Figure and Axes reused by all panels rendered in a process, by (figsize, dpi)
+_TEMPLATES = dict()
+
+
+def _template(figsize: Tuple[float, float], dpi: float) -> Tuple[Figure, plt.Axes]:
+    key = (tuple(figsize), dpi)
+    if key not in _TEMPLATES:
+        # Agg canvas attached directly, without pyplot and its global state
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        # Fixed margins: a layout engine would draw every figure twice
+        figure.subplots_adjust(left=0.14, right=0.97, bottom=0.14, top=0.91)
+        ax = figure.add_subplot(1, 1, 1)
+        ax.set_xlabel('Year')
+        _TEMPLATES[key] = (figure, ax)
+    return _TEMPLATES[key]
+
+
+def _draw(ax: plt.Axes, panel: Panel) -> None:
+    # Clear the artists of the previous panel and its data limits
+    for artist_ in ax.collections + ax.lines:
+        artist_.remove()
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+    ax.ignore_existing_data_limits = True
+
+    cycle = rcParams['axes.prop_cycle'].by_key()['color']
+    colors = [cycle[i_ % len(cycle)] for i_ in range(len(panel.segments))]
+    # A single artist for all scenarios of the panel
+    ax.add_collection(LineCollection(panel.segments, colors=colors))
+    handles = [
+        Line2D([], [], color=color_, label=label_)
+        for color_, label_ in zip(colors, panel.labels)
+    ]
+    if panel.reference is not None:
+        label, x, y = panel.reference
+        handles.insert(
+            0, ax.plot(x, y, label=label, ls='--', c='k', lw=2)[0]
+        )
+    ax.autoscale_view()
+    ax.set_title(panel.title)
+    ax.set_ylabel(panel.ylabel)
+    # An explicit location avoids the costly search done by 'best'
+    ax.legend(handles=handles, loc='upper left', fontsize='small')
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r'[^\w.-]+', '_', name).strip('_')
+
+
+def _file_names(names: Sequence[str]) -> List[str]:
+    # Names that map to the same file, ignoring case, get a numbered suffix
+    # instead of overwriting each other
+    taken, file_names = set(), []
+    for name_ in names:
+        file_name = base = _file_name(name_)
+        count = 1
+        while file_name.lower() in taken:
+            count += 1
+            file_name = f'{base}_{count}'
+        taken.add(file_name.lower())
+        file_names.append(file_name)
+    return file_names
+
+
+def _render_chunk(
+        panels: Sequence[Panel],
+        file_names: Sequence[str],
+        directory: Path,
+        format: str,
+        dpi: float,
+        figsize: Tuple[float, float]
+) -> List[Tuple[str, str, float, int]]:
+    # Runs in worker processes; must remain a module-level function
+    figure, ax = _template(figsize, dpi)
+    rendered = []
+    for panel_, file_name_ in zip(panels, file_names):
+        start = time.perf_counter()
+        path = directory / f'{file_name_}.{format}'
+        _draw(ax, panel_)
+        figure.savefig(path, format=format)
+        rendered.append(
+            (panel_.name, str(path), time.perf_counter() - start, os.getpid())
+        )
+    return rendered
+
+
+def render_figures(
+        panels: Sequence[Union[Panel, Scenarios]],
+        directory: Union[str, Path],
+        format: str = 'png',
+        dpi: float = 100,
+        figsize: Tuple[float, float] = (5.35, 3.5),
+        max_workers: int = None,
+        chunksize: int = 8
+) -> DataFrame:
+    """Renders one figure file per panel on the Agg backend, optionally across
+    a pool of processes
+
+    Each process draws all panels on the same Figure, clearing only the data
+    artists in between, and all scenarios of a panel are drawn with a single
+    LineCollection. Panels only hold arrays, so data is never fetched again:
+    build them from loaded Scenarios instances (panel_from_scenarios) or from
+    the table of batch.stitch_timelines (panels_from_timelines).
+
+    Parameters
+    ----------
+    panels : sequence of Panel or Scenarios
+        Data of the figures; Scenarios instances are converted with
+        panel_from_scenarios
+    directory : str or Path
+        Folder receiving the files, created if needed
+    format : str, optional
+        Image format understood by Agg, by default 'png'
+    dpi : float, optional
+        Resolution of the figures, by default 100
+    figsize : (float, float), optional
+        Size of the figures in inches, by default (5.35, 3.5)
+    max_workers : int, optional
+        If greater than 1, panels are rendered in a ProcessPoolExecutor with
+        that many workers, by default None (in process)
+    chunksize : int, optional
+        Number of panels rendered by each task, by default 8
+
+    Returns
+    -------
+    DataFrame
+        One row per figure, in the order of panels, with its 'name', 'path',
+        rendering time in seconds ('seconds') and the 'pid' of the process.
+        Panels whose names give the same file name, e.g., 'San Francisco, CA'
+        and 'San Francisco CA', are written to files numbered from the second
+        one on, e.g., 'San_Francisco_CA_2.png'.
+    """
+    if chunksize < 1:
+        raise ValueError('chunksize must be a positive integer.')
+    panels = [
+        panel_from_scenarios(panel_) if isinstance(panel_, Scenarios) else panel_
+        for panel_ in panels
+    ]
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    file_names = _file_names([panel_.name for panel_ in panels])
+    starts = range(0, len(panels), chunksize)
+    chunks = [panels[i_:i_ + chunksize] for i_ in starts]
+    names = [file_names[i_:i_ + chunksize] for i_ in starts]
+
+    if max_workers is None or max_workers <= 1 or len(chunks) <= 1:
+        results = [
+            _render_chunk(chunk_, names_, directory, format, dpi, figsize)
+            for chunk_, names_ in zip(chunks, names)
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(
+                    _render_chunk,
+                    chunks,
+                    names,
+                    [directory] * len(chunks),
+                    [format] * len(chunks),
+                    [dpi] * len(chunks),
+                    [figsize] * len(chunks),
+                )
+            )
+    return DataFrame(
+        [row_ for result_ in results for row_ in result_],
+        columns=['name', 'path', 'seconds', 'pid'],
+    )
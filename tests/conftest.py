@@ -0,0 +1,19 @@
+import pytest
+
+from sealevelrise import noaaapi
+from sealevelrise.historical import HistoricalSLR
+
+from .noaaserver import FakeNOAAServer
+
+
+@pytest.fixture
+def noaa_server(tmp_path, monkeypatch):
+    """Points the NOAA API and its response cache to a local stand-in server
+    and a temporary folder"""
+    HistoricalSLR.invalidate()
+    with FakeNOAAServer() as server:
+        monkeypatch.setattr(noaaapi, "NOAA_API_URL", server.url)
+        monkeypatch.setattr(
+            noaaapi, "RESPONSE_CACHE", noaaapi.ResponseCache(directory=tmp_path)
+        )
+        yield server
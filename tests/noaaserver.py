@@ -0,0 +1,149 @@
+"""Local stand-in for the NOAA CO-OPS API used by the tests and benchmarks."""
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+NOAA_SCENARIOS = [
+    "Low",
+    "Intermediate-Low",
+    "Intermediate",
+    "Intermediate-High",
+    "High",
+]
+
+
+def trends_payload(station: str) -> dict:
+    # Deterministic, station-dependent values
+    seed = int(station) % 97
+    return {
+        "SeaLvlTrends": [
+            {
+                "stationId": station,
+                "stationName": f"Station {station}",
+                "affil": "US",
+                "trend": round(1.0 + seed / 50.0, 2),
+                "trendError": round(0.1 + seed / 500.0, 2),
+                "units": "mm/yr",
+                "startDate": "01/01/1920",
+                "endDate": "12/31/2020",
+            }
+        ]
+    }
+
+
+def projections_payload(station: str, units: str) -> dict:
+    seed = int(station) % 97
+    scale = 1.0 if units == "metric" else 1 / 2.54
+    rows = []
+    for rank_, scenario_ in enumerate(NOAA_SCENARIOS):
+        for year_ in range(2020, 2151, 10):
+            rows.append(
+                {
+                    "stationName": f"STATION_{station}",
+                    "scenario": scenario_,
+                    "projectionYear": year_,
+                    "projectionRsl": round(
+                        scale * (year_ - 2005) * (0.3 + 0.25 * rank_ + seed / 200.0),
+                        1,
+                    ),
+                }
+            )
+    return {"Scenarios": rows}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        endpoint = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        params = dict(urllib.parse.parse_qsl(parsed.query))
+        station = params.get("station", "")
+        server = self.server
+        with server.lock:
+            server.requests.append((endpoint, params))
+        if server.delay:
+            time.sleep(server.delay)
+
+        if not station.isdigit() or station.startswith("0"):
+            status, payload = 404, {"error": f"Unknown station {station}"}
+        elif endpoint == "sealvltrends.json":
+            status, payload = 200, trends_payload(station)
+        elif endpoint == "slr_projections.json":
+            status, payload = 200, projections_payload(
+                station, params.get("units", "metric")
+            )
+        else:
+            status, payload = 404, {"error": f"Unknown product {endpoint}"}
+
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeNOAAServer:
+    """Serves 'sealvltrends.json' and 'slr_projections.json' on localhost.
+
+    Stations must be numeric; stations starting with '0' answer with a 404.
+    All requests are recorded in `requests` as (endpoint, params) tuples, and each
+    response can be held back by `delay` seconds to mimic network latency.
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.requests = []
+        self._server.connections = 0
+        self._server.lock = threading.Lock()
+        self._server.delay = delay
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/product"
+
+    @property
+    def requests(self) -> list:
+        return self._server.requests
+
+    @property
+    def connections(self) -> int:
+        """Number of TCP connections accepted so far"""
+        return self._server.connections
+
+    @property
+    def delay(self) -> float:
+        return self._server.delay
+
+    @delay.setter
+    def delay(self, seconds: float) -> None:
+        self._server.delay = seconds
+
+    def start(self) -> "FakeNOAAServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeNOAAServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,79 @@
+import numpy as np
+from pandas.testing import assert_frame_equal
+
+from sealevelrise import batch
+from sealevelrise.historical import HistoricalSLR
+from sealevelrise.slrprojections import Scenarios
+from sealevelrise.utils import BUILTIN_CATALOG
+
+
+def test_query_long_format():
+    years = np.arange(2030, 2101, 5)
+    df = batch.query(["San Francisco, CA", "cocat-2018-9414290", 0], years, units="m")
+    # Duplicated identifiers are evaluated once
+    assert list(df["key"].unique()) == ["cocat-2018-9414290", "nj-dep-2021"]
+    assert list(df.columns) == batch.BATCH_COLUMNS
+    assert (df["units"] == "m").all()
+
+    sf = Scenarios.from_builtin("cocat-2018-9414290")
+    sf.convert(to_units="m", inplace=True)
+    sub = df[df["key"] == "cocat-2018-9414290"]
+    np.testing.assert_allclose(
+        sub["value"].values, sf.by_horizon_year(years, merge=False).values.ravel()
+    )
+
+
+def test_query_does_not_build_frames(monkeypatch):
+    def frame(self, copy=True):
+        raise AssertionError("Scenarios.frame was called")
+
+    expected = batch.query(list(BUILTIN_CATALOG), [2050, 2100], units="ft")
+    monkeypatch.setattr(Scenarios, "frame", frame)
+    assert_frame_equal(
+        batch.query(list(BUILTIN_CATALOG), [2050, 2100], units="ft"), expected
+    )
+
+
+def test_query_is_deterministic_across_workers():
+    keys = list(BUILTIN_CATALOG) * 2
+    years = [2025, 2050, 2075, 2100, 2150]
+    serial = batch.query(keys, years)
+    parallel = batch.query(keys, years, max_workers=2, chunksize=2)
+    assert_frame_equal(serial, parallel)
+
+
+def test_stitch_timelines(noaa_server):
+    stations = ["9414290", "8518750", "0000001"]
+    result = batch.stitch_timelines(stations, units="ft")
+    assert list(result.errors["station"]) == ["0000001", "8518750"]
+    df = result.table
+    assert list(df.columns) == batch.TIMELINE_COLUMNS
+    assert list(df["key"].unique()) == ["cocat-2018-9414290"]
+    # Historical and projection requests are issued once per station
+    assert len(noaa_server.requests) == 3
+
+    sf = Scenarios.from_builtin("cocat-2018-9414290").as_units("ft")
+    hs = HistoricalSLR(station_ID="9414290", units="ft")
+    for scenario_ in sf.scenarios:
+        sub = df[df["scenario"] == scenario_.short_name]
+        past = sub[sub["source"] == "historical"]
+        ramp = sub[sub["source"] == "interpolated"]
+        future = sub[sub["source"] == "projection"]
+        # The trend leads into the projections, which start from zero
+        assert past["year"].iloc[0] == hs.start_date.year
+        assert past["year"].iloc[-1] + 1 == ramp["year"].iloc[0] == 2000
+        assert ramp["value"].iloc[0] == 0.0
+        # Until their first year, which the ramp does not overlap
+        assert ramp["year"].iloc[-1] + 1 == future["year"].iloc[0] == 2030
+        assert list(sub["source"].unique()) == [
+            "historical",
+            "interpolated",
+            "projection",
+        ]
+        np.testing.assert_allclose(
+            past["value"].iloc[-1], -hs.trend * 0.00328084, rtol=1e-3
+        )
+        years = future["year"].values[future["year"].values >= 2030]
+        np.testing.assert_allclose(
+            future["value"].values[-len(years) :], scenario_.by_horizon_year(years)
+        )
@@ -0,0 +1,214 @@
+import json
+
+import numpy as np
+import pytest
+
+from sealevelrise.builtin import BuiltinProjections
+from sealevelrise.catalog import BuiltinCatalog, Catalog, record_errors
+from sealevelrise.scenario import Scenario
+from sealevelrise.slrprojections import Scenarios
+from sealevelrise.sqlcatalog import SQLiteCatalog
+from sealevelrise.utils import BUILTIN_CATALOG, _validate_key
+
+
+def _write_catalog(path, n):
+    records = {
+        f"key-{i}": {
+            "location name": f"Lieu n°{i}",
+            "station ID (CO-OPS)": str(9000000 + i),
+            "issuer": "Agence é",
+            "scenarios": [
+                {
+                    "description": "Only",
+                    "short name": "Only",
+                    "units": "ft",
+                    "probability (CDF)": 0.5,
+                    "baseline year": 2000,
+                    "data": {"x": [2000 + i, 2100 + i], "y": [0.0, 1.0]},
+                }
+            ],
+        }
+        for i in range(n)
+    }
+    path.write_text(json.dumps(records, ensure_ascii=False, indent=4), "utf-8")
+    return records
+
+
+def test_catalog_is_lazy_and_indexed(tmp_path):
+    path = tmp_path / "catalog.json"
+    records = _write_catalog(path, n=25)
+    catalog = BuiltinCatalog(path=path)
+    # Nothing is read before the first lookup
+    assert catalog._headers is None
+    assert len(catalog) == 25
+    header = catalog.header("key-7")
+    assert header.location_name == "Lieu n°7"
+    assert header.station_id == "9000007"
+    assert (header.first_year, header.last_year) == (2007.0, 2107.0)
+    # Entries are parsed from their own byte span, including non-ASCII text
+    for key_ in ["key-0", "key-13", "key-24"]:
+        assert catalog.load(key_) == records[key_]
+
+
+def test_catalog_backends_must_provide_headers_and_load():
+    class Headers(Catalog):
+        headers = dict()
+
+    with pytest.raises(TypeError, match="load"):
+        Catalog()
+    with pytest.raises(TypeError, match="load"):
+        Headers()
+
+
+def test_catalog_load_returns_fresh_records():
+    record = BUILTIN_CATALOG.load("nj-dep-2021")
+    record.pop("URL")
+    assert "URL" in BUILTIN_CATALOG.load("nj-dep-2021")
+    assert Scenarios.from_builtin("nj-dep-2021").url is not None
+    assert Scenarios.from_builtin("nj-dep-2021").url is not None
+
+
+def test_validate_key_by_location_and_index():
+    assert _validate_key(key="San Francisco, CA") == "cocat-2018-9414290"
+    assert _validate_key(key=0) == "nj-dep-2021"
+    for key_ in BUILTIN_CATALOG:
+        assert Scenarios.from_builtin(key_).shape[0] > 0
+
+
+def test_validate_once_then_build_without_checks(tmp_path, monkeypatch):
+    assert BuiltinCatalog().validate() == dict()
+    for key_ in BUILTIN_CATALOG:
+        # The one-pass build matches Scenario objects built one by one
+        record = BUILTIN_CATALOG.load(key_)
+        expected = Scenarios(
+            scenarios=[
+                Scenario(
+                    description=s_["description"],
+                    short_name=s_["short name"],
+                    units=s_["units"],
+                    probability=s_["probability (CDF)"],
+                    baseline_year=s_["baseline year"],
+                    data=s_["data"],
+                )
+                for s_ in record["scenarios"]
+            ]
+        ).matrix
+        for sc_ in [Scenarios.from_dict(record), BuiltinProjections(key_)]:
+            np.testing.assert_array_equal(sc_.matrix.years, expected.years)
+            np.testing.assert_array_equal(sc_.matrix.values, expected.values)
+            np.testing.assert_array_equal(sc_.matrix.mask, expected.mask)
+            np.testing.assert_array_equal(
+                sc_.matrix.probabilities, expected.probabilities
+            )
+            assert list(sc_.matrix.units) == expected.units
+            assert list(sc_.matrix.short_names) == expected.short_names
+            assert list(sc_.matrix.baseline_years) == expected.baseline_years
+
+    path = tmp_path / "catalog.json"
+    records = _write_catalog(path, n=3)
+    records["key-1"]["scenarios"][0]["units"] = "yd"
+    records["key-1"]["scenarios"][0]["data"]["y"].append(2.0)
+    del records["key-2"]["issuer"]
+    path.write_text(json.dumps(records), "utf-8")
+    catalog = BuiltinCatalog(path=path)
+    # Every problem is reported, by key
+    report = catalog.validate()
+    assert list(report) == ["key-1", "key-2"]
+    assert len(report["key-1"]) == 2
+    assert report["key-1"][0].startswith("ValueError: Scenario 0 ('Only'): units yd")
+    assert report["key-2"] == ["KeyError: The issuer key is missing or mispelled."]
+    with pytest.raises(ValueError, match="Entry 'key-1'"):
+        Scenarios.from_builtin("key-1", catalog=catalog)
+    with pytest.raises(KeyError):
+        Scenarios.from_dict(records["key-2"])
+    assert [type(e_) for e_ in record_errors([])] == [TypeError]
+
+    # Trusted records are not checked again
+    checked = []
+    monkeypatch.setattr(
+        "sealevelrise.catalog.record_errors",
+        lambda record: checked.append(record) or [],
+    )
+    for _ in range(3):
+        Scenarios.from_builtin("key-0", catalog=catalog)
+    assert checked == []
+
+
+def test_resolve_by_station_alias_and_in_bulk(tmp_path):
+    assert _validate_key(key="9414290") == "cocat-2018-9414290"
+
+    path = tmp_path / "catalog.json"
+    records = _write_catalog(path, n=4)
+    # A second issuer for the station of key-1
+    records["key-1-bis"] = dict(records["key-1"], issuer="Other")
+    path.write_text(json.dumps(records), "utf-8")
+    catalog = BuiltinCatalog(path=path)
+    catalog.add_alias("first", "key-0")
+    assert catalog.resolve_many(
+        ["9000001", "Lieu n°1", "first", 3, "key-2", "unknown", 99]
+    ) == [
+        ["key-1", "key-1-bis"],
+        ["key-1", "key-1-bis"],
+        ["key-0"],
+        ["key-3"],
+        ["key-2"],
+        [],
+        [],
+    ]
+    catalog.remove_alias("first")
+    assert catalog.resolve("first") == []
+    with pytest.raises(KeyError):
+        catalog.add_alias("missing", "key-99")
+    with pytest.raises(TypeError):
+        catalog.resolve(1.5)
+
+
+def test_sqlite_catalog_round_trip_and_queries(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    with SQLiteCatalog(path) as catalog:
+        assert catalog.import_json(BUILTIN_CATALOG) == len(BUILTIN_CATALOG)
+        json_path = tmp_path / "catalog.json"
+        records = _write_catalog(json_path, n=5)
+        assert catalog.import_json(json_path) == 5
+
+    # Records survive a round trip through a new connection
+    catalog = SQLiteCatalog(path)
+    assert list(catalog) == list(BUILTIN_CATALOG) + list(records)
+    for key_ in BUILTIN_CATALOG:
+        assert catalog.load(key_) == BUILTIN_CATALOG.load(key_)
+        assert catalog.header(key_) == BUILTIN_CATALOG.header(key_)
+    assert catalog.load("key-3") == records["key-3"]
+
+    # Queries match the in-memory implementation of the JSON catalog; the
+    # synthetic entry key-0 covers 2000 to 2100 and is filtered out
+    for criteria_ in [
+        dict(issuer="California OPC 2018"),
+        dict(issuer="California OPC 2018", years=(2040, 2150)),
+        dict(station_id="9414290"),
+        dict(location_name="New York City"),
+        dict(years=(2000, 2100)),
+    ]:
+        found = [e_ for e_ in catalog.query(**criteria_) if e_.key in BUILTIN_CATALOG]
+        assert found == BUILTIN_CATALOG.query(**criteria_)
+    assert [entry_.key for entry_ in catalog.query(issuer="Agence é")] == list(records)
+
+    sc = Scenarios.from_builtin("9414290", catalog=catalog)
+    assert sc.location_name == "San Francisco, CA"
+    np.testing.assert_array_equal(
+        sc.dataframe.values, Scenarios.from_builtin("9414290").dataframe.values
+    )
+
+    # Replacing keeps the position, removing cascades to scenarios and values
+    assert Scenarios.from_builtin("key-0", catalog=catalog).issuer == "Agence é"
+    catalog.add({"key-0": dict(records["key-0"], issuer="Replaced")})
+    assert Scenarios.from_builtin("key-0", catalog=catalog).issuer == "Replaced"
+    assert list(catalog)[len(BUILTIN_CATALOG)] == "key-0"
+    assert catalog.header("key-0").issuer == "Replaced"
+    catalog.remove("key-0")
+    assert "key-0" not in catalog
+    with pytest.raises(KeyError):
+        catalog.load("key-0")
+    assert catalog._execute(
+        "SELECT COUNT(*) FROM scenario_values WHERE set_key = 'key-0'"
+    ) == [(0,)]
+    catalog.close()
@@ -0,0 +1,76 @@
+import io
+import json
+
+import numpy as np
+import pytest
+from pandas import read_csv
+
+from sealevelrise import batch, cli
+from sealevelrise.utils import BUILTIN_CATALOG
+
+
+def test_query_streams_json_lines_and_csv(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "locations.txt"
+    path.write_text("# Pacific\nSan Francisco, CA\n\n9410660\n", "utf-8")
+    monkeypatch.setattr("sys.stdin", io.StringIO("nj-dep-2021\nunknown\n"))
+    status = cli.main(
+        ["query", "cocat-2018-9414290", "-i", str(path), "-y", "2030:2100:10"]
+        + ["-y", "2150", "-u", "m"]
+    )
+    rows = [json.loads(line_) for line_ in capsys.readouterr().out.splitlines()]
+    assert status == 0
+    expected = batch.query(
+        ["cocat-2018-9414290", "9410660"], list(range(2030, 2101, 10)) + [2150], "m"
+    )
+    assert list(rows[0]) == batch.BATCH_COLUMNS
+    # Same rows as batch.query, down to the types of the years
+    assert [row_["key"] for row_ in rows] == list(expected["key"])
+    assert [row_["year"] for row_ in rows] == list(expected["year"])
+    assert isinstance(rows[0]["year"], float)
+    np.testing.assert_allclose(
+        [np.nan if row_["value"] is None else row_["value"] for row_ in rows],
+        expected["value"],
+    )
+
+    # Unresolved identifiers are reported without stopping the others
+    status = cli.main(["query", "-i", "-", "-y", "2050", "-f", "csv", "-w", "2"])
+    out, err = capsys.readouterr()
+    assert status == 1
+    assert "'unknown'" in err
+    df = read_csv(io.StringIO(out))
+    assert list(df.columns) == batch.BATCH_COLUMNS
+    assert set(df["key"]) == {"nj-dep-2021"}
+
+    with pytest.raises(SystemExit):
+        cli.main(["query", "nj-dep-2021", "-y", "2100:2050:-10"])
+
+
+def test_query_noaa_offline(noaa_server, capsys):
+    assert cli.main(["query", "9414290", "--source", "noaa", "-y", "2050"]) == 0
+    first = capsys.readouterr().out
+    assert len(first.splitlines()) == 5
+    requests = len(noaa_server.requests)
+
+    # Cached responses are served offline; missing ones are errors
+    status = cli.main(
+        ["query", "9414290", "9410660", "--source", "noaa", "-y", "2050", "--offline"]
+    )
+    out, err = capsys.readouterr()
+    assert status == 1
+    assert out == first
+    assert "'9410660'" in err
+    assert len(noaa_server.requests) == requests
+
+
+def test_validate_reports_invalid_records(tmp_path, capsys):
+    assert cli.main(["validate"]) == 0
+    record = json.loads(json.dumps(BUILTIN_CATALOG.load("nj-dep-2021")))
+    record["scenarios"][1]["probability (CDF)"] = 2.0
+    path = tmp_path / "catalog.json"
+    path.write_text(
+        json.dumps({"good": BUILTIN_CATALOG.load("cocat-2018-9414290"), "bad": record})
+    )
+    assert cli.main(["validate", str(path)]) == 1
+    out, err = capsys.readouterr()
+    assert out.startswith("bad: ValueError: Scenario 1")
+    assert "1 of 2 records are valid" in err
@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pytest
+from pandas import DataFrame, read_csv
+from pandas.testing import assert_frame_equal
+
+from sealevelrise import batch, export
+from sealevelrise.utils import BUILTIN_CATALOG
+
+YEARS = np.arange(2020, 2151, 5)
+
+
+def test_export_csv_in_chunks(tmp_path):
+    keys = list(BUILTIN_CATALOG)
+    expected = batch.query(keys, YEARS, units="ft")
+    for name_ in ["projections.csv", "projections.csv.gz"]:
+        path = tmp_path / name_
+        rows = export.export_query(keys, YEARS, path, units="ft", chunksize=2)
+        assert rows == len(expected)
+        assert_frame_equal(
+            read_csv(path), expected, check_dtype=False, check_index_type=False
+        )
+        with open(path.with_name(name_ + ".json")) as f:
+            metadata = json.load(f)
+        assert list(metadata) == keys
+        assert metadata["nj-dep-2021"]["URL"] == BUILTIN_CATALOG["nj-dep-2021"]["URL"]
+        assert metadata["cocat-2018-9414290"]["scenarios"][0]["baseline year"] == 2000
+
+    writer = export.CSVWriter(tmp_path / "mismatch.csv")
+    writer.write(expected.iloc[:3])
+    with pytest.raises(ValueError):
+        writer.write(expected.iloc[:3, :2])
+    writer.close()
+    with pytest.raises(ValueError):
+        export.export(expected, tmp_path / "projections.xlsx")
+    with pytest.raises(TypeError):
+        export.ChunkWriter(tmp_path / "abstract.csv")
+
+
+def _read_arrow(path):
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    if path.suffix == ".parquet":
+        return pyarrow.parquet.read_table(path)
+    return pyarrow.ipc.open_file(str(path)).read_all()
+
+
+@pytest.mark.parametrize("name", ["projections.parquet", "projections.arrow"])
+def test_export_arrow_formats(tmp_path, name):
+    pyarrow = pytest.importorskip("pyarrow")
+    keys = list(BUILTIN_CATALOG)
+    path = tmp_path / name
+    export.export_query(keys, YEARS, path, chunksize=3)
+    table = _read_arrow(path)
+    assert_frame_equal(table.to_pandas(), batch.query(keys, YEARS), check_dtype=False)
+    metadata = json.loads(table.schema.metadata[export.METADATA_KEY.encode()])
+    assert list(metadata) == keys
+
+    # Columns empty in the first chunk keep the type of batch tables
+    expected = batch.query(keys, YEARS)
+    first = expected.iloc[:5].assign(issuer=None, probability=np.nan)
+    path = tmp_path / f"empty-first-{name}"
+    assert export.export([first, expected.iloc[5:]], path) == len(expected)
+    table = _read_arrow(path)
+    assert table.schema.field("issuer").type == pyarrow.string()
+    assert table.schema.field("probability").type == pyarrow.float64()
+    assert table.column("issuer").to_pylist()[5:] == list(expected["issuer"][5:])
+
+    # Other tables keep the types of their first chunk, whatever their names
+    other = DataFrame({"key": [1, 2], "year": [2050, 2100]})
+    path = tmp_path / f"other-{name}"
+    export.export(other, path)
+    table = _read_arrow(path)
+    assert table.schema.field("key").type == pyarrow.int64()
+    assert table.schema.field("year").type == pyarrow.int64()
@@ -0,0 +1,84 @@
+import pickle
+from datetime import datetime
+
+import numpy as np
+from pandas import Timestamp, date_range
+
+from sealevelrise.historical import HISTORICAL_CACHE, HistoricalSLR
+from sealevelrise.memo import MemoCache
+from sealevelrise.slrprojections import Scenarios
+
+
+def test_memo_cache_lru_and_ttl():
+    memo = MemoCache(maxsize=2)
+    for key_ in ["a", "b", "a", "c"]:
+        memo.get_or_create(key_, lambda: key_.upper())
+    # 'b' was the least recently used value when 'c' came in
+    assert "b" not in memo
+    assert memo.stats()["evictions"] == 1
+    assert (memo.hits, memo.misses) == (1, 3)
+
+    memo = MemoCache(maxsize=None, ttl=0.0)
+    memo.put("a", 1)
+    assert memo.get("a") is None
+    assert memo.expirations == 1
+
+
+def test_historical_instances_are_memoized(noaa_server):
+    HISTORICAL_CACHE.reset_stats()
+    sf = HistoricalSLR(station_ID="9414290", units="mm")
+    assert HistoricalSLR(station_ID="9414290", units="mm") is sf
+    assert HistoricalSLR.from_Scenarios(
+        Scenarios.from_builtin("cocat-2018-9414290")
+    ) is HistoricalSLR(station_ID="9414290", units="ft")
+    assert len(noaa_server.requests) == 1
+    assert HistoricalSLR.cache_stats()["hits"] == 2
+
+    # Unpickled copies do not reach the network nor the memoized instance
+    clone = pickle.loads(pickle.dumps(sf))
+    assert clone is not sf and clone.trend == sf.trend
+
+    assert HistoricalSLR.invalidate(station_ID="9414290", units="mm") == 1
+    assert HistoricalSLR(station_ID="9414290", units="mm") is not sf
+    # The new instance is built from the on-disk response cache
+    assert len(noaa_server.requests) == 1
+
+
+def test_historical_trend_at_any_dates(noaa_server):
+    hs = HistoricalSLR(station_ID="9414290", units="mm")
+    assert hs._timeseries is None
+
+    # Annual series, mid-year, as it used to be built
+    ts = hs.timeseries
+    assert ts.name == "Historical SLR [mm]"
+    assert (ts.index[0].year, ts.index[-1].year) == (1920, 2020)
+    np.testing.assert_allclose(
+        ts.to_numpy(), hs.trend * (ts.index.year - 2000), atol=1e-2
+    )
+
+    # Monthly series with bands, in other units, and decimal years
+    dates = date_range("1950-01-01", "2020-12-01", freq="MS")
+    monthly = hs.trend_at(dates)
+    assert list(monthly.columns) == ["trend", "lower", "upper"]
+    assert len(monthly) == 71 * 12
+    assert np.all(monthly["lower"] <= monthly["trend"])
+    assert np.all(monthly["trend"] <= monthly["upper"])
+    np.testing.assert_allclose(
+        hs.trend_at(dates, units="m").to_numpy(), monthly.to_numpy() / 1000.0
+    )
+    np.testing.assert_allclose(
+        hs.trend_at([1950.0, 2000.0 + 166 / 366.0], bands=False)["trend"],
+        [hs.trend * (1950.0 - 2000.0 - 166 / 365.2425), 0.0],
+        atol=1e-2,
+    )
+
+    # Single decimal years and dates give a single row
+    single = hs.trend_at(1950.0)
+    assert list(single.index) == [1950.0]
+    np.testing.assert_allclose(
+        single.to_numpy(), hs.trend_at([1950.0]).to_numpy(), rtol=1e-12
+    )
+    for date_ in ["1950-01-01", Timestamp("1950-01-01"), datetime(1950, 1, 1)]:
+        single = hs.trend_at(date_, bands=False)
+        assert list(single.index) == [Timestamp("1950-01-01")]
+        assert single["trend"].iloc[0] == monthly["trend"].iloc[0]
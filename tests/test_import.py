@@ -0,0 +1,67 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["pandas", "matplotlib", "urllib.request", "http.client"]
+
+# Generous bounds on the wall time of a fresh interpreter, including its
+# start-up, to catch heavy modules creeping back in at import time
+IMPORT_BUDGET = 0.5
+NUMPY_BUDGET = 1.0
+
+
+def _run(code: str) -> dict:
+    probe = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} "
+        "if m in sys.modules]]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, check=True, text=True
+    )
+    elapsed, loaded = json.loads(result.stdout)
+    return {"elapsed": elapsed, "loaded": loaded}
+
+
+def test_import_is_lightweight():
+    result = _run("import sealevelrise")
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET
+    assert (
+        "numpy"
+        not in subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, sealevelrise; print(list(sys.modules))",
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    )
+
+
+def test_numpy_only_workflow_stays_lightweight():
+    result = _run(
+        "from sealevelrise import Scenarios\n"
+        "sc = Scenarios.from_builtin('San Francisco, CA')\n"
+        "sc.scenarios[0].by_horizon_year([2050, 2100])\n"
+        "sc.as_units('m').matrix.crossing_years([0.5, 1.0])\n"
+        "sc.probability_surface().value(0.5, 2050)"
+    )
+    assert result["loaded"] == []
+    assert result["elapsed"] < NUMPY_BUDGET
+
+    # The command-line interface shares the evaluation of batch, without pandas
+    assert _run("from sealevelrise import cli")["loaded"] == []
+
+    # pandas is loaded on first DataFrame output only
+    result = _run(
+        "from sealevelrise import Scenarios\n"
+        "Scenarios.from_builtin('San Francisco, CA').dataframe"
+    )
+    assert result["loaded"] == ["pandas"]
@@ -0,0 +1,263 @@
+import numpy as np
+import pytest
+from pandas import concat
+
+from sealevelrise.matrix import ScenarioMatrix
+from sealevelrise.scenario import Scenario
+from sealevelrise.slrprojections import Scenarios
+from sealevelrise.utils import BUILTIN_CATALOG, CONVERSION_FACTORS, M_TO_FT
+
+
+def test_interp_matches_numpy_on_each_row():
+    x = [[2000, 2050, 2100], [2020, 2030, 2040, 2060], [2080, 2100], [2010, 2110]]
+    y = [[0.0, 1.0, 3.0], [None, 0.5, 0.7, 1.2], [2.0, 4.0], [0.1, 0.2]]
+    matrix = ScenarioMatrix.from_rows(
+        x=x,
+        y=y,
+        units=["ft"] * 4,
+        descriptions=["a", "b", "c", "d"],
+        short_names=["a", "b", "c", "d"],
+        probabilities=[0.1, None, 0.5, 0.9],
+        baseline_years=[2000] * 4,
+    )
+    years = np.linspace(1990, 2120, 261)
+    result = matrix.interp(years)
+    assert result.shape == (4, years.size)
+    for row_, (x_, y_) in enumerate(zip(x, y)):
+        expected = np.interp(years, x_, np.array(y_, dtype=float))
+        expected[(years < min(x_)) | (years > max(x_))] = np.nan
+        np.testing.assert_allclose(result[row_], expected, equal_nan=True)
+
+
+def test_from_rows_rejects_malformed_rows():
+    metadata = dict(
+        units=["ft"] * 2,
+        descriptions=["a", "b"],
+        short_names=["a", "b"],
+        probabilities=[None] * 2,
+        baseline_years=[2000] * 2,
+    )
+    with pytest.raises(ValueError, match="'b' repeats years \\[2050.0\\]"):
+        ScenarioMatrix.from_rows(
+            x=[[2000, 2050], [2050, 2000, 2050]], y=[[0, 1], [1, 0, 2]], **metadata
+        )
+    with pytest.raises(ValueError, match="'a' has 2 years but 3 values"):
+        ScenarioMatrix.from_rows(
+            x=[[2000, 2050], [2000]], y=[[0, 1, 2], [0]], **metadata
+        )
+
+    # Rows without any year have no bounds and interpolate to NaN
+    empty = ScenarioMatrix.from_rows(x=[[], []], y=[[], []], **metadata)
+    np.testing.assert_array_equal(empty.interp([2000, 2050]), np.full((2, 2), np.nan))
+    np.testing.assert_array_equal(
+        empty.interp(2000, coerce_errors=False), np.full(2, np.nan)
+    )
+
+
+def test_scenarios_are_views_into_the_matrix():
+    for key_ in BUILTIN_CATALOG:
+        sc = Scenarios.from_builtin(key_)
+        # The frame is the same as concatenating each Scenario on its own
+        expected = concat([scenario_.dataframe for scenario_ in sc.scenarios], axis=1)
+        np.testing.assert_array_equal(
+            sc.dataframe.loc[expected.index].values, expected.values
+        )
+        assert np.shares_memory(sc[0].data.y, sc.matrix.values)
+
+    sc = Scenarios.from_builtin("cocat-2018-9414290")
+    before = sc.dataframe.values
+    sc.convert(to_units="in", inplace=True)
+    assert sc.units == "in"
+    assert sc[1].units == "in"
+    np.testing.assert_allclose(sc.dataframe.values, before * 12.0)
+
+
+def test_by_horizon_year_batch():
+    sc = Scenarios.from_builtin("NPCC3-new-york-2019")
+    years = np.arange(2025, 2151)
+    batch = sc.by_horizon_year(years, merge=False, coerce_errors=True)
+    assert batch.shape == (sc.shape[0], years.size)
+    for row_, scenario_ in enumerate(sc.scenarios):
+        np.testing.assert_allclose(
+            batch.values[row_],
+            scenario_.by_horizon_year(years, coerce_errors=True),
+            equal_nan=True,
+        )
+        inside = (years >= scenario_.data.x[0]) & (years <= scenario_.data.x[-1])
+        np.testing.assert_allclose(
+            batch.values[row_, inside],
+            np.interp(years[inside], scenario_.data.x, scenario_.data.y),
+        )
+        assert np.isnan(batch.values[row_, ~inside]).all()
+
+    # Out-of-range years raise unless coerced, with the bounds of the row at fault
+    with pytest.raises(ValueError):
+        sc.by_horizon_year(years, merge=False)
+    last = sc.shape[0] - 1
+    x = sc[last].data.x
+    with pytest.raises(ValueError, match=f"ranges from {x[0]} to {x[-1]}"):
+        sc.matrix.interp(x[-1] + 1.0, rows=[last], coerce_errors=False)
+
+    merged = sc.by_horizon_year([2085, 2090], merge=True, coerce_errors=True)
+    assert list(merged.index) == [2020.0, 2050.0, 2080.0, 2085.0, 2090.0, 2100.0]
+    assert merged.loc[2090.0].iloc[0] == sc[0].by_horizon_year(2090)
+
+
+def test_conversion_factors_cover_all_pairs():
+    for (from_, to_), factor_ in CONVERSION_FACTORS.items():
+        assert factor_ * CONVERSION_FACTORS[(to_, from_)] == pytest.approx(1.0)
+    assert CONVERSION_FACTORS[("mm", "cm")] == pytest.approx(0.1)
+    assert CONVERSION_FACTORS[("ft", "in")] == 12.0
+
+
+def test_unit_views_share_metadata():
+    sc = Scenarios.from_builtin("nj-dep-2021")
+    view = sc.as_units("mm")
+    assert view.units == "mm" and sc.units == "ft"
+    assert view.matrix.years is sc.matrix.years
+    assert view.matrix.short_names is sc.matrix.short_names
+    np.testing.assert_allclose(
+        view.matrix.values, sc.matrix.values / M_TO_FT * 1000.0, equal_nan=True
+    )
+    assert view[2].by_horizon_year(2050) == pytest.approx(
+        sc[2].by_horizon_year(2050) / M_TO_FT * 1000.0
+    )
+    # Views can be converted back, including from 'mm'
+    np.testing.assert_allclose(
+        view.convert("ft").values, sc.dataframe.values, equal_nan=True
+    )
+    np.testing.assert_allclose(sc[0].as_units("in").data.y, sc[0].data.y * 12.0)
+    view.convert("m", inplace=True)
+    assert sc.units == "ft"
+
+
+def test_frames_are_cached_and_invalidated():
+    sc = Scenarios.from_builtin("cocat-2018-9419750")
+    frame = sc.frame(copy=False)
+    assert sc.frame(copy=False) is frame
+    assert np.shares_memory(frame.values, sc.matrix.values)
+    with pytest.raises(ValueError):
+        frame.iloc[0, 0] = 0.0
+
+    # Copies are independent from the cache
+    copied = sc.dataframe
+    copied.iloc[0, 0] = -1.0
+    assert sc.frame(copy=False).iloc[0, 0] != -1.0
+
+    sc.convert(to_units="cm", inplace=True)
+    assert sc.frame(copy=False) is not frame
+    assert sc.frame(copy=False).columns[0].endswith("[cm]")
+    # Frames handed out earlier are left untouched by the conversion
+    assert frame.columns[0].endswith("[ft]")
+    np.testing.assert_allclose(
+        sc.frame(copy=False).values, frame.values * CONVERSION_FACTORS[("ft", "cm")]
+    )
+    assert sc[1].frame(copy=False) is sc[1].frame(copy=False)
+    assert sc[1].dataframe.columns[0].endswith("[cm]")
+
+
+def test_crossing_years_invert_by_horizon_year():
+    sc = Scenarios.from_builtin("nj-dep-2021")
+    thresholds = np.linspace(0.0, 6.0, 61)
+    crossings = sc.crossing_years(thresholds)
+    assert crossings.shape == (sc.shape[0], thresholds.size)
+    for row_, scenario_ in enumerate(sc.scenarios):
+        x = scenario_.data.x
+        reached = np.isfinite(crossings.values[row_])
+        # Null values at the start of the data are skipped
+        first = scenario_.by_horizon_year(x, coerce_errors=True)
+        first = first[~np.isnan(first)][0]
+        np.testing.assert_array_equal(
+            crossings.values[row_][~reached] == -np.inf, thresholds[~reached] < first
+        )
+        np.testing.assert_allclose(
+            scenario_.by_horizon_year(crossings.values[row_][reached]),
+            thresholds[reached],
+        )
+
+    # Units of the thresholds, and a trajectory that dips below a threshold
+    assert sc[2].crossing_year(12.0, units="in") == sc[2].crossing_year(1.0)
+    matrix = ScenarioMatrix.from_rows(
+        x=[[2000, 2010, 2020, 2030]],
+        y=[[0.0, 2.0, 1.0, 3.0]],
+        units=["m"],
+        descriptions=["a"],
+        short_names=["a"],
+        probabilities=[None],
+        baseline_years=[2000],
+    )
+    np.testing.assert_allclose(
+        matrix.crossing_years([1.0, 2.5, 4.0, np.nan], rows=0),
+        [2005.0, 2027.5, np.inf, np.nan],
+    )
+
+
+def test_from_builtin_shares_read_only_arrays():
+    first = Scenarios.from_builtin("nj-dep-2021")
+    second = Scenarios.from_builtin(0)
+    assert first is not second
+    assert first.matrix.values is second.matrix.values
+    assert first.url is not None and second.url is not None
+    for array_ in [first.matrix.values, first.matrix.years, first[0].data.y]:
+        assert not array_.flags.writeable
+    with pytest.raises(ValueError):
+        first[0].data.y[0] = 1.0
+    assert not hasattr(first[0], "__dict__")
+    assert not hasattr(first[0].data, "__dict__")
+
+    # Changes replace the arrays of one instance only
+    before = second.dataframe.values
+    first.convert(to_units="m", inplace=True)
+    first[1].data.y = first[1].data.y * 0.0
+    assert first.units == "m"
+    assert second.units == "ft"
+    np.testing.assert_array_equal(second.dataframe.values, before)
+    np.testing.assert_array_equal(Scenarios.from_builtin(0).dataframe.values, before)
+
+    record = BUILTIN_CATALOG.load("nj-dep-2021")
+    Scenarios.from_dict(record)
+    assert "URL" in record
+
+    # copy() returns writeable arrays
+    duplicate = second.copy()
+    duplicate.matrix.values[0, 0] = 99.0
+    assert duplicate.matrix.values.flags.writeable
+    assert second.matrix.values[0, 0] != 99.0
+
+
+def test_values_only_change_through_the_setter():
+    scenario = Scenario(
+        description="a",
+        short_name="a",
+        units="ft",
+        probability=0.5,
+        baseline_year=2000,
+        data={"x": [2000, 2050, 2100], "y": [0.0, 1.0, 2.0]},
+    )
+    assert scenario.by_horizon_year(2050) == 1.0
+    with pytest.raises(ValueError):
+        scenario.data.y[1] = 10.0
+    y = scenario.data.y.copy()
+    y[1] = 10.0
+    scenario.data.y = y
+    assert scenario.by_horizon_year(2050) == 10.0
+    assert scenario.dataframe.iloc[1, 0] == 10.0
+
+    # Rows that do not cover a contiguous run of years are read-only copies
+    sc = Scenarios(
+        scenarios=[
+            scenario,
+            Scenario(
+                description="b",
+                short_name="b",
+                units="ft",
+                probability=0.9,
+                baseline_year=2000,
+                data={"x": [2000, 2100], "y": [0.0, 4.0]},
+            ),
+        ]
+    )
+    with pytest.raises(ValueError):
+        sc[1].data.y[1] = 10.0
+    sc[1].data.y = np.array([0.0, 10.0])
+    assert sc[1].by_horizon_year(2050) == 5.0
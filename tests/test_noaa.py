@@ -0,0 +1,131 @@
+import os
+import time
+
+import pytest
+
+from sealevelrise import batch, noaaapi
+from sealevelrise.historical import HistoricalSLR
+from sealevelrise.noaaslr import NOAAScenarios
+from sealevelrise.slrprojections import Scenarios
+
+
+def test_responses_are_cached(noaa_server):
+    first = HistoricalSLR(station_ID="9414290", units="mm")
+    second = HistoricalSLR(station_ID="9414290", units="mm")
+    assert first.trend == second.trend
+    assert len(noaa_server.requests) == 1
+
+    projections = Scenarios.from_noaa(station_id="9414290")
+    assert projections.shape == (5,)
+    assert projections.units == "cm"
+    assert projections.location_name == "Station 9414290"
+    NOAAScenarios(station_id="9414290")
+    assert [endpoint_ for endpoint_, _ in noaa_server.requests] == [
+        "sealvltrends.json",
+        "slr_projections.json",
+    ]
+    # Other query parameters are cached separately
+    Scenarios.from_noaa(station_id="9414290", **{"Report Year": 2017})
+    assert len(noaa_server.requests) == 3
+
+
+def test_cache_ttl_and_offline_mode(noaa_server):
+    cache = noaaapi.RESPONSE_CACHE
+    params = {"station": "9410660", "affil": "US"}
+    noaaapi.fetch_json("sealvltrends.json", params)
+
+    # Expired entries are fetched again
+    path = cache._path(cache.key("sealvltrends.json", params))
+    os.utime(path, (time.time(), time.time() - 2 * cache.ttl))
+    noaaapi.fetch_json("sealvltrends.json", params)
+    assert len(noaa_server.requests) == 2
+
+    noaaapi.configure_cache(offline=True)
+    assert noaaapi.fetch_json("sealvltrends.json", params)["SeaLvlTrends"]
+    # Offline, expired entries are served rather than failing
+    os.utime(path, (time.time(), time.time() - 2 * cache.ttl))
+    assert noaaapi.fetch_json("sealvltrends.json", params)["SeaLvlTrends"]
+    with pytest.raises(ConnectionError):
+        noaaapi.fetch_json("sealvltrends.json", {"station": "9410170", "affil": "US"})
+    assert len(noaa_server.requests) == 2
+
+
+def test_cache_evicts_least_recently_used(noaa_server):
+    cache = noaaapi.configure_cache(max_bytes=None)
+    stations = ["9410660", "9410170", "9414290"]
+    for station_ in stations:
+        noaaapi.fetch_json("sealvltrends.json", {"station": station_, "affil": "US"})
+    sizes = [path_.stat().st_size for path_ in cache.directory.glob("*.json")]
+
+    # Use the first entry again so that the second one is the oldest
+    now = time.time()
+    for age_, station_ in zip([10, 20, 5], stations):
+        path = cache._path(
+            cache.key("sealvltrends.json", {"station": station_, "affil": "US"})
+        )
+        os.utime(path, (now - age_, path.stat().st_mtime))
+    noaaapi.fetch_json("sealvltrends.json", {"station": stations[0], "affil": "US"})
+
+    cache.max_bytes = sum(sizes) - 1
+    noaaapi.fetch_json("sealvltrends.json", {"station": "9418767", "affil": "US"})
+    assert (
+        cache.get("sealvltrends.json", {"station": stations[1], "affil": "US"}) is None
+    )
+    assert cache.get("sealvltrends.json", {"station": stations[0], "affil": "US"})
+    assert cache.get("sealvltrends.json", {"station": "9418767", "affil": "US"})
+
+
+def test_fetch_stations_concurrently(noaa_server):
+    noaa_server.delay = 0.2
+    stations = [str(9410000 + i_) for i_ in range(12)] + ["0000001"]
+    start = time.perf_counter()
+    result = batch.fetch_noaa_stations(stations, max_concurrency=13)
+    elapsed = time.perf_counter() - start
+    # 26 requests of 0.2 s each run in about two rounds instead of 5 s
+    assert elapsed < 2.5
+    assert list(result.historical) == stations[:-1]
+    assert list(result.projections) == stations[:-1]
+    assert (
+        result.historical["9410003"].trend
+        == HistoricalSLR(station_ID="9410003", units="mm").trend
+    )
+    assert list(result.errors["station"]) == ["0000001", "0000001"]
+    assert result.errors["error"].str.contains("404").all()
+    # Connections are kept alive and shared between requests
+    assert noaa_server.connections <= 13
+
+
+def test_session_rate_limit(noaa_server):
+    with noaaapi.NOAASession(max_connections=4, rate_limit=20.0) as session:
+        start = time.perf_counter()
+        for station_ in range(9410000, 9410010):
+            noaaapi.fetch_json(
+                "sealvltrends.json",
+                {"station": str(station_), "affil": "US"},
+                session=session,
+            )
+        assert time.perf_counter() - start >= 9 / 20.0
+    assert noaa_server.connections == 1
+
+
+def test_session_closes_connections_on_timeouts(noaa_server, monkeypatch):
+    noaa_server.delay = 0.5
+    url = noaaapi.build_url("sealvltrends.json", {"station": "9410660"})
+    with noaaapi.NOAASession(max_connections=1, timeout=0.1) as session:
+        connections = []
+        connect = session._connect
+        monkeypatch.setattr(
+            session,
+            "_connect",
+            lambda *args: connections.append(connect(*args)) or connections[-1],
+        )
+        for _ in range(2):
+            with pytest.raises(TimeoutError):
+                session.get(url)
+        # Timed out connections are closed, not pooled, and the slot is free
+        (pool,) = session._pools.values()
+        assert pool.empty()
+        assert all(connection_.sock is None for connection_ in connections)
+        noaa_server.delay = 0.0
+        assert session.get(url)
+        assert pool.qsize() == 1
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from sealevelrise.slrprojections import Scenarios
+
+
+def test_surface_matches_scenarios_and_inverts():
+    sc = Scenarios.from_builtin("NPCC3-new-york-2019")
+    surface = sc.probability_surface()
+    # The ARIM scenario has no probability and is left out
+    assert surface.shape == (4, sc.matrix.years.size)
+    assert sc.probability_surface() is surface
+
+    # On the levels, the surface is the scenarios themselves
+    years = np.arange(2020, 2101)
+    for scenario_ in sc.scenarios[:4]:
+        np.testing.assert_allclose(
+            surface.value(scenario_.probability, years),
+            scenario_.by_horizon_year(years),
+        )
+
+    # Bilinear in between, and the CDF inverts it
+    probabilities = np.linspace(0.1, 0.9, 17)[:, np.newaxis]
+    values = surface.value(probabilities, years)
+    assert values.shape == (17, years.size)
+    assert np.all(np.diff(values, axis=0) >= 0.0)
+    np.testing.assert_allclose(
+        surface.cdf(values[:, 1:], years[1:]),
+        np.broadcast_to(probabilities, values[:, 1:].shape),
+    )
+    np.testing.assert_allclose(
+        surface.exceedance(values[:, 1:], years[1:]),
+        1.0 - surface.cdf(values[:, 1:], years[1:]),
+    )
+
+    # Nothing is extrapolated
+    assert np.isnan(surface.value(0.05, 2050))
+    assert np.isnan(surface.value(0.5, 2110))
+    assert np.isnan(surface.cdf(100.0, 2050))
+
+    # Units
+    np.testing.assert_allclose(
+        sc.probability_surface(units="in").value(0.5, 2050),
+        12.0 * surface.value(0.5, 2050),
+    )
+    sc.convert(to_units="m", inplace=True)
+    assert sc.probability_surface().units == "m"
+
+
+def test_surface_needs_two_probabilities():
+    sc = Scenarios.from_builtin("cocat-2018-9414290")
+    assert sc.probability_surface().shape[0] == 2
+    with pytest.raises(ValueError):
+        Scenarios(scenarios=sc.scenarios[2]).probability_surface()
+
+
+def test_sample_is_chunked_and_reproducible():
+    surface = Scenarios.from_builtin("nj-dep-2021").probability_surface()
+    years = np.arange(2030, 2101, 10)
+    chunks = list(surface.sample(2_500, years=years, chunk_size=1_000, seed=7))
+    assert [chunk_.values.shape for chunk_ in chunks] == [
+        (1_000, years.size),
+        (1_000, years.size),
+        (500, years.size),
+    ]
+    # Levels are uniform in [0, 1]; the tails take the outermost scenarios
+    levels = np.concatenate([chunk_.probabilities for chunk_ in chunks])
+    assert levels.min() < surface.probabilities[0]
+    assert levels.max() > surface.probabilities[-1]
+    assert abs(levels.mean() - 0.5) < 0.02
+    for chunk_ in chunks:
+        clamped = np.clip(
+            chunk_.probabilities, surface.probabilities[0], surface.probabilities[-1]
+        )
+        np.testing.assert_allclose(
+            chunk_.values, surface.value(clamped[:, np.newaxis], years)
+        )
+
+    # Or are extrapolated from the two outermost scenarios
+    (chunk,) = surface.sample(1_000, years=years, seed=7, tails="extrapolate")
+    (low, high), p = surface.probabilities[-2:], chunk.probabilities
+    above = p > high
+    expected = surface.value(low, years) + ((p[above] - low) / (high - low))[
+        :, np.newaxis
+    ] * (surface.value(high, years) - surface.value(low, years))
+    np.testing.assert_allclose(chunk.values[above], expected)
+    with pytest.raises(ValueError):
+        next(surface.sample(10, tails="truncate"))
+
+    # The same seed gives the same trajectories, in or out of process
+    parallel = surface.sample(
+        2_500, years=years, chunk_size=1_000, seed=7, max_workers=2, max_pending=1
+    )
+    for chunk_, other_ in zip(chunks, parallel):
+        np.testing.assert_array_equal(chunk_.values, other_.values)
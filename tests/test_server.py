@@ -0,0 +1,98 @@
+import http.client
+import json
+
+import numpy as np
+import pytest
+
+from sealevelrise import batch
+from sealevelrise.server import ProjectionServer, ProjectionService
+
+
+def _request(connection, method, target, body=None):
+    connection.request(
+        method, target, body=None if body is None else json.dumps(body).encode()
+    )
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@pytest.fixture
+def connection():
+    with ProjectionServer(port=0, service=ProjectionService(preload=False)) as server:
+        connection = http.client.HTTPConnection(server.host, server.port, timeout=10)
+        yield connection
+        connection.close()
+
+
+def test_projections_match_batch_query(connection):
+    status, payload = _request(
+        connection,
+        "GET",
+        "/projections?location=San%20Francisco,%20CA&year=2050,2100&units=m",
+    )
+    expected = batch.query(["San Francisco, CA"], [2050, 2100], units="m")
+    assert status == 200
+    assert payload["key"] == expected["key"].iloc[0]
+    assert payload["years"] == [2050.0, 2100.0]
+    np.testing.assert_allclose(
+        [
+            np.nan if value_ is None else value_
+            for scenario_ in payload["scenarios"]
+            for value_ in scenario_["values"]
+        ],
+        expected["value"],
+    )
+
+    # Batch of queries on the same keep-alive connection, errors per query
+    status, payload = _request(
+        connection,
+        "POST",
+        "/projections",
+        {
+            "queries": [
+                {"location": "nj-dep-2021", "years": [2050]},
+                {"location": "unknown", "years": [2050]},
+                {"location": "nj-dep-2021", "years": [2050], "units": "lb"},
+            ]
+        },
+    )
+    assert status == 200
+    results = payload["results"]
+    assert results[0]["key"] == "nj-dep-2021"
+    assert [result_.get("status") for result_ in results] == [None, 404, 400]
+
+
+def test_endpoints_errors_and_metrics(connection):
+    assert _request(connection, "GET", "/health") == (200, {"status": "ok"})
+    status, payload = _request(connection, "GET", "/scenarios")
+    assert status == 200
+    assert "nj-dep-2021" in [entry_["key"] for entry_ in payload["scenarios"]]
+    status, payload = _request(connection, "GET", "/scenarios/nj-dep-2021?units=ft")
+    assert status == 200
+    assert {scenario_["units"] for scenario_ in payload["scenarios"]} == {"ft"}
+    assert len(payload["scenarios"][0]["values"]) == len(payload["years"])
+
+    assert _request(connection, "GET", "/nowhere")[0] == 404
+    assert _request(connection, "DELETE", "/health")[0] == 405
+    assert _request(connection, "GET", "/projections?location=nj-dep-2021")[0] == 400
+    assert _request(connection, "POST", "/projections", {"queries": 1})[0] == 400
+
+    status, payload = _request(connection, "GET", "/metrics")
+    assert status == 200
+    assert payload["routes"]["GET /health"]["count"] == 1
+    assert payload["routes"]["GET /projections"]["errors"] == 1
+    assert payload["cache"]["builtin"]["size"] == 2
+
+
+def test_noaa_projections_are_kept_in_memory(noaa_server, connection):
+    for _ in range(2):
+        status, payload = _request(
+            connection, "GET", "/projections?location=9414290&source=noaa&year=2050"
+        )
+        assert status == 200
+        assert payload["key"] == "noaa-9414290"
+    assert len(noaa_server.requests) == 1
+    status, payload = _request(
+        connection, "GET", "/projections?location=0123456&source=noaa&year=2050"
+    )
+    assert status == 502
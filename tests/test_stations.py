@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from sealevelrise import stations
+from sealevelrise.stations import BUILTIN_STATIONS, EARTH_RADIUS_KM, StationIndex
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def test_nearest_and_within_match_a_linear_scan():
+    rng = np.random.default_rng(0)
+    latitude = rng.uniform(20.0, 50.0, 500)
+    longitude = rng.uniform(-130.0, -65.0, 500)
+    table = BUILTIN_STATIONS.table
+    all_distances = _haversine(
+        latitude[:, np.newaxis],
+        longitude[:, np.newaxis],
+        table["latitude"].to_numpy(),
+        table["longitude"].to_numpy(),
+    )
+
+    distance, position = BUILTIN_STATIONS.nearest(latitude, longitude, k=3)
+    assert distance.shape == position.shape == (500, 3)
+    np.testing.assert_allclose(
+        distance, np.sort(all_distances, axis=1)[:, :3], rtol=1e-9
+    )
+    np.testing.assert_array_equal(
+        np.diff(distance, axis=1) >= 0.0, np.ones((500, 2), dtype=bool)
+    )
+
+    point, position, distance = BUILTIN_STATIONS.within(latitude, longitude, 200.0)
+    expected_point, expected_position = np.nonzero(all_distances <= 200.0)
+    assert point.size == expected_point.size
+    assert set(zip(point, position)) == set(zip(expected_point, expected_position))
+    np.testing.assert_allclose(distance, all_distances[point, position])
+
+
+def test_resolve_maps_coordinates_to_builtin_keys():
+    # Near the Golden Gate, in Manhattan, and in the middle of the Pacific
+    result = BUILTIN_STATIONS.resolve(
+        [37.81, 40.70, 30.0], [-122.47, -74.01, -140.0], builtin=True
+    )
+    assert list(result["key"][:1]) == ["cocat-2018-9414290"]
+    assert list(result["station_id"][:1]) == ["9414290"]
+    # Only stations with builtin scenarios are candidates
+    assert all(key_.startswith("cocat-2018") for key_ in result["key"])
+    assert all(keys_[0] == key_ for key_, keys_ in zip(result["key"], result["keys"]))
+
+    result = BUILTIN_STATIONS.resolve(
+        [37.81, 40.70, 30.0], [-122.47, -74.01, -140.0], max_distance=100.0
+    )
+    assert list(result["station_id"][:2]) == ["9414290", "8518750"]
+    assert result["station_id"].isna().tolist() == [False, False, True]
+
+
+def test_keys_lists_every_builtin_key_of_a_station(monkeypatch):
+    headers = {
+        "issuer-a-9414290": SimpleNamespace(station_id="9414290"),
+        "issuer-b-9414290": SimpleNamespace(station_id="9414290"),
+        "region": SimpleNamespace(station_id=None),
+    }
+    monkeypatch.setattr(stations, "BUILTIN_CATALOG", SimpleNamespace(headers=headers))
+    index = StationIndex(table=BUILTIN_STATIONS.table)
+    keys = index.keys
+    assert index.keys is keys
+    assert keys[list(index.station_ids).index("9414290")] == (
+        "issuer-a-9414290",
+        "issuer-b-9414290",
+    )
+    assert sum(len(keys_) for keys_ in keys) == 2
+
+    result = index.resolve(37.81, -122.47, builtin=True)
+    assert result["key"].tolist() == ["issuer-a-9414290"]
+    assert result["keys"].tolist() == [("issuer-a-9414290", "issuer-b-9414290")]
+
+
+def test_kd_tree_matches_the_brute_force_search(monkeypatch):
+    pytest.importorskip("scipy")
+    rng = np.random.default_rng(1)
+    latitude = rng.uniform(20.0, 50.0, 200)
+    longitude = rng.uniform(-130.0, -65.0, 200)
+    tree = StationIndex(table=BUILTIN_STATIONS.table)
+    assert tree.vectors is not None and tree._tree is not None
+    monkeypatch.setattr(stations, "cKDTree", None)
+    brute = StationIndex(table=BUILTIN_STATIONS.table)
+    assert brute.vectors is not None and brute._tree is None
+
+    distance, position = tree.nearest(latitude, longitude, k=3)
+    expected_distance, expected_position = brute.nearest(latitude, longitude, k=3)
+    np.testing.assert_allclose(distance, expected_distance, rtol=1e-9)
+    np.testing.assert_array_equal(position, expected_position)
+    for found_, expected_ in zip(
+        tree.within(latitude, longitude, 200.0),
+        brute.within(latitude, longitude, 200.0),
+    ):
+        np.testing.assert_allclose(found_, expected_)
@@ -1,9 +1,9 @@
-from sealevelrise.utils import ALL_SCENARIOS
+from sealevelrise.utils import ALL_BUILTIN_SCENARIOS
 
 
 def test_health_json_data():
     # Test health of the master SLR dataset
-    for _, pack in ALL_SCENARIOS.items():
+    for _, pack in ALL_BUILTIN_SCENARIOS.items():
         assert "location name" in pack
         assert "station ID (CO-OPS)" in pack
         assert "scenarios" in pack
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from sealevelrise import batch, visualize  # noqa: E402
+from sealevelrise.slrprojections import Scenarios  # noqa: E402
+from sealevelrise.utils import BUILTIN_CATALOG  # noqa: E402
+
+
+def test_render_figures(tmp_path):
+    sets = [Scenarios.from_builtin(key_) for key_ in BUILTIN_CATALOG]
+    serial = visualize.render_figures(sets, tmp_path / "serial")
+    assert list(serial["name"]) == [sc_.location_name for sc_ in sets]
+    assert (serial["seconds"] > 0).all()
+    parallel = visualize.render_figures(
+        sets, tmp_path / "parallel", max_workers=2, chunksize=3
+    )
+    for path_ in list(serial["path"]) + list(parallel["path"]):
+        with open(path_, mode="rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+    # The template only holds the artists of the last panel
+    figure, ax = visualize._template((5.35, 3.5), 100)
+    assert len(ax.collections) == 1
+    segments = ax.collections[0].get_segments()
+    assert len(segments) == sets[-1].shape[0]
+    np.testing.assert_array_equal(segments[0][:, 0], sets[-1].scenarios[0].data.x)
+
+
+def test_render_figures_keeps_panels_with_the_same_file_name(tmp_path):
+    panel = visualize.panel_from_scenarios(Scenarios.from_builtin("nj-dep-2021"))
+    panels = [
+        panel._replace(name=name_)
+        for name_ in ["San Francisco, CA", "San Francisco CA", "san francisco ca"]
+    ]
+    result = visualize.render_figures(panels, tmp_path)
+    assert list(result["name"]) == [panel_.name for panel_ in panels]
+    assert [Path(path_).name for path_ in result["path"]] == [
+        "San_Francisco_CA.png",
+        "San_Francisco_CA_2.png",
+        "san_francisco_ca_3.png",
+    ]
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_render_stitched_timelines(noaa_server, tmp_path):
+    table = batch.stitch_timelines(["9414290", "9410660"]).table
+    panels = visualize.panels_from_timelines(table)
+    assert [panel_.name for panel_ in panels] == [
+        "9414290_cocat-2018-9414290",
+        "9410660_cocat-2018-9410660",
+    ]
+    assert panels[0].reference[1][-1] == 1999.0
+    # Interpolated values are not drawn as projections
+    assert panels[0].segments[0][0, 0] == 2030.0
+    assert panels[0].ylabel.startswith("SLR from 2000")
+    visualize.render_figures(panels, tmp_path / "figures")
+    assert sorted(p_.name for p_ in (tmp_path / "figures").iterdir()) == [
+        "9410660_cocat-2018-9410660.png",
+        "9414290_cocat-2018-9414290.png",
+    ]
+
+    # Already stitched data is not fetched again
+    requests = len(noaa_server.requests)
+    ax = visualize.HistoricalVsProjections("9414290", table=table)
+    assert len(noaa_server.requests) == requests
+    assert len(ax.lines) == 4
+    plt.close(ax.figure)